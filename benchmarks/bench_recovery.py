@@ -0,0 +1,91 @@
+"""Startup cost of a booking database: full JSON parse vs snapshot plus log tail.
+
+Each case keeps the same live bookings but a growing history of older
+mutations in the change log. A cold start parses the JSON file and the
+saved index; recovery loads the latest checkpoint and replays only the
+mutations after it, so it should stay flat however long the history gets.
+
+    uv run benchmarks/bench_recovery.py
+"""
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+from booking.checkpoint import SnapshotStore
+from booking.database import DatabaseHandler
+
+LIVE_BOOKINGS = 5000
+HISTORY_SIZES = (0, 20000, 100000)
+TAIL_WRITES = 50
+BATCH = 1000
+REPEATS = 5
+
+
+def _booking(i: int) -> Dict[str, str]:
+    day = 1 + i % 28
+    return {
+        "id": str(uuid.uuid4()),
+        "room_name": f"Room {i % 50}.",
+        "room_id": f"room-{i % 50}",
+        "start_date": f"2030-02-{day:02d}",
+        "end_date": f"2030-03-{day:02d}",
+    }
+
+
+def _build(db_path: Path, history: int) -> None:
+    """Write the live bookings, churn through `history` mutations, checkpoint, then add a tail"""
+    handler = DatabaseHandler(db_path)
+    live: List[Dict[str, str]] = [_booking(i) for i in range(LIVE_BOOKINGS)]
+    handler.write_many({"rooms": [], "bookings": live})
+    # Each churn write inserts BATCH temporary bookings and deletes the previous BATCH
+    temporary: List[Dict[str, str]] = []
+    for _ in range(history // (2 * BATCH)):
+        temporary = [_booking(i) for i in range(BATCH)]
+        handler.write_many({"bookings": live + temporary})
+    if temporary:
+        handler.write_many({"bookings": live})
+    handler.checkpoint()
+    for i in range(TAIL_WRITES):
+        live = live + [_booking(i)]
+        handler.write_many({"bookings": live})
+
+
+def _best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _cold_start(db_path: Path) -> None:
+    handler = DatabaseHandler(db_path)
+    # Point the handler at an empty snapshot directory so it parses the files
+    handler._snapshots = SnapshotStore(db_path.with_name("no-snapshots"))
+    handler.read("bookings")
+    handler.indexes()
+
+
+def _recover(db_path: Path) -> None:
+    handler = DatabaseHandler(db_path)
+    handler.read("bookings")
+    handler.indexes()
+
+
+def main() -> None:
+    print(f"{'history':>10} {'log entries':>12} {'cold start':>12} {'snapshot+tail':>14}")
+    for history in HISTORY_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = Path(directory) / "bench.json"
+            _build(db_path, history)
+            log_entries = sum(1 for _ in DatabaseHandler(db_path).changes(0))
+            cold = _best_of(lambda: _cold_start(db_path))
+            recover = _best_of(lambda: _recover(db_path))
+            print(f"{history:>10} {log_entries:>12} {cold * 1000:>10.1f}ms {recover * 1000:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,15 @@ __version__ = "0.1.0"
     ID_ERROR,
     DUPLICATED_ROOM_NAME, 
     ERROR_ELEMENT_NOT_FOUND,
-    DEFAULT
-) = range(11)
+    DEFAULT,
+    NO_ROOM_AVAILABLE,
+    INVALID_DATE,
+    BOOKING_CONFLICT,
+    READ_ONLY_ERROR,
+    HOLD_EXPIRED,
+    UNKNOWN_PROPERTY,
+    ROOM_HAS_BOOKINGS,
+) = range(18)
 
 ERRORS = {
     DIR_ERROR: "config directory error",
@@ -27,4 +34,11 @@ ERRORS = {
     DUPLICATED_ROOM_NAME: "a room with the same name already exists",
     DB_INIT_ERROR: "error initializing database in specified path. using default",
     DEFAULT:"",
+    NO_ROOM_AVAILABLE: "no free room is large enough for the party",
+    INVALID_DATE: "invalid booking dates",
+    BOOKING_CONFLICT: "room is already booked for some of the requested dates",
+    READ_ONLY_ERROR: "database is opened read-only",
+    HOLD_EXPIRED: "hold has expired or does not exist",
+    UNKNOWN_PROPERTY: "no database is configured for this property",
+    ROOM_HAS_BOOKINGS: "room still has bookings; remove them first or cascade",
 }
\ No newline at end of file
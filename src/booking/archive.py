@@ -0,0 +1,76 @@
+"""Compressed, append-only archive of finished bookings"""
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def archive_path(db_path: Path) -> Path:
+    """Directory holding the archive segments of a database file"""
+    return db_path.with_name(db_path.name + ".archive")
+
+
+class Archive:
+    """Gzipped JSON lines segments plus a manifest of their date ranges.
+
+    Segments are never modified once written; each archive run adds a new
+    one. The manifest records the earliest check-in and latest check-out of
+    each segment so range reads only open the segments that can match.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def _manifest(self) -> List[Dict[str, Any]]:
+        try:
+            with (self._path / self.MANIFEST).open("r") as manifest:
+                return json.load(manifest)["segments"]
+        except (OSError, json.JSONDecodeError, KeyError):
+            return []
+
+    def _save_manifest(self, segments: List[Dict[str, Any]]) -> None:
+        tmp_path = self._path / (self.MANIFEST + ".tmp")
+        with tmp_path.open("w") as manifest:
+            json.dump({"segments": segments}, manifest, indent=4)
+        os.replace(tmp_path, self._path / self.MANIFEST)
+
+    def append(self, bookings: List[Dict[str, Any]]) -> Optional[Path]:
+        """Write bookings to a new segment, returning its path"""
+        if not bookings:
+            return None
+        self._path.mkdir(parents=True, exist_ok=True)
+        segments = self._manifest()
+        name = f"segment-{len(segments) + 1:06d}.jsonl.gz"
+        with gzip.open(self._path / name, "wt") as segment:
+            for booking in bookings:
+                segment.write(json.dumps(booking) + "\n")
+        segments.append({
+            "file": name,
+            "count": len(bookings),
+            "min_start": min(b["start_date"] for b in bookings),
+            "max_end": max(b["end_date"] for b in bookings),
+        })
+        self._save_manifest(segments)
+        return self._path / name
+
+    def count(self) -> int:
+        return sum(segment["count"] for segment in self._manifest())
+
+    def read(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream archived bookings occupying a night in [start_date, end_date)"""
+        for segment in self._manifest():
+            if start_date and segment["max_end"] <= start_date:
+                continue
+            if end_date and segment["min_start"] >= end_date:
+                continue
+            with gzip.open(self._path / segment["file"], "rt") as lines:
+                for line in lines:
+                    booking = json.loads(line)
+                    if start_date and booking["end_date"] <= start_date:
+                        continue
+                    if end_date and booking["start_date"] >= end_date:
+                        continue
+                    yield booking
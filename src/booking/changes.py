@@ -0,0 +1,144 @@
+"""Sequence-numbered log of database mutations"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+INSERT, UPDATE, DELETE = "insert", "update", "delete"
+
+
+def changes_path(db_path: Path) -> Path:
+    """Location of the change log kept next to a database file"""
+    return db_path.with_name(db_path.name + ".changes.jsonl")
+
+
+def diff_records(key: str, old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Describe how a list of records keyed by 'id' went from old to new"""
+    old_by_id = {str(record.get("id")): record for record in old}
+    new_by_id = {str(record.get("id")): record for record in new}
+    entries = []
+    for record_id, record in new_by_id.items():
+        previous = old_by_id.get(record_id)
+        if previous is None:
+            entries.append({"key": key, "op": INSERT, "id": record_id, "record": record})
+        elif previous != record:
+            entries.append({"key": key, "op": UPDATE, "id": record_id, "record": record})
+    for record_id in old_by_id.keys() - new_by_id.keys():
+        entries.append({"key": key, "op": DELETE, "id": record_id, "record": None})
+    return entries
+
+
+def apply_changes(
+    data: Dict[str, Any],
+    changes: Iterable[Dict[str, Any]],
+) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """Replay log entries onto parsed database contents, in place.
+
+    Returns each applied entry paired with the record it replaced or
+    deleted (None for inserts), for keeping indexes in step.
+    """
+    positions: Dict[str, Dict[str, int]] = {}
+    applied = []
+    for change in changes:
+        records = data.setdefault(change["key"], [])
+        if change["key"] not in positions:
+            positions[change["key"]] = {str(r.get("id")): i for i, r in enumerate(records)}
+        by_id = positions[change["key"]]
+        position = by_id.get(change["id"])
+        old = records[position] if position is not None else None
+        if change["op"] == DELETE:
+            if position is not None:
+                records.pop(position)
+                positions[change["key"]] = {str(r.get("id")): i for i, r in enumerate(records)}
+        elif position is None:
+            by_id[change["id"]] = len(records)
+            records.append(change["record"])
+        else:
+            records[position] = change["record"]
+        data["change_seq"] = change["seq"]
+        applied.append((change, old))
+    return applied
+
+
+class ChangeLog:
+    """Append-only JSON lines file of mutations, ordered by sequence number"""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def get_path(self) -> Path:
+        return self._path
+
+    def append(
+        self,
+        entries: List[Dict[str, Any]],
+        first_seq: int,
+        db_stamp: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        """Stamp entries with consecutive sequence numbers and append them.
+
+        db_stamp, the fingerprint of the database file once the write is on
+        disk, is recorded on the last entry so recovery can tell whether
+        replaying the log reproduces the file. Returns the last sequence
+        number written.
+        """
+        seq = first_seq - 1
+        now = time.time()
+        lines = []
+        for i, entry in enumerate(entries):
+            seq += 1
+            stamped = {"seq": seq, "ts": now, **entry}
+            if db_stamp is not None and i == len(entries) - 1:
+                stamped["db"] = list(db_stamp)
+            lines.append(json.dumps(stamped) + "\n")
+        if lines:
+            with self._path.open("a") as log:
+                log.writelines(lines)
+                log.flush()
+                os.fsync(log.fileno())
+        return seq
+
+    def since(self, seq: int) -> Iterator[Dict[str, Any]]:
+        """Stream the entries with a sequence number greater than seq.
+
+        Entries are appended in sequence order, so the start position is
+        found by bisecting over byte offsets instead of reading the whole log.
+        """
+        try:
+            log = self._path.open("rb")
+        except OSError:
+            return
+        with log:
+            log.seek(self._find_offset(log, seq))
+            for line in log:
+                if not line.endswith(b"\n"):
+                    # A writer is still appending this entry
+                    return
+                entry = json.loads(line)
+                if entry["seq"] > seq:
+                    yield entry
+
+    @staticmethod
+    def _line_start(log, offset: int) -> int:
+        """Start of the first line beginning at or after offset"""
+        if offset == 0:
+            return 0
+        log.seek(offset - 1)
+        log.readline()
+        return log.tell()
+
+    @staticmethod
+    def _find_offset(log, seq: int) -> int:
+        """Start of the first line whose sequence number is greater than seq"""
+        log.seek(0, os.SEEK_END)
+        lo, hi = 0, log.tell()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            log.seek(ChangeLog._line_start(log, mid))
+            line = log.readline()
+            if not line.endswith(b"\n") or json.loads(line)["seq"] > seq:
+                hi = mid
+            else:
+                lo = mid + 1
+        return ChangeLog._line_start(log, lo)
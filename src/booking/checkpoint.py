@@ -0,0 +1,111 @@
+"""Binary snapshots of a database and its indexes, for fast startup"""
+import marshal
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+MAGIC = b"BKSNAP\r\n"
+# 2: the payload is compact JSON rather than a pickle
+# 3: the payload is marshal data without code objects
+FORMAT_VERSION = 3
+# magic, format version, sequence number, payload length, payload crc32
+_HEADER = struct.Struct("<8sIQQI")
+
+
+def snapshots_path(db_path: Path) -> Path:
+    """Directory holding the snapshots of a database file"""
+    return db_path.with_name(db_path.name + ".snapshots")
+
+
+class Snapshot(NamedTuple):
+    seq: int
+    stamp: Optional[List[int]]
+    data: Dict[str, Any]
+    index: Dict[str, Any]
+
+
+class SnapshotStore:
+    """Checksummed snapshot files named after the sequence number they include.
+
+    Each snapshot holds the parsed database, the persisted index contents and
+    the fingerprint of the database file it was taken from. The newest few
+    are kept so a torn or corrupt latest file still leaves one to start from.
+    The payload is written with marshal, which decodes plain dicts, lists
+    and strings about twice as fast as json. Code objects are refused both
+    ways, so loading a snapshot can never run code.
+    """
+
+    KEEP = 2
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def get_path(self) -> Path:
+        return self._path
+
+    def _files(self) -> List[Path]:
+        """Snapshot files, newest first"""
+        try:
+            return sorted(self._path.glob("snapshot-*.bin"), reverse=True)
+        except OSError:
+            return []
+
+    def latest_seq(self) -> Optional[int]:
+        """Sequence number of the newest snapshot file, without reading it"""
+        for path in self._files():
+            try:
+                return int(path.stem.split("-")[1])
+            except (IndexError, ValueError):
+                continue
+        return None
+
+    def save(self, seq: int, stamp: Optional[Tuple[int, int]], data: Dict[str, Any], index: Dict[str, Any]) -> int:
+        """Durably write a snapshot, drop the ones past KEEP, and return its size in bytes"""
+        payload = marshal.dumps(
+            {"stamp": list(stamp) if stamp is not None else None, "data": data, "index": index},
+            allow_code=False,
+        )
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, seq, len(payload), zlib.crc32(payload))
+        self._path.mkdir(parents=True, exist_ok=True)
+        path = self._path / f"snapshot-{seq:012d}.bin"
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as snapshot:
+            snapshot.write(header)
+            snapshot.write(payload)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, path)
+        for old in self._files()[self.KEEP:]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+        return _HEADER.size + len(payload)
+
+    def load_latest(self) -> Optional[Snapshot]:
+        """Newest snapshot that passes its checks, or None"""
+        for path in self._files():
+            snapshot = self._read(path)
+            if snapshot is not None:
+                return snapshot
+        return None
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Snapshot]:
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, seq, length, checksum = _HEADER.unpack_from(raw)
+        payload = raw[_HEADER.size:]
+        if magic != MAGIC or version != FORMAT_VERSION or len(payload) != length or zlib.crc32(payload) != checksum:
+            return None
+        try:
+            contents = marshal.loads(payload, allow_code=False)
+            return Snapshot(seq, contents["stamp"], contents["data"], contents["index"])
+        except (EOFError, ValueError, TypeError, KeyError):
+            return None
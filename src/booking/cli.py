@@ -1,14 +1,51 @@
+import json
+import shlex
 import typer
+from datetime import date
 from pathlib import Path
-from typing import Optional
-from booking import ERRORS, __app_name__, __version__, config, database, DB_INIT_ERROR, DEFAULT
+from typing import Dict, Optional, Tuple
+from booking import ERRORS, __app_name__, __version__, config, database, metrics as booking_metrics, DB_INIT_ERROR, DEFAULT, BOOKING_CONFLICT, UNKNOWN_PROPERTY
+from booking.context import BookingContext, get_context
+from booking.holds import Hold
+from booking.indexes import nights_between, shift_date
+from booking.loadtest import LoadTestConfig, run_load_test
+from booking.properties import merge_rooms, report_properties, search_properties
+from booking.recurrence import RecurrenceRule
+from booking.replication import Follower, ReplicationStatus
 from booking.models.room import RoomService
 from booking.models.book import BookingService
-from booking.validators import BookingValidator, DateValidator
+from booking.models.allocation import AllocationRequest, AllocationService
+from booking.validators import BookingValidator, DateValidator, normalize_date
 from configparser import ConfigParser
 
 app = typer.Typer()
 
+# Database the interactive shell was started on
+_shell_db_path: Optional[Path] = None
+
+# Property picked with --property for the current command
+_property_name: Optional[str] = None
+
+def _database_path() -> Path:
+    if _property_name is not None:
+        db_path = config._get_property_path(_property_name)
+        if db_path is None:
+            typer.secho(f"{ERRORS[UNKNOWN_PROPERTY]}: '{_property_name}'", fg=typer.colors.RED)
+            raise typer.Exit(1)
+        return db_path
+    return _shell_db_path or config._get_database_path()
+
+def _get_context() -> BookingContext:
+    # Shared per database, so the shell reuses the parsed data and indexes between commands
+    return get_context(_database_path())
+
+def _get_services() -> Tuple[RoomService, BookingService]:
+    context = _get_context()
+    return context.rooms, context.bookings
+
+def _get_allocation_service() -> AllocationService:
+    return _get_context().allocation
+
 def _version_callback(value: bool)->None:
     if value:
         typer.echo(f'{__app_name__} v{__version__}')
@@ -23,9 +60,16 @@ def main(
         help="Show the application's version and exit.",
         callback=_version_callback,
         is_eager=True,
-    )
+    ),
+    property_name: Optional[str] = typer.Option(
+        None,
+        "--property",
+        "-P",
+        help="Use the named property database from config.ini",
+    ),
 ) -> None:
-    return
+    global _property_name
+    _property_name = property_name
 
 
 @app.command()
@@ -38,7 +82,7 @@ def init(
     ),
 ) -> None:
     """Initialize the to-do database."""
-    app_init_error = config.init_app(db_path)
+    app_init_error = config.init_app(db_path, _property_name)
     if app_init_error:
         typer.secho(
             f'Creating config file failed with "{ERRORS[DEFAULT]}"',
@@ -55,7 +99,7 @@ def add(
     name: str = typer.Option(..., "--name", "-n", help="The room name."),
     capacity: int = typer.Option(..., "--capacity", "-c", help="The room capacity."),
 )->None:
-    room_service = RoomService(db_path=config._get_database_path())
+    room_service, _ = _get_services()
     room = room_service.add(name, capacity)
 
     if room.error:
@@ -75,7 +119,7 @@ def add(
 def get(
     limit: int = typer.Option(None, "--limit", "-l", help="Maximum number of rooms to get"),
 )->None:
-    room_service = RoomService(db_path=config._get_database_path)
+    room_service, _ = _get_services()
     
     room_list = room_service.get_rooms()
     
@@ -84,14 +128,33 @@ def get(
 @app.command()
 def edit(
     room_name: str = typer.Option(..., "--room-name", "-rn", help="Name of room to edit"),
-    new_room_name: str = typer.Option(None, "--new-room-name", "-nn", help="New name of the room"),
-    new_capacity: int = typer.Option(None, "--new-capacity", "-nc", help="New name of the room")
+    new_room_name: str = typer.Option(None, "--new-room-name", "-nn", help="New name of the room, stored with a trailing period like added rooms"),
+    new_capacity: int = typer.Option(None, "--new-capacity", "-nc", help="New name of the room, stored with a trailing period like added rooms")
 )->None:
-    room_service = RoomService(db_path=Path(database.DEFAULT_DB_FILE_PATH))
+    room_service, _ = _get_services()
     
     edited_room = room_service.edit(room_name, new_room_name, new_capacity)
     
-    typer.secho(f"{edited_room}", fg=typer.colors.GREEN)
+    if edited_room.error:
+        typer.secho(f"Editing room failed: {ERRORS[edited_room.error]}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    typer.secho(f"Room edited: {edited_room.list}", fg=typer.colors.GREEN)
+
+
+@app.command()
+def remove(
+    room_name: str = typer.Option(..., "--room-name", "-rn", help="Name of room to remove"),
+    cascade: bool = typer.Option(False, "--cascade", help="Also remove the room's bookings and series"),
+) -> None:
+    """Remove a room; refused while it has bookings unless --cascade is given."""
+    room_service, _ = _get_services()
+    
+    response = room_service.remove(room_name, cascade=cascade)
+    
+    if response.error:
+        typer.secho(f"Removing room failed: {ERRORS[response.error]}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    typer.secho(f"Room '{response.list['name']}' removed", fg=typer.colors.GREEN)
 
 
 @app.command()
@@ -99,17 +162,40 @@ def book(
     room_name: str = typer.Option(..., "--room-name", "-r", help="Name of the room to book"),
     start_date: str = typer.Option(..., "--start-date", "-s", help="Check-in date (YYYY-MM-DD)"),
     end_date: str = typer.Option(..., "--end-date", "-e", help="Check-out date (YYYY-MM-DD)"),
+    repeat: str = typer.Option(None, "--repeat", help="Repeat the stay: daily or weekly"),
+    every: int = typer.Option(None, "--every", help="Repeat the stay every N days"),
+    until: str = typer.Option(None, "--until", help="Last possible check-in of the series (YYYY-MM-DD)"),
+    count: int = typer.Option(None, "--count", help="Number of stays in the series"),
+    skip_conflicts: bool = typer.Option(False, "--skip-conflicts", help="Skip stays that clash with existing bookings"),
+    idempotency_key: str = typer.Option(None, "--idempotency-key", "-k", help="Retrying with the same key returns the original booking"),
 ) -> None:
-    """Book a room for specific dates."""
-    db_path = config._get_database_path()
-    room_service = RoomService(db_path=db_path)
-    booking_service = BookingService(db_path=db_path)
+    """Book a room for specific dates, optionally repeating."""
+    room_service, booking_service = _get_services()
+    
+    repeating = bool(repeat or every or until or count)
+    if idempotency_key and repeating:
+        # Keys are only remembered for single bookings; dropping it would double-book on a retry
+        typer.secho("Booking failed: --idempotency-key can't be used with a repeating booking", fg=typer.colors.RED)
+        return
+    
+    # A retry of a booking that already went through is answered straight away
+    if idempotency_key:
+        previous = booking_service.get_idempotent_booking(idempotency_key)
+        if previous.error == 0:
+            booking = previous.booking
+            typer.secho(
+                f"✓ Room '{booking.room_name}' successfully booked from {booking.start_date} to {booking.end_date}\n"
+                f"  Booking ID: {booking.id}",
+                fg=typer.colors.GREEN
+            )
+            return
     
     # Validate dates format and values
     is_valid, error_msg = BookingValidator.validate_booking_dates(start_date, end_date)
     if not is_valid:
         typer.secho(f"Date validation error: {error_msg}", fg=typer.colors.RED)
         return
+    start_date, end_date = normalize_date(start_date), normalize_date(end_date)
     
     # Check if room exists
     room_response = room_service.get_room_by_name(room_name)
@@ -120,21 +206,25 @@ def book(
     room = room_response.list[0]
     room_id = room.get("id")
     
-    # Check for booking conflicts
-    existing_bookings_response = booking_service.get_bookings_by_room(room_id)
-    existing_bookings = existing_bookings_response.list if existing_bookings_response.error == 0 else []
+    if repeating:
+        _book_series(
+            booking_service, room_name, room_id, start_date, end_date,
+            repeat, every, until, count, skip_conflicts,
+        )
+        return
     
-    is_available, conflict_msg = BookingValidator.check_room_availability(
-        room_id, start_date, end_date, existing_bookings
-    )
+    # Create the booking; add() checks the room's bookings and holds under the write lock
+    booking_response = booking_service.add(room_name, room_id, start_date, end_date, idempotency_key)
     
-    if not is_available:
-        typer.secho(f"Booking failed: {conflict_msg}", fg=typer.colors.RED)
+    if booking_response.error == BOOKING_CONFLICT:
+        conflict = booking_response.list[0]
+        reason = "on hold" if isinstance(conflict, Hold) else "already booked"
+        typer.secho(
+            f"Booking failed: Room is {reason} from {conflict.start_date} to {conflict.end_date}",
+            fg=typer.colors.RED
+        )
         return
     
-    # Create the booking
-    booking_response = booking_service.add(room_name, room_id, start_date, end_date)
-    
     if booking_response.error:
         typer.secho(f"Booking failed with error code {booking_response.error}", fg=typer.colors.RED)
         return
@@ -147,16 +237,276 @@ def book(
     )
 
 
+def _book_series(
+    booking_service: BookingService,
+    room_name: str,
+    room_id: str,
+    start_date: str,
+    end_date: str,
+    repeat: Optional[str],
+    every: Optional[int],
+    until: Optional[str],
+    count: Optional[int],
+    skip_conflicts: bool,
+) -> None:
+    if until and not DateValidator.is_valid_date_format(until):
+        typer.secho("Date validation error: Invalid until date format. Use YYYY-MM-DD", fg=typer.colors.RED)
+        return
+    until = normalize_date(until) if until else until
+    
+    try:
+        rule = RecurrenceRule.from_frequency(repeat, every, count, until)
+    except ValueError as e:
+        typer.secho(f"Recurrence error: {e}", fg=typer.colors.RED)
+        return
+    
+    is_valid, error_msg = rule.validate(nights_between(start_date, end_date), start_date)
+    if not is_valid:
+        typer.secho(f"Recurrence error: {error_msg}", fg=typer.colors.RED)
+        return
+    
+    series_response = booking_service.add_series(
+        room_name, room_id, start_date, end_date, rule, skip_conflicts=skip_conflicts
+    )
+    
+    if series_response.error == BOOKING_CONFLICT:
+        typer.secho("Booking failed: the series clashes with existing bookings", fg=typer.colors.RED)
+        for booking in series_response.list:
+            typer.secho(f"  {booking.start_date} to {booking.end_date}", fg=typer.colors.RED)
+        return
+    
+    if series_response.error:
+        typer.secho(f"Booking failed with error code {series_response.error}", fg=typer.colors.RED)
+        return
+    
+    series = series_response.series
+    typer.secho(
+        f"✓ Room '{room_name}' booked every {rule.interval_days} day(s) from {start_date}\n"
+        f"  Series ID: {series.id}",
+        fg=typer.colors.GREEN
+    )
+    if series.exceptions:
+        typer.secho(f"  Skipped: {', '.join(series.exceptions)}", fg=typer.colors.YELLOW)
+
+
+@app.command()
+def allocate(
+    party_size: int = typer.Option(..., "--party-size", "-p", help="Number of guests"),
+    start_date: str = typer.Option(..., "--start-date", "-s", help="Check-in date (YYYY-MM-DD)"),
+    end_date: str = typer.Option(..., "--end-date", "-e", help="Check-out date (YYYY-MM-DD)"),
+) -> None:
+    """Book the smallest free room that fits the party."""
+    allocation_service = _get_allocation_service()
+    
+    result = allocation_service.allocate(party_size, start_date, end_date)
+    
+    if result.error:
+        typer.secho(f"Allocation failed: {ERRORS[result.error]}", fg=typer.colors.RED)
+        return
+    
+    typer.secho(
+        f"✓ Room '{result.room['name']}' (capacity {result.room['capacity']}) "
+        f"booked from {start_date} to {end_date}\n"
+        f"  Booking ID: {result.booking.id}",
+        fg=typer.colors.GREEN
+    )
+
+
+@app.command()
+def allocate_batch(
+    requests_file: Path = typer.Option(
+        ..., "--file", "-f",
+        help="JSON list of {party_size, start_date, end_date} requests",
+    ),
+) -> None:
+    """Assign rooms to many group requests at once."""
+    allocation_service = _get_allocation_service()
+    
+    try:
+        with requests_file.open("r") as f:
+            requests = [
+                AllocationRequest(r["party_size"], r["start_date"], r["end_date"])
+                for r in json.load(f)
+            ]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+        typer.secho(f"Could not read allocation requests: {e}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    
+    results = allocation_service.allocate_batch(requests)
+    
+    for result in results:
+        request = result.request
+        if result.error:
+            typer.secho(
+                f"✗ {request.party_size} guests {request.start_date} → {request.end_date}: "
+                f"{ERRORS[result.error]}",
+                fg=typer.colors.RED
+            )
+        else:
+            typer.secho(
+                f"✓ {request.party_size} guests {request.start_date} → {request.end_date}: "
+                f"'{result.room['name']}' ({result.booking.id})",
+                fg=typer.colors.GREEN
+            )
+    
+    allocated = sum(1 for r in results if not r.error)
+    typer.secho(f"{allocated}/{len(results)} requests allocated", fg=typer.colors.CYAN)
+
+
+@app.command()
+def next_free(
+    room_name: str = typer.Option(None, "--room", "-r", help="Room to search (default: every room)"),
+    nights: int = typer.Option(..., "--nights", "-n", help="Length of the stay in nights"),
+    after: str = typer.Option(None, "--after", "-a", help="Earliest check-in date (YYYY-MM-DD, default today; earlier dates count as today)"),
+    count: int = typer.Option(1, "--count", "-k", help="Number of windows to show"),
+    party_size: int = typer.Option(None, "--party-size", "-p", help="Only rooms that fit this many guests"),
+) -> None:
+    """Find the earliest dates a room (or any room) is free for N nights."""
+    room_service, booking_service = _get_services()
+    
+    if room_name:
+        room_response = room_service.get_room_by_name(room_name)
+        if room_response.error or not room_response.list:
+            typer.secho(f"Room '{room_name}' not found", fg=typer.colors.RED)
+            raise typer.Exit(1)
+        response = booking_service.next_free(str(room_response.list[0]["id"]), nights, after, count)
+    else:
+        response = booking_service.next_free_any(nights, after, count, party_size)
+    
+    if response.error:
+        typer.secho(f"Search failed: {ERRORS[response.error]}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    if not response.list:
+        typer.secho("No free window found", fg=typer.colors.YELLOW)
+        return
+    
+    for window in response.list:
+        typer.secho(
+            f"'{window.room_name}': {window.start_date} → {window.end_date}",
+            fg=typer.colors.GREEN
+        )
+
+
+def _configured_properties() -> Dict[str, Path]:
+    properties = config._get_property_paths()
+    if not properties:
+        typer.secho(
+            f"No properties configured. Add one with: {__app_name__} --property NAME init --db-path PATH",
+            fg=typer.colors.RED
+        )
+        raise typer.Exit(1)
+    return properties
+
+
+def _check_date_range(start_date: str, end_date: str) -> None:
+    if not (DateValidator.is_valid_date_format(start_date) and DateValidator.is_valid_date_format(end_date)):
+        typer.secho("Invalid date format. Use YYYY-MM-DD", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    if not DateValidator.is_start_before_end(start_date, end_date):
+        typer.secho("Start date must be before end date", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+
+@app.command()
+def search(
+    start_date: str = typer.Option(..., "--start-date", "-s", help="Check-in date (YYYY-MM-DD)"),
+    end_date: str = typer.Option(..., "--end-date", "-e", help="Check-out date (YYYY-MM-DD)"),
+    party_size: int = typer.Option(None, "--party-size", "-p", help="Only rooms that fit this many guests"),
+    processes: bool = typer.Option(False, "--processes", help="Load the property databases in worker processes instead of threads"),
+) -> None:
+    """Find free rooms across every property."""
+    properties = _configured_properties()
+    _check_date_range(start_date, end_date)
+    
+    results = search_properties(properties, start_date, end_date, party_size, processes=processes)
+    
+    for result in results:
+        if result.error:
+            typer.secho(f"'{result.property}': {ERRORS[result.error]}", fg=typer.colors.RED)
+    rooms = merge_rooms(results)
+    if not rooms:
+        typer.secho("No free rooms found", fg=typer.colors.YELLOW)
+        return
+    for found in rooms:
+        typer.secho(
+            f"{found.property}: '{found.room.get('name', '')}' (capacity {found.room.get('capacity')})",
+            fg=typer.colors.GREEN
+        )
+
+
+@app.command()
+def report(
+    from_date: str = typer.Option(None, "--from", help="First night of the report (YYYY-MM-DD, default today)"),
+    to_date: str = typer.Option(None, "--to", help="End of the report, exclusive (YYYY-MM-DD, default 30 days after --from)"),
+    processes: bool = typer.Option(False, "--processes", help="Load the property databases in worker processes instead of threads"),
+) -> None:
+    """Show bookings and occupancy of every property."""
+    properties = _configured_properties()
+    from_date = from_date or date.today().isoformat()
+    if to_date is None and DateValidator.is_valid_date_format(from_date):
+        to_date = shift_date(from_date, 30)
+    _check_date_range(from_date, to_date or "")
+    
+    reports = report_properties(properties, from_date, to_date, processes=processes)
+    
+    typer.secho(f"Occupancy from {from_date} to {to_date}", fg=typer.colors.CYAN)
+    for row in reports:
+        if row.error:
+            typer.secho(f"{row.property}: {ERRORS[row.error]}", fg=typer.colors.RED)
+            continue
+        typer.echo(
+            f"{row.property}: {row.rooms} room(s), {row.bookings} booking(s), "
+            f"{row.booked_nights}/{row.available_nights} nights ({row.occupancy:.0%})"
+        )
+    booked = sum(row.booked_nights for row in reports)
+    available = sum(row.available_nights for row in reports)
+    typer.secho(
+        f"Total: {booked}/{available} nights ({booked / available if available else 0:.0%})",
+        fg=typer.colors.GREEN
+    )
+
+
 @app.command()
 def list_bookings(
     room_name: str = typer.Option(None, "--room-name", "-r", help="Filter bookings by room name (optional)"),
+    from_date: str = typer.Option(None, "--from", help="Only bookings occupying a night on or after this date (YYYY-MM-DD)"),
+    to_date: str = typer.Option(None, "--to", help="Only bookings occupying a night before this date (YYYY-MM-DD)"),
+    active_on: str = typer.Option(None, "--active-on", help="Only bookings occupying this night (YYYY-MM-DD)"),
+    this_week: bool = typer.Option(False, "--this-week", help="Only bookings starting this week"),
+    history: bool = typer.Option(False, "--history", help="Include archived bookings"),
 ) -> None:
     """List all bookings or bookings for a specific room."""
-    db_path = config._get_database_path()
-    booking_service = BookingService(db_path=db_path)
-    room_service = RoomService(db_path=db_path)
+    room_service, booking_service = _get_services()
     
-    bookings_response = booking_service.get_bookings()
+    for date_str in (from_date, to_date, active_on):
+        if date_str and not DateValidator.is_valid_date_format(date_str):
+            typer.secho(f"Invalid date '{date_str}'. Use YYYY-MM-DD", fg=typer.colors.RED)
+            return
+    
+    # Resolve the name through the room index and filter on the room id, so
+    # a stale room_name copied onto old bookings doesn't matter
+    room_id = None
+    if room_name:
+        room_response = room_service.get_room_by_name(room_name)
+        if room_response.error or not room_response.list:
+            typer.secho(f"Room '{room_name}' not found", fg=typer.colors.YELLOW)
+            return
+        room_id = str(room_response.list[0]["id"])
+    
+    if this_week:
+        bookings_response = booking_service.starting_this_week(room_id=room_id)
+    elif history:
+        if active_on:
+            from_date, to_date = active_on, shift_date(active_on, 1)
+        bookings_response = booking_service.get_history(start_date=from_date, end_date=to_date, room_id=room_id)
+    elif from_date or to_date or active_on:
+        bookings_response = booking_service.query(
+            room_id=room_id, start_date=from_date, end_date=to_date, active_on=active_on
+        )
+    elif room_id:
+        bookings_response = booking_service.get_stays(room_id)
+    else:
+        bookings_response = booking_service.get_bookings()
     
     if bookings_response.error:
         typer.secho("Failed to retrieve bookings", fg=typer.colors.RED)
@@ -164,12 +514,9 @@ def list_bookings(
     
     bookings = bookings_response.list
     
-    # Filter by room name if provided
-    if room_name:
-        bookings = [b for b in bookings if b.room_name.lower() == room_name.lower()]
-        if not bookings:
-            typer.secho(f"No bookings found for room '{room_name}'", fg=typer.colors.YELLOW)
-            return
+    if room_name and not bookings:
+        typer.secho(f"No bookings found for room '{room_name}'", fg=typer.colors.YELLOW)
+        return
     
     if not bookings:
         typer.secho("No bookings found", fg=typer.colors.YELLOW)
@@ -187,4 +534,188 @@ def list_bookings(
             f"  Check-out: {booking.end_date}\n"
             f"  Booking ID: {booking.id}\n",
             fg=typer.colors.GREEN
-        )
\ No newline at end of file
+        )
+
+@app.command()
+def archive(
+    before: str = typer.Option(None, "--before", "-b", help="Archive bookings checked out on or before this date (YYYY-MM-DD, default today)"),
+) -> None:
+    """Move finished bookings to compressed archive segments."""
+    _, booking_service = _get_services()
+    
+    if before and not DateValidator.is_valid_date_format(before):
+        typer.secho(f"Invalid date '{before}'. Use YYYY-MM-DD", fg=typer.colors.RED)
+        return
+    if before and before > date.today().isoformat():
+        typer.secho(f"Cannot archive before {before}: bookings that haven't checked out yet must stay bookable", fg=typer.colors.RED)
+        return
+    
+    archived = booking_service.archive(before)
+    
+    if archived.error:
+        typer.secho(f"Archiving failed: {ERRORS[archived.error]}", fg=typer.colors.RED)
+        return
+    
+    typer.secho(f"Archived {len(archived.list)} booking(s)", fg=typer.colors.GREEN)
+
+
+@app.command()
+def changes(
+    since: int = typer.Option(0, "--since", help="Only show changes after this sequence number"),
+) -> None:
+    """Stream room and booking changes as JSON lines."""
+    db_handler = _get_context().db_handler
+    
+    for change in db_handler.changes(since):
+        typer.echo(json.dumps(change))
+
+
+@app.command()
+def checkpoint() -> None:
+    """Snapshot the database and its indexes so startup only replays newer changes."""
+    db_handler = _get_context().db_handler
+    
+    response = db_handler.checkpoint()
+    
+    if response.code:
+        typer.secho(f"Checkpoint failed: {ERRORS[response.code]}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    snapshot = response.list[0]
+    typer.secho(
+        f"Checkpoint at change {snapshot['seq']} written to {snapshot['path']} ({snapshot['bytes']} bytes)",
+        fg=typer.colors.GREEN
+    )
+
+
+def _serve_metrics(port: int) -> None:
+    booking_metrics.serve(port)
+    typer.secho(f"Serving metrics on http://127.0.0.1:{port}/metrics", fg=typer.colors.CYAN)
+
+
+@app.command()
+def metrics(
+    port: int = typer.Option(None, "--port", help="Read the metrics of a shell or replicate running with --metrics-port"),
+) -> None:
+    """Print metrics in Prometheus text format.
+    
+    Metrics are kept per process, so without --port this is only useful
+    inside `shell`; a one-shot run has nothing to report yet.
+    """
+    if port:
+        try:
+            text = booking_metrics.fetch(port)
+        except OSError as e:
+            typer.secho(f"Reading metrics failed: nothing answered on port {port} ({e})", fg=typer.colors.RED)
+            raise typer.Exit(1)
+    else:
+        text = booking_metrics.REGISTRY.render()
+    typer.echo(text, nl=False)
+
+
+@app.command()
+def loadtest(
+    workers: int = typer.Option(4, "--workers", "-w", help="Number of client processes"),
+    operations: int = typer.Option(200, "--operations", "-n", help="Operations per client"),
+    rooms: int = typer.Option(20, "--rooms", help="Rooms in the scratch database"),
+    hot_skew: float = typer.Option(1.0, "--skew", help="How strongly clients favour the first rooms (0 = evenly)"),
+    seed: int = typer.Option(None, "--seed", help="Random seed, for repeatable runs"),
+) -> None:
+    """Measure throughput and integrity with concurrent clients on a scratch database."""
+    report = run_load_test(LoadTestConfig(
+        workers=workers, operations=operations, rooms=rooms, hot_skew=hot_skew, seed=seed,
+    ))
+    
+    typer.secho(
+        f"{report.operations} operations from {report.workers} clients in {report.elapsed:.2f}s: "
+        f"{report.throughput:.0f} ops/s, {report.bookings_per_second:.0f} bookings/s",
+        fg=typer.colors.CYAN
+    )
+    for operation, summary in report.latencies.items():
+        typer.echo(
+            f"  {operation:<10} {summary.count:>6}  p50 {summary.p50 * 1000:8.2f} ms  p99 {summary.p99 * 1000:8.2f} ms"
+        )
+    typer.echo(f"Bookings made: {report.bookings}, conflict rejections: {report.conflicts}, errors: {report.errors}")
+    
+    violations = report.lost_updates + len(report.overlaps)
+    typer.secho(
+        f"Integrity: {report.lost_updates} lost update(s), {len(report.overlaps)} overlapping booking pair(s)",
+        fg=typer.colors.RED if violations else typer.colors.GREEN
+    )
+
+
+def _print_replication_status(status: ReplicationStatus) -> None:
+    typer.secho(
+        f"applied {status.applied} change(s), at seq {status.applied_seq}/{status.primary_seq}, "
+        f"lag {status.lag} change(s) ({status.lag_seconds:.1f}s)",
+        fg=typer.colors.GREEN if status.lag == 0 else typer.colors.YELLOW,
+    )
+
+
+@app.command()
+def replicate(
+    primary: Path = typer.Option(..., "--from", help="Primary database file to follow"),
+    follower: Path = typer.Option(..., "--to", help="Follower database file to keep up to date"),
+    interval: float = typer.Option(1.0, "--interval", "-i", help="Seconds between polls of the primary"),
+    once: bool = typer.Option(False, "--once", help="Catch up once and exit"),
+    metrics_port: int = typer.Option(None, "--metrics-port", help="Serve /metrics on this local port while running"),
+) -> None:
+    """Keep a read-only follower database in sync with a primary."""
+    replica = Follower(primary, follower)
+    if metrics_port:
+        _serve_metrics(metrics_port)
+    
+    if once:
+        _print_replication_status(replica.sync_once())
+        return
+    
+    try:
+        replica.run(interval, on_sync=_print_replication_status)
+    except KeyboardInterrupt:
+        raise typer.Exit()
+
+
+@app.command()
+def shell(
+    metrics_port: int = typer.Option(None, "--metrics-port", help="Serve /metrics on this local port while running"),
+) -> None:
+    """Run commands interactively, keeping the database and indexes loaded."""
+    global _shell_db_path
+    _shell_db_path = _database_path()
+    if metrics_port:
+        _serve_metrics(metrics_port)
+    command = typer.main.get_command(app)
+    
+    typer.secho(
+        f"{__app_name__} shell on {_shell_db_path}. Type 'help' for commands, 'exit' to quit.",
+        fg=typer.colors.CYAN
+    )
+    try:
+        while True:
+            try:
+                line = input(f"{__app_name__}> ")
+            except EOFError:
+                break
+            
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                typer.secho(f"Could not parse command: {e}", fg=typer.colors.RED)
+                continue
+            
+            if not args:
+                continue
+            if args[0] in ("exit", "quit"):
+                break
+            if args[0] == "help":
+                args = ["--help"]
+            if args[0] == "shell":
+                typer.secho("Already in the shell", fg=typer.colors.YELLOW)
+                continue
+            
+            # Standalone mode prints usage errors itself and always ends in SystemExit
+            try:
+                command.main(args=args, prog_name=__app_name__, standalone_mode=True)
+            except SystemExit:
+                pass
+    finally:
+        _shell_db_path = None
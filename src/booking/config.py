@@ -1,5 +1,6 @@
 from configparser import ConfigParser
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 from booking import(
     DB_WRITE_ERROR, DIR_ERROR, FILE_ERROR, SUCCESS, __app_name__, database
 )
@@ -7,11 +8,17 @@ from booking import(
 CONFIG_DIR_PATH = Path.cwd()
 CONFIG_FILE_PATH = CONFIG_DIR_PATH / 'config.ini'
 
-def init_app(db_path: str) ->int:
+# Named databases, one per property, as "name = path" entries
+PROPERTIES_SECTION = "Properties"
+
+# Parsed config.ini, reused until the file's path, mtime or size changes
+_config_cache: Optional[Tuple[Tuple[str, int, int], ConfigParser]] = None
+
+def init_app(db_path: str, property_name: Optional[str] = None) ->int:
     config_code = _init_config_file()
     if config_code != SUCCESS:
         return config_code
-    database_code = _create_database(db_path)
+    database_code = _create_database(db_path, property_name)
     if database_code != SUCCESS:
         return database_code 
     return SUCCESS
@@ -28,21 +35,56 @@ def _init_config_file() -> int:
     
     return SUCCESS
 
-def _create_database(db_path: str) -> int:
+def _create_database(db_path: str, property_name: Optional[str] = None) -> int:
     config_parser = ConfigParser()
-    config_parser["General"] = {"database": db_path}
+    config_parser.read(CONFIG_FILE_PATH)
+    if property_name:
+        if not config_parser.has_section(PROPERTIES_SECTION):
+            config_parser[PROPERTIES_SECTION] = {}
+        config_parser[PROPERTIES_SECTION][property_name] = db_path
+    else:
+        config_parser["General"] = {"database": db_path}
     try:
         with CONFIG_FILE_PATH.open("w") as file:
             config_parser.write(file)
     except OSError:
         return DB_WRITE_ERROR
+    finally:
+        _forget_config()
     return SUCCESS
 
+def _read_config() -> ConfigParser:
+    """Parsed config.ini; callers must not modify it"""
+    global _config_cache
+    try:
+        stat = CONFIG_FILE_PATH.stat()
+        stamp = (str(CONFIG_FILE_PATH), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = (str(CONFIG_FILE_PATH), -1, -1)
+    if _config_cache is None or _config_cache[0] != stamp:
+        config_parser = ConfigParser()
+        config_parser.read(CONFIG_FILE_PATH)
+        _config_cache = (stamp, config_parser)
+    return _config_cache[1]
+
+def _forget_config() -> None:
+    global _config_cache
+    _config_cache = None
+
 def _get_database_path()->Path:
-    config_parser = ConfigParser()
-    config_parser.read(CONFIG_FILE_PATH)
+    config_parser = _read_config()
     
     try:
         return Path(config_parser["General"]["database"])
     except KeyError:
-        return Path(database.DEFAULT_DB_FILE_PATH)
\ No newline at end of file
+        return Path(database.DEFAULT_DB_FILE_PATH)
+
+def _get_property_paths() -> Dict[str, Path]:
+    config_parser = _read_config()
+    
+    if not config_parser.has_section(PROPERTIES_SECTION):
+        return {}
+    return {name: Path(path) for name, path in config_parser[PROPERTIES_SECTION].items()}
+
+def _get_property_path(property_name: str) -> Optional[Path]:
+    return _get_property_paths().get(property_name.lower())
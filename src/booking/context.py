@@ -0,0 +1,51 @@
+"""One set of services per database, shared by everything in the process"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from booking import config
+from booking.database import DatabaseHandler
+from booking.models.allocation import AllocationService
+from booking.models.book import BookingService
+from booking.models.room import RoomService
+
+
+class BookingContext:
+    """The room, booking and allocation services of one database file.
+
+    All three share a single DatabaseHandler, so the parsed-file cache and the
+    persisted index are loaded once and kept warm for every caller. Get one
+    through get_context() rather than building it directly.
+    """
+
+    def __init__(self, db_path: Path, read_only: bool = False) -> None:
+        self.db_path = Path(db_path)
+        self.db_handler = DatabaseHandler(self.db_path, read_only=read_only)
+        self.rooms = RoomService(self.db_path, read_only=read_only, db_handler=self.db_handler)
+        self.bookings = BookingService(self.db_path, read_only=read_only, db_handler=self.db_handler)
+        self.allocation = AllocationService(self.db_path, room_service=self.rooms, booking_service=self.bookings)
+
+
+_contexts: Dict[Tuple[str, bool], BookingContext] = {}
+_contexts_lock = threading.Lock()
+
+
+def get_context(db_path: Optional[Path] = None, read_only: bool = False) -> BookingContext:
+    """Shared context of a database, built on first use.
+
+    Without a path, the database configured in config.ini is used.
+    """
+    if db_path is None:
+        db_path = config._get_database_path()
+    key = (os.path.abspath(db_path), read_only)
+    with _contexts_lock:
+        context = _contexts.get(key)
+        if context is None:
+            context = _contexts[key] = BookingContext(Path(db_path), read_only=read_only)
+        return context
+
+
+def clear_contexts() -> None:
+    """Forget every shared context, e.g. after a database file was replaced"""
+    with _contexts_lock:
+        _contexts.clear()
@@ -1,54 +1,281 @@
+import contextlib
+import functools
 import json
-from typing import Any, Dict, List, NamedTuple
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
 from pathlib import Path
-from booking import DB_WRITE_ERROR, DB_READ_ERROR, JSON_ERROR, SUCCESS, DB_INIT_ERROR
+from booking import DB_WRITE_ERROR, DB_READ_ERROR, JSON_ERROR, SUCCESS, DB_INIT_ERROR, READ_ONLY_ERROR
+from booking import metrics
+from booking.changes import ChangeLog, apply_changes, changes_path, diff_records
+from booking.checkpoint import SnapshotStore, snapshots_path
+from booking.persisted_index import PersistedIndex, index_path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
 
 DEFAULT_DB_FILE_PATH  = Path.home().joinpath(
     "." + Path.home().stem + "_bookings.json"
 )
 
+def lock_path(db_path: Path) -> Path:
+    """Lock file that writers of a database file hold while they write"""
+    return db_path.with_name(db_path.name + ".lock")
+
+def transactional(method):
+    """Run a service method inside the transaction of the service's DatabaseHandler"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._db_handler.transaction():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class DBResponse(NamedTuple):
     list: List[Dict[str, Any]]
     code: int
 
 class DatabaseHandler:
-    def __init__(self, db_path: Path) -> None:
+    
+    # A snapshot is taken automatically once this many mutations have been
+    # logged since the last one, which bounds how much log startup replays
+    CHECKPOINT_INTERVAL = 1000
+    
+    def __init__(self, db_path: Path, read_only: bool = False) -> None:
         self._db_path = db_path
+        self._read_only = read_only
+        self._change_log = ChangeLog(changes_path(Path(db_path)))
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_version: Optional[Tuple[int, int]] = None
+        self._persisted_index = PersistedIndex(index_path(Path(db_path)), read_only=read_only)
+        self._snapshots = SnapshotStore(snapshots_path(Path(db_path)))
+        self._snapshot_seq: Optional[int] = None
+        # Guards the parsed cache, the index and the change log; one handler is
+        # shared by every service and thread of a BookingContext
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
         
     def get_path(self) -> Path:
         return Path(self._db_path)
+
+    def is_read_only(self) -> bool:
+        return self._read_only
+
+    def version(self) -> Optional[Tuple[int, int]]:
+        """Cheap fingerprint of the database file, None if it does not exist"""
+        try:
+            stat = self._db_path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _load(self) -> Dict[str, Any]:
+        """Parsed database contents, re-parsed only when the file has changed"""
+        with self._lock:
+            version = self.version()
+            if self._cache is not None and version is not None and version == self._cache_version:
+                metrics.DB_CACHE_HITS.inc()
+                return self._cache
+            metrics.DB_CACHE_MISSES.inc()
+            if self._cache is None and version is not None:
+                with metrics.DB_RECOVERY_SECONDS.time():
+                    data = self._recover(version)
+                if data is not None:
+                    self._cache, self._cache_version = data, version
+                    return data
+            with metrics.DB_READ_SECONDS.time():
+                with self._db_path.open("r") as db:
+                    data = json.load(db)
+            if version is not None:
+                metrics.DB_READ_BYTES.inc(version[1])
+            self._cache, self._cache_version = data, version
+            return data
+    
+    def _recover(self, version: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """Rebuild the contents from the newest snapshot plus the log written after it.
+
+        The result is only used if the last replayed entry was written
+        together with the current file, or the snapshot itself matches it;
+        otherwise the file changed some other way and it is parsed instead.
+        """
+        snapshot = self._snapshots.load_latest()
+        if snapshot is None:
+            return None
+        data = snapshot.data
+        if snapshot.stamp == list(version):
+            self._persisted_index.restore(snapshot.index, version)
+            return data
+        
+        tail = list(self._change_log.since(snapshot.seq))
+        if not tail or tail[0]["seq"] != snapshot.seq + 1 or tail[-1].get("db") != list(version):
+            return None
+        if any(entry["seq"] != tail[0]["seq"] + i for i, entry in enumerate(tail)):
+            return None
+        applied = apply_changes(data, tail)
+        self._persisted_index.restore(snapshot.index, None)
+        # The snapshot carries the index, so there is no need to write it out again
+        self._persisted_index.replay(applied, version, persist=False)
+        return data
+    
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Hold the database exclusively, against other threads and processes.
+
+        Services wrap their read-modify-write in this so a write is computed
+        from the latest contents. It can be nested; only the outermost level
+        takes the file lock. Without fcntl only threads are kept out.
+        """
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None and not self._read_only:
+                try:
+                    self._lock_file = lock_path(Path(self._db_path)).open("a")
+                except OSError:
+                    # The write itself will fail in an unwritable directory and report it
+                    self._lock_file = None
+                else:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
     
     def read(self, key: str) -> DBResponse:
         try:
-            with self._db_path.open("r") as db:
-                data = json.load(db).get(key, [])
-                
-                if data:
-                    return DBResponse(data, SUCCESS)
-                else:
-                    return DBResponse([], JSON_ERROR)
-                
+            data = self._load().get(key, [])
         except OSError:
             return DBResponse([], DB_READ_ERROR)
+        except json.JSONDecodeError:
+            # A corrupt file is not an empty one; callers must not write over it
+            return DBResponse([], DB_READ_ERROR)
+        
+        if data:
+            # Callers edit the returned list before writing it back
+            return DBResponse(list(data), SUCCESS)
+        else:
+            return DBResponse([], JSON_ERROR)
     
     def write(self, key: str, value: list[Any]) -> DBResponse:
+        response = self.write_many({key: value})
+        if response.code != SUCCESS:
+            return response
+        return DBResponse(value, SUCCESS)
+    
+    def write_many(self, values: Dict[str, list[Any]]) -> DBResponse:
+        """Replace several keys in a single write of the database file"""
+        if self._read_only:
+            return DBResponse([], READ_ONLY_ERROR)
         try:
-            print(f"attempting to write to {self._db_path}")
-            data = {}
-            if self._db_path.exists():
-                with self._db_path.open("r") as db:
-                    try:
-                        data = json.load(db)
-                    except json.JSONDecodeError:
-                        data = {}
-            
+            with self.transaction():
+                return self._write_locked(values)
+        except OSError:
+            return DBResponse([], DB_WRITE_ERROR)
+
+    def _write_locked(self, values: Dict[str, list[Any]]) -> DBResponse:
+        data = {}
+        if self._db_path.exists():
+            try:
+                data = dict(self._load())
+            except json.JSONDecodeError:
+                # Starting from {} here would replace the whole database with these keys
+                return DBResponse([], JSON_ERROR)
+        
+        old_version = self.version()
+        index_is_fresh = self._persisted_index.load(old_version)
+        changes, old_records = [], {}
+        for key, value in values.items():
+            old_value = data.get(key, [])
+            key_changes = diff_records(key, old_value, value)
+            changed_ids = {change["id"] for change in key_changes}
+            old_records.update(
+                ((key, str(record.get("id"))), record)
+                for record in old_value if str(record.get("id")) in changed_ids
+            )
+            changes.extend(key_changes)
             data[key] = value
+        first_seq = data.get("change_seq", 0) + 1
+        data["change_seq"] = first_seq + len(changes) - 1
+
+        # Replace the file in one step so concurrent readers never see half of it
+        with metrics.DB_WRITE_SECONDS.time():
+            self._replace_file(data)
+
+        self._cache, self._cache_version = data, self.version()
+        if self._cache_version is not None:
+            metrics.DB_WRITE_BYTES.inc(self._cache_version[1])
+        if index_is_fresh:
+            self._persisted_index.apply(changes, old_records, self._cache_version)
+        try:
+            last_seq = self._change_log.append(changes, first_seq, self._cache_version)
+        except OSError:
+            # The new file is already in place, so the write has happened and
+            # a retry would apply it twice. The log is left with a gap instead:
+            # followers re-copy the database when they meet one, and recovery
+            # only replays an unbroken tail that ends on the current file.
+            metrics.CHANGE_LOG_ERRORS.inc()
+            return DBResponse([], SUCCESS)
+        self._checkpoint_if_due(last_seq)
+
+        return DBResponse([], SUCCESS)
 
-            with self._db_path.open("w") as db:
+    def _replace_file(self, data: Dict[str, Any]) -> None:
+        """Write data to a temporary file of its own, flush it to disk and rename it over the database"""
+        fd, tmp_name = tempfile.mkstemp(dir=Path(self._db_path).parent, prefix=Path(self._db_path).name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as db:
                 json.dump(data, db, indent=4)
+                db.flush()
+                os.fsync(db.fileno())
+            os.replace(tmp_name, self._db_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
 
-            return DBResponse(data[key], SUCCESS)
+    def indexes(self) -> PersistedIndex:
+        """Persisted room and stay indexes, rebuilt only if the database changed behind them"""
+        with self._lock:
+            version = self.version()
+            if not self._persisted_index.load(version):
+                data = self._load()
+                # Loading may have restored the index from a snapshot already
+                if not self._persisted_index.is_fresh(version):
+                    self._persisted_index.rebuild(data, version)
+            return self._persisted_index
 
-        except OSError:
-            print(f"attempting to write to {self._db_path}")
-            return DBResponse([], DB_WRITE_ERROR)
\ No newline at end of file
+    def checkpoint(self) -> DBResponse:
+        """Snapshot the contents and indexes, tagged with the last applied sequence number"""
+        try:
+            with self._lock:
+                index = self.indexes()
+                data = self._load()
+                seq = data.get("change_seq", 0)
+                size = self._snapshots.save(seq, self._cache_version, data, index.state())
+                self._snapshot_seq = seq
+        except (OSError, json.JSONDecodeError):
+            return DBResponse([], DB_WRITE_ERROR)
+        return DBResponse([{"seq": seq, "bytes": size, "path": str(self._snapshots.get_path())}], SUCCESS)
+
+    def _checkpoint_if_due(self, last_seq: int) -> None:
+        if self._snapshot_seq is None:
+            self._snapshot_seq = self._snapshots.latest_seq() or 0
+        if last_seq - self._snapshot_seq >= self.CHECKPOINT_INTERVAL:
+            self.checkpoint()
+
+    def last_seq(self) -> int:
+        """Sequence number of the latest mutation written to the database"""
+        try:
+            return self._load().get("change_seq", 0)
+        except (OSError, json.JSONDecodeError):
+            return 0
+
+    def changes(self, since: int = 0) -> Iterator[Dict[str, Any]]:
+        """Stream the room and booking mutations made after sequence number since"""
+        return self._change_log.since(since)
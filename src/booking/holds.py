@@ -0,0 +1,76 @@
+"""Temporary, in-memory room holds that expire on their own"""
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_HOLD_TTL = 600.0
+
+@dataclass
+class Hold():
+    id: str
+    room_name: str
+    room_id: str
+    start_date: str
+    end_date: str
+    expires_at: float
+
+
+class HoldStore:
+    """Holds by id and by room, plus a min-heap of expiry times.
+
+    Sweeping pops only the heap entries that are already due, so it costs
+    O(k log n) for k expired holds. Released or confirmed holds leave a
+    stale heap entry behind, which is skipped when it reaches the top.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._holds: Dict[str, Hold] = {}
+        self._by_room: Dict[str, Dict[str, Hold]] = {}
+        self._expiries: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        self.sweep()
+        return len(self._holds)
+
+    def now(self) -> float:
+        return self._clock()
+
+    def sweep(self) -> int:
+        """Drop every hold whose expiry time has passed"""
+        now = self._clock()
+        dropped = 0
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, hold_id = heapq.heappop(self._expiries)
+            hold = self._holds.get(hold_id)
+            if hold is not None and hold.expires_at == expires_at:
+                self._remove(hold)
+                dropped += 1
+        return dropped
+
+    def add(self, hold: Hold) -> None:
+        self._holds[hold.id] = hold
+        self._by_room.setdefault(hold.room_id, {})[hold.id] = hold
+        heapq.heappush(self._expiries, (hold.expires_at, hold.id))
+
+    def get(self, hold_id: str) -> Optional[Hold]:
+        self.sweep()
+        return self._holds.get(hold_id)
+
+    def pop(self, hold_id: str) -> Optional[Hold]:
+        hold = self.get(hold_id)
+        if hold is not None:
+            self._remove(hold)
+        return hold
+
+    def for_room(self, room_id: str) -> List[Hold]:
+        self.sweep()
+        return list(self._by_room.get(room_id, {}).values())
+
+    def _remove(self, hold: Hold) -> None:
+        del self._holds[hold.id]
+        room_holds = self._by_room[hold.room_id]
+        del room_holds[hold.id]
+        if not room_holds:
+            del self._by_room[hold.room_id]
@@ -0,0 +1,80 @@
+"""Idempotency keys of booking requests, kept next to the database file"""
+import contextlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def idempotency_path(db_path: Path) -> Path:
+    """Location of the idempotency keys of a database file"""
+    return db_path.with_name(db_path.name + ".idempotency.json")
+
+
+class IdempotencyStore:
+    """Bookings created under an idempotency key, by key.
+
+    The keys live in their own file rather than in the database, so they
+    stay out of the change feed, its sequence numbers and the followers.
+    Writers hold the database transaction while they remember keys; the
+    file is re-read only when its fingerprint changes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._version: Optional[Tuple[int, int]] = None
+
+    def get_path(self) -> Path:
+        return self._path
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self._path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Stored entries by key, oldest first"""
+        version = self._stat()
+        if self._entries is None or version != self._version:
+            try:
+                with self._path.open("r") as saved:
+                    entries = json.load(saved)
+            except (OSError, json.JSONDecodeError):
+                entries = []
+            self._entries = {entry["id"]: entry for entry in entries}
+            self._version = version
+        return self._entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The booking stored under an unexpired key, or None"""
+        entry = self.entries().get(key)
+        if entry is None or entry["expires_at"] <= time.time():
+            return None
+        return entry["booking"]
+
+    def remember(self, bookings: List[Tuple[str, Dict[str, Any]]], ttl: float, max_keys: int) -> None:
+        """Store (key, booking) pairs for ttl seconds, keeping at most max_keys entries"""
+        now = time.time()
+        entries = {key: entry for key, entry in self.entries().items() if entry["expires_at"] > now}
+        for key, booking in bookings:
+            entries.pop(key, None)
+            entries[key] = {"id": key, "booking": booking, "expires_at": now + ttl}
+        # Entries are kept in insertion order, so the oldest are dropped first
+        kept = list(entries.values())[-max_keys:]
+        fd, tmp_name = tempfile.mkstemp(dir=self._path.parent, prefix=self._path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as saved:
+                json.dump(kept, saved)
+                saved.flush()
+                os.fsync(saved.fileno())
+            os.replace(tmp_name, self._path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+        self._entries, self._version = {entry["id"]: entry for entry in kept}, self._stat()
@@ -0,0 +1,258 @@
+"""In-memory indexes over rooms and bookings"""
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from booking.validators import normalize_date
+
+
+def _padded(date_str: str) -> str:
+    """Zero-padded form of a stored date; bookings written before dates were
+    normalized may have unpadded months and days"""
+    if len(date_str) == 10:
+        return date_str
+    return normalize_date(date_str) or date_str
+
+
+def parse_date(date_str: str) -> date:
+    """date of a stored YYYY-MM-DD string, padded or not"""
+    return date.fromisoformat(_padded(date_str))
+
+
+def shift_date(date_str: str, days: int) -> str:
+    """Move an ISO date string by a number of days"""
+    return (parse_date(date_str) + timedelta(days=days)).isoformat()
+
+
+def nights_between(start_date: str, end_date: str) -> int:
+    """Number of nights between two ISO date strings"""
+    return (parse_date(end_date) - parse_date(start_date)).days
+
+
+class SortedBookings:
+    """Bookings kept sorted by start date so ranges can be found with bisect.
+
+    ISO dates sort lexicographically, so the start dates are bisected as
+    plain zero-padded strings. The longest stay is tracked so overlap
+    queries only need to look back that far from the start of the
+    requested range.
+    """
+
+    def __init__(self, bookings: Iterable) -> None:
+        stays = sorted(
+            ((_padded(b.start_date), _padded(b.end_date), b) for b in bookings),
+            key=lambda stay: stay[:2],
+        )
+        self._bookings = [booking for _, _, booking in stays]
+        self._starts = [start for start, _, _ in stays]
+        self._ends = [end for _, end, _ in stays]
+        self._max_nights = max(
+            (nights_between(start, end) for start, end, _ in stays),
+            default=0,
+        )
+
+    def __len__(self) -> int:
+        return len(self._bookings)
+
+    def all(self) -> List:
+        return list(self._bookings)
+
+    def starting_between(self, start_date: Optional[str], end_date: Optional[str]) -> List:
+        """Bookings whose check-in falls in [start_date, end_date)"""
+        lo = bisect_left(self._starts, start_date) if start_date else 0
+        hi = bisect_left(self._starts, end_date) if end_date else len(self._starts)
+        return self._bookings[lo:hi]
+
+    def overlapping(self, start_date: Optional[str], end_date: Optional[str]) -> List:
+        """Bookings that occupy at least one night in [start_date, end_date)"""
+        if not self._bookings:
+            return []
+        if start_date is None:
+            lo = 0
+        else:
+            lo = bisect_left(self._starts, shift_date(start_date, -self._max_nights))
+        hi = bisect_left(self._starts, end_date) if end_date else len(self._starts)
+        return [
+            self._bookings[i] for i in range(lo, hi)
+            if start_date is None or self._ends[i] > start_date
+        ]
+
+
+class BookingIndex:
+    """Date-sorted booking arrays, globally and per room"""
+
+    def __init__(self, bookings: Iterable) -> None:
+        bookings = list(bookings)
+        self._all = SortedBookings(bookings)
+        by_room: Dict[str, list] = {}
+        for booking in bookings:
+            by_room.setdefault(booking.room_id, []).append(booking)
+        self._by_room = {room_id: SortedBookings(items) for room_id, items in by_room.items()}
+
+    def _select(self, room_id: Optional[str]) -> SortedBookings:
+        if room_id is None:
+            return self._all
+        return self._by_room.get(room_id) or SortedBookings([])
+
+    def for_room(self, room_id: str) -> List:
+        return self._select(room_id).all()
+
+    def overlapping(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        room_id: Optional[str] = None,
+    ) -> List:
+        return self._select(room_id).overlapping(start_date, end_date)
+
+    def active_on(self, day: str, room_id: Optional[str] = None) -> List:
+        return self._select(room_id).overlapping(day, shift_date(day, 1))
+
+    def starting_between(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        room_id: Optional[str] = None,
+    ) -> List:
+        return self._select(room_id).starting_between(start_date, end_date)
+
+
+class RoomCapacityIndex:
+    """Rooms sorted by capacity for best-fit lookups.
+
+    Rooms without a numeric capacity are left out, since there is no way to
+    tell whether a party fits in them.
+    """
+
+    def __init__(self, rooms: Iterable[Dict]) -> None:
+        sized = [
+            room for room in rooms
+            if isinstance(room.get("capacity"), int) and not isinstance(room.get("capacity"), bool)
+        ]
+        self._rooms = sorted(sized, key=lambda r: (r["capacity"], r.get("name", "")))
+        self._capacities = [room["capacity"] for room in self._rooms]
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def fitting(self, party_size: int) -> List[Dict]:
+        """Rooms that hold at least party_size, smallest first"""
+        return self._rooms[bisect_left(self._capacities, party_size):]
+
+
+class RoomSchedule:
+    """Stays of one room, kept sorted by check-in for O(log n) free checks.
+
+    Stays may overlap each other (holds, or bookings written by racing
+    processes), so ends are not sorted. As in SortedBookings, the longest
+    stay bounds how far before the range a clashing stay can check in.
+    """
+
+    def __init__(self, bookings: Iterable = ()) -> None:
+        stays = sorted((b.start_date, b.end_date) for b in bookings)
+        self._starts = [start for start, _ in stays]
+        self._ends = [end for _, end in stays]
+        self._max_nights = max((nights_between(start, end) for start, end in stays), default=0)
+
+    def is_free(self, start_date: str, end_date: str) -> bool:
+        hi = bisect_left(self._starts, end_date)
+        lo = bisect_left(self._starts, shift_date(start_date, -self._max_nights), 0, hi)
+        return all(self._ends[i] <= start_date for i in range(lo, hi))
+
+    def reserve(self, start_date: str, end_date: str) -> None:
+        i = bisect_left(self._starts, start_date)
+        self._starts.insert(i, start_date)
+        self._ends.insert(i, end_date)
+        self._max_nights = max(self._max_nights, nights_between(start_date, end_date))
+
+
+def merge_conflicts(new_stays: Iterable, existing: Iterable) -> Iterator[Tuple]:
+    """Yield (new, existing) pairs that overlap, in one pass over both lists.
+
+    new_stays must already be in check-in order (as a recurrence generates
+    them); existing is sorted here. Existing stays may overlap each other,
+    so the forward pointer into existing trails each new stay by the
+    longest existing stay rather than stopping at the first one that ends.
+    """
+    existing = sorted(existing, key=lambda b: b.start_date)
+    max_nights = max((nights_between(b.start_date, b.end_date) for b in existing), default=0)
+    j = 0
+    for stay in new_stays:
+        earliest = shift_date(stay.start_date, -max_nights)
+        while j < len(existing) and existing[j].start_date < earliest:
+            j += 1
+        k = j
+        while k < len(existing) and existing[k].start_date < stay.end_date:
+            if existing[k].end_date > stay.start_date:
+                yield stay, existing[k]
+            k += 1
+
+
+class GapIndex:
+    """Free intervals between a room's stays, searchable by minimum length.
+
+    Gaps are kept in date order as day ordinals, with the last one open
+    ended. A max segment tree over the gap lengths finds the first gap
+    that is long enough in O(log n).
+    """
+
+    OPEN_END = date.max.toordinal()
+
+    def __init__(self, stays: Iterable[Sequence[str]]) -> None:
+        """Build from (check-in, check-out, ...) stays sorted by check-in"""
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        cursor = date.min.toordinal()
+        for start_date, end_date, *_ in stays:
+            start = parse_date(start_date).toordinal()
+            if start > cursor:
+                self._starts.append(cursor)
+                self._ends.append(start)
+            cursor = max(cursor, parse_date(end_date).toordinal())
+        self._starts.append(cursor)
+        self._ends.append(self.OPEN_END)
+
+        self._size = 1
+        while self._size < len(self._starts):
+            self._size *= 2
+        self._tree = [0] * (2 * self._size)
+        for i, (start, end) in enumerate(zip(self._starts, self._ends)):
+            self._tree[self._size + i] = end - start
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _first_fitting(self, node: int, lo: int, hi: int, first: int, nights: int) -> Optional[int]:
+        """Leftmost gap at position >= first with at least nights free days"""
+        if hi <= first or self._tree[node] < nights:
+            return None
+        if hi - lo == 1:
+            return lo
+        mid = (lo + hi) // 2
+        found = self._first_fitting(2 * node, lo, mid, first, nights)
+        if found is None:
+            found = self._first_fitting(2 * node + 1, mid, hi, first, nights)
+        return found
+
+    def earliest(self, nights: int, after: str, limit: int = 1) -> List[Tuple[str, str]]:
+        """Earliest (check-in, check-out) windows of the given length, one per gap"""
+        after_day = date.fromisoformat(after).toordinal()
+        windows: List[Tuple[str, str]] = []
+        # Only the gap around after_day can start before it
+        i = bisect_right(self._ends, after_day)
+        if i < len(self._starts) and limit > 0:
+            start = max(self._starts[i], after_day)
+            if start + nights <= self._ends[i]:
+                windows.append((start, start + nights))
+            i += 1
+        while len(windows) < limit:
+            j = self._first_fitting(1, 0, self._size, i, nights)
+            if j is None:
+                break
+            windows.append((self._starts[j], self._starts[j] + nights))
+            i = j + 1
+        return [
+            (date.fromordinal(start).isoformat(), date.fromordinal(end).isoformat())
+            for start, end in windows
+        ]
@@ -0,0 +1,192 @@
+"""Load generator that runs concurrent booking clients against a scratch database"""
+import math
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from booking import BOOKING_CONFLICT, SUCCESS, database
+from booking.context import get_context
+from booking.indexes import shift_date
+from booking.models.book import Booking, BookingService
+from booking.models.room import Room
+
+DEFAULT_MIX = {"book": 0.5, "query": 0.3, "next_free": 0.1, "list_rooms": 0.1}
+
+
+@dataclass
+class LoadTestConfig():
+    workers: int = 4
+    operations: int = 200
+    rooms: int = 20
+    # Room i is picked with weight 1 / (i + 1) ** hot_skew; 0 spreads load evenly
+    hot_skew: float = 1.0
+    horizon_days: int = 90
+    max_nights: int = 5
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: Optional[int] = None
+
+
+class WorkerResult(NamedTuple):
+    started: float
+    finished: float
+    latencies: Dict[str, List[float]]
+    conflicts: int
+    errors: int
+    booked_ids: List[str]
+
+
+class LatencySummary(NamedTuple):
+    count: int
+    p50: float
+    p99: float
+
+
+class LoadTestReport(NamedTuple):
+    workers: int
+    operations: int
+    elapsed: float
+    latencies: Dict[str, LatencySummary]
+    conflicts: int
+    errors: int
+    bookings: int
+    lost_updates: int
+    overlaps: List[Tuple[Booking, Booking]]
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bookings_per_second(self) -> float:
+        return self.bookings / self.elapsed if self.elapsed else 0.0
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: Iterable[float]) -> LatencySummary:
+    ordered = sorted(latencies)
+    return LatencySummary(len(ordered), percentile(ordered, 0.50), percentile(ordered, 0.99))
+
+
+def find_overlaps(bookings: Iterable[Booking]) -> List[Tuple[Booking, Booking]]:
+    """Pairs of bookings of the same room that share a night"""
+    by_room: Dict[str, List[Booking]] = {}
+    for booking in bookings:
+        by_room.setdefault(booking.room_id, []).append(booking)
+    overlaps = []
+    for room_bookings in by_room.values():
+        room_bookings.sort(key=lambda b: (b.start_date, b.end_date))
+        # Compare against the booking reaching furthest so far, so chains of
+        # three or more overlapping stays are all reported
+        latest = None
+        for booking in room_bookings:
+            if latest is not None and booking.start_date < latest.end_date:
+                overlaps.append((latest, booking))
+            if latest is None or booking.end_date > latest.end_date:
+                latest = booking
+    return overlaps
+
+
+def _seed_rooms(db_path: Path, count: int, rng: random.Random) -> List[Dict]:
+    rooms = [Room(uuid.uuid4(), f"Room {i:03d}", rng.randint(1, 6)).to_dict() for i in range(count)]
+    database.DatabaseHandler(db_path).write_many({"rooms": rooms, "bookings": []})
+    return rooms
+
+
+def _run_worker(db_path: Path, config: LoadTestConfig, rooms: List[Dict], first_day: str, worker: int) -> WorkerResult:
+    """Run one client's share of the operations; executed in a worker process"""
+    rng = random.Random(None if config.seed is None else config.seed + worker)
+    room_weights = [1 / (i + 1) ** config.hot_skew for i in range(len(rooms))]
+    operations, operation_weights = list(config.mix), list(config.mix.values())
+    context = get_context(db_path)
+    room_service, booking_service = context.rooms, context.bookings
+    latencies: Dict[str, List[float]] = {operation: [] for operation in operations}
+    conflicts = errors = 0
+    booked_ids = []
+
+    started = time.time()
+    for _ in range(config.operations):
+        operation = rng.choices(operations, operation_weights)[0]
+        room = rng.choices(rooms, room_weights)[0]
+        start_date = shift_date(first_day, rng.randrange(config.horizon_days))
+        nights = rng.randint(1, config.max_nights)
+        end_date = shift_date(start_date, nights)
+        begin = time.perf_counter()
+        try:
+            if operation == "book":
+                # add() checks for a clash and writes under one lock, like the book command
+                response = booking_service.add(room["name"], room["id"], start_date, end_date)
+                if response.error == SUCCESS:
+                    booked_ids.append(response.booking.id)
+                elif response.error == BOOKING_CONFLICT:
+                    conflicts += 1
+                else:
+                    errors += 1
+            elif operation == "query":
+                booking_service.query(room_id=room["id"], start_date=start_date, end_date=end_date)
+            elif operation == "next_free":
+                booking_service.next_free(room["id"], nights, start_date)
+            elif operation == "list_rooms":
+                room_service.get_rooms()
+            else:
+                raise ValueError(f"Unknown operation '{operation}'")
+        except (OSError, ValueError):
+            # A torn or concurrently replaced file shows up here
+            errors += 1
+        latencies[operation].append(time.perf_counter() - begin)
+    finished = time.time()
+
+    return WorkerResult(started, finished, latencies, conflicts, errors, booked_ids)
+
+
+def run_load_test(config: LoadTestConfig) -> LoadTestReport:
+    """Run config.workers client processes at once against a fresh temporary database.
+
+    Lost updates are successful bookings that are missing once every worker
+    has finished; overlaps are stored bookings of one room that share a night.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / "loadtest.json"
+        rooms = _seed_rooms(db_path, config.rooms, random.Random(config.seed))
+        first_day = (date.today() + timedelta(days=1)).isoformat()
+
+        with ProcessPoolExecutor(max_workers=config.workers) as executor:
+            futures = [
+                executor.submit(_run_worker, db_path, config, rooms, first_day, worker)
+                for worker in range(config.workers)
+            ]
+            results = [future.result() for future in futures]
+
+        stored = BookingService(db_path).get_bookings().list
+
+    stored_ids = {booking.id for booking in stored}
+    booked_ids = [booking_id for result in results for booking_id in result.booked_ids]
+    by_operation: Dict[str, List[float]] = {}
+    for result in results:
+        for operation, values in result.latencies.items():
+            by_operation.setdefault(operation, []).extend(values)
+    latencies = {operation: summarize(values) for operation, values in by_operation.items() if values}
+    latencies["all"] = summarize(value for values in by_operation.values() for value in values)
+
+    return LoadTestReport(
+        workers=config.workers,
+        operations=sum(len(values) for values in by_operation.values()),
+        elapsed=max(r.finished for r in results) - min(r.started for r in results),
+        latencies=latencies,
+        conflicts=sum(r.conflicts for r in results),
+        errors=sum(r.errors for r in results),
+        bookings=len(booked_ids),
+        lost_updates=sum(1 for booking_id in booked_ids if booking_id not in stored_ids),
+        overlaps=find_overlaps(stored),
+    )
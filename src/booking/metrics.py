@@ -0,0 +1,148 @@
+"""Process-wide counters and latency histograms in Prometheus text format"""
+import threading
+import time
+import urllib.request
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Monotonic count, optionally split by labels"""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Distribution of observed durations over fixed buckets"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._buckets = buckets
+        # One slot per bucket plus one for values above the last bound
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        slot = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[slot] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self._buckets, self._counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound:g}"}} {cumulative}')
+        cumulative += self._counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{self.name}_sum {self._sum:g}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class Registry:
+    """Named metrics of this process"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+DB_READ_SECONDS = REGISTRY.histogram("booking_db_read_seconds", "Time spent loading and parsing the database file")
+DB_WRITE_SECONDS = REGISTRY.histogram("booking_db_write_seconds", "Time spent writing the database file")
+DB_READ_BYTES = REGISTRY.counter("booking_db_read_bytes_total", "Bytes of database file parsed")
+DB_WRITE_BYTES = REGISTRY.counter("booking_db_written_bytes_total", "Bytes of database file written")
+DB_CACHE_HITS = REGISTRY.counter("booking_db_cache_hits_total", "Reads served from the parsed-file cache")
+DB_CACHE_MISSES = REGISTRY.counter("booking_db_cache_misses_total", "Reads that had to parse the database file")
+CHANGE_LOG_ERRORS = REGISTRY.counter("booking_change_log_errors_total", "Writes whose change-log entries could not be appended")
+DB_RECOVERY_SECONDS = REGISTRY.histogram("booking_db_recovery_seconds", "Time spent restoring the database from a snapshot and the log")
+CONFLICT_CHECK_SECONDS = REGISTRY.histogram("booking_conflict_check_seconds", "Time spent checking a booking for conflicts")
+BOOKINGS_REJECTED = REGISTRY.counter("booking_rejected_total", "Booking attempts rejected, by reason")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        return
+
+
+def serve(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Expose /metrics over HTTP from a background thread; call shutdown() to stop"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, name="booking-metrics", daemon=True).start()
+    return server
+
+
+def fetch(port: int, host: str = "127.0.0.1", timeout: float = 5.0) -> str:
+    """Metrics text served by another process's listener; raises OSError if nothing answers"""
+    with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=timeout) as response:
+        return response.read().decode()
@@ -0,0 +1,229 @@
+""" Asyncio wrappers around the room and booking services"""
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from booking.context import get_context
+from booking.models.book import BookServiceResponse
+from booking.models.room import RoomServiceResponse
+from booking.holds import DEFAULT_HOLD_TTL
+from booking.recurrence import RecurrenceRule
+
+DEFAULT_MAX_WORKERS = 4
+
+class _AsyncRunner:
+    """Runs blocking service calls off the event loop.
+
+    Calls go to a bounded thread pool. Identical reads that overlap share one
+    in-flight call, and writes run one at a time behind an asyncio lock. The
+    services hold their database transaction while writing, so writes from
+    every wrapper of one database are serialized as well. A
+    finished write drops the in-flight reads from the sharing table, so no
+    read issued after a write can be served an older result. Callers that
+    share a read also share the response object it returns.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, executor: Optional[Executor] = None) -> None:
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers, thread_name_prefix="booking-io")
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+
+    async def read(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so one cancelled caller doesn't cancel the load for the others
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def write(self, fn: Callable, *args, **kwargs) -> Any:
+        async with self._write_lock:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+            finally:
+                self._inflight.clear()
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+
+class AsyncRoomService():
+    """Non-blocking RoomService for use inside an asyncio application, sharing the process-wide context"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        read_only: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        executor: Optional[Executor] = None,
+    ):
+        self._service = get_context(db_path, read_only).rooms
+        self._runner = _AsyncRunner(max_workers, executor)
+
+    async def __aenter__(self) -> 'AsyncRoomService':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._runner.close()
+
+    async def get_rooms(self) -> RoomServiceResponse:
+        return await self._runner.read(("get_rooms",), self._service.get_rooms)
+
+    async def get_room_by_name(self, room_name: str) -> RoomServiceResponse:
+        return await self._runner.read(("get_room_by_name", room_name), self._service.get_room_by_name, room_name)
+
+    async def add(self, name: str, capacity: int) -> RoomServiceResponse:
+        return await self._runner.write(self._service.add, name, capacity)
+
+    async def edit(self, room_name: str, new_name: str, capacity: int) -> RoomServiceResponse:
+        return await self._runner.write(self._service.edit, room_name, new_name, capacity)
+
+    async def remove(self, room_name: str, cascade: bool = False) -> RoomServiceResponse:
+        return await self._runner.write(self._service.remove, room_name, cascade)
+
+
+class AsyncBookingService():
+    """Non-blocking BookingService for use inside an asyncio application, sharing the process-wide context"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        read_only: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        executor: Optional[Executor] = None,
+    ):
+        self._service = get_context(db_path, read_only).bookings
+        self._runner = _AsyncRunner(max_workers, executor)
+
+    async def __aenter__(self) -> 'AsyncBookingService':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._runner.close()
+
+    async def get_bookings(self) -> BookServiceResponse:
+        return await self._runner.read(("get_bookings",), self._service.get_bookings)
+
+    async def get_bookings_by_room(self, room_id: str) -> BookServiceResponse:
+        return await self._runner.read(("get_bookings_by_room", room_id), self._service.get_bookings_by_room, room_id)
+
+    async def get_series(self) -> BookServiceResponse:
+        return await self._runner.read(("get_series",), self._service.get_series)
+
+    async def query(
+        self,
+        room_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        active_on: Optional[str] = None,
+    ) -> BookServiceResponse:
+        key = ("query", room_id, start_date, end_date, active_on)
+        return await self._runner.read(key, self._service.query, room_id, start_date, end_date, active_on)
+
+    async def active_on(self, day: str, room_id: Optional[str] = None) -> BookServiceResponse:
+        return await self.query(room_id=room_id, active_on=day)
+
+    async def starting_between(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        room_id: Optional[str] = None,
+    ) -> BookServiceResponse:
+        key = ("starting_between", start_date, end_date, room_id)
+        return await self._runner.read(key, self._service.starting_between, start_date, end_date, room_id)
+
+    async def next_free(
+        self,
+        room_id: str,
+        nights: int,
+        after: Optional[str] = None,
+        limit: int = 1,
+    ) -> BookServiceResponse:
+        key = ("next_free", room_id, nights, after, limit)
+        return await self._runner.read(key, self._service.next_free, room_id, nights, after, limit)
+
+    async def next_free_any(
+        self,
+        nights: int,
+        after: Optional[str] = None,
+        limit: int = 1,
+        party_size: Optional[int] = None,
+    ) -> BookServiceResponse:
+        key = ("next_free_any", nights, after, limit, party_size)
+        return await self._runner.read(key, self._service.next_free_any, nights, after, limit, party_size)
+
+    async def get_history(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        room_id: Optional[str] = None,
+    ) -> BookServiceResponse:
+        key = ("get_history", start_date, end_date, room_id)
+        return await self._runner.read(key, self._service.get_history, start_date, end_date, room_id)
+
+    async def add(
+        self,
+        room_name: str,
+        room_id: str,
+        start_date: str,
+        end_date: str,
+        idempotency_key: Optional[str] = None,
+    ) -> BookServiceResponse:
+        return await self._runner.write(self._service.add, room_name, room_id, start_date, end_date, idempotency_key)
+
+    async def add_many(self, new_bookings: List[Tuple[str, str, str, str]]) -> BookServiceResponse:
+        return await self._runner.write(self._service.add_many, new_bookings)
+
+    async def add_series(
+        self,
+        room_name: str,
+        room_id: str,
+        start_date: str,
+        end_date: str,
+        rule: RecurrenceRule,
+        skip_conflicts: bool = False,
+    ) -> BookServiceResponse:
+        return await self._runner.write(
+            self._service.add_series, room_name, room_id, start_date, end_date, rule, skip_conflicts
+        )
+
+    async def cancel_occurrence(self, series_id: str, start_date: str) -> BookServiceResponse:
+        return await self._runner.write(self._service.cancel_occurrence, series_id, start_date)
+
+    async def archive(self, before: Optional[str] = None) -> BookServiceResponse:
+        return await self._runner.write(self._service.archive, before)
+
+    # Holds live in memory on the wrapped service; they go through the write
+    # lock so the hold store is only ever touched by one thread at a time.
+
+    async def hold(
+        self,
+        room_name: str,
+        room_id: str,
+        start_date: str,
+        end_date: str,
+        ttl: float = DEFAULT_HOLD_TTL,
+    ) -> BookServiceResponse:
+        return await self._runner.write(self._service.hold, room_name, room_id, start_date, end_date, ttl)
+
+    async def confirm(self, hold_id: str) -> BookServiceResponse:
+        return await self._runner.write(self._service.confirm, hold_id)
+
+    async def release(self, hold_id: str) -> BookServiceResponse:
+        return await self._runner.write(self._service.release, hold_id)
@@ -0,0 +1,137 @@
+""" Room allocation model-controller"""
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from booking import SUCCESS, NO_ROOM_AVAILABLE, INVALID_DATE, metrics
+from booking.database import DatabaseHandler, transactional
+from booking.indexes import RoomCapacityIndex, RoomSchedule
+from booking.models.book import Booking, BookingService
+from booking.models.room import RoomService
+from booking.validators import DATES_OK, BookingValidator, normalize_date
+
+class AllocationRequest(NamedTuple):
+    party_size: int
+    start_date: str
+    end_date: str
+
+class AllocationResponse(NamedTuple):
+    request: AllocationRequest
+    room: Optional[Dict] = None
+    booking: Optional[Booking] = None
+    error: int = SUCCESS
+
+class AllocationService():
+    """Assigns the smallest free room that fits a party"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        room_service: Optional[RoomService] = None,
+        booking_service: Optional[BookingService] = None,
+    ):
+        # Services built here share one handler, and with it one cache and index
+        given = room_service or booking_service
+        db_handler = given._db_handler if given is not None else DatabaseHandler(db_path)
+        self._room_service = room_service or RoomService(db_path, db_handler=db_handler)
+        self._booking_service = booking_service or BookingService(db_path, db_handler=db_handler)
+        self._db_handler = self._booking_service._db_handler
+
+    def _capacity_index(self) -> RoomCapacityIndex:
+        return RoomCapacityIndex(self._room_service._db_handler.indexes().rooms())
+
+    def _schedule(self, room_id: str) -> RoomSchedule:
+        """A room's stays and unexpired holds"""
+        return RoomSchedule(
+            self._booking_service.get_stays(room_id).list + self._booking_service.get_holds_by_room(room_id)
+        )
+
+    def find_room(self, party_size: int, start_date: str, end_date: str) -> AllocationResponse:
+        """Find the smallest room that fits the party and is free for the dates"""
+        request = AllocationRequest(party_size, start_date, end_date)
+        is_valid, _ = BookingValidator.validate_booking_dates(start_date, end_date)
+        if not is_valid:
+            return AllocationResponse(request, error=INVALID_DATE)
+        start_date, end_date = normalize_date(start_date), normalize_date(end_date)
+
+        for room in self._capacity_index().fitting(party_size):
+            if self._booking_service.get_stays(room["id"], start_date, end_date).list:
+                continue
+            held = any(
+                hold.start_date < end_date and hold.end_date > start_date
+                for hold in self._booking_service.get_holds_by_room(room["id"])
+            )
+            if not held:
+                return AllocationResponse(request, room=room)
+
+        metrics.BOOKINGS_REJECTED.inc(reason="no_room")
+        return AllocationResponse(request, error=NO_ROOM_AVAILABLE)
+
+    def allocate(self, party_size: int, start_date: str, end_date: str) -> AllocationResponse:
+        """Find the best-fit room for the party and book it"""
+        return self.allocate_batch([AllocationRequest(party_size, start_date, end_date)])[0]
+
+    @transactional
+    def allocate_batch(self, requests: List[AllocationRequest]) -> List[AllocationResponse]:
+        """Assign rooms to many requests at once and persist them in a single write.
+
+        Requests are placed greedily, largest party first and earliest check-in
+        next, so big groups get the few big rooms before smaller groups can
+        take them. Each request takes the smallest room that is neither booked
+        nor held. The whole batch runs in the database transaction, so no
+        other writer can book a room between the check and the write.
+        Results are returned in the order the requests were given.
+        """
+        # Stored dates are zero-padded; what isn't a date at all is left for the validator to reject
+        requests = [
+            AllocationRequest(
+                party_size,
+                normalize_date(start_date) or start_date,
+                normalize_date(end_date) or end_date,
+            )
+            for party_size, start_date, end_date in requests
+        ]
+        results: List[Optional[AllocationResponse]] = [None] * len(requests)
+        capacity_index = self._capacity_index()
+        schedules: Dict[str, RoomSchedule] = {}
+
+        date_codes = BookingValidator.validate_booking_dates_batch(
+            [request.start_date for request in requests],
+            [request.end_date for request in requests],
+        )
+        pending = []
+        for position, (request, code) in enumerate(zip(requests, date_codes)):
+            if code == DATES_OK:
+                pending.append(position)
+            else:
+                results[position] = AllocationResponse(request, error=INVALID_DATE)
+
+        pending.sort(key=lambda p: (-requests[p].party_size, requests[p].start_date))
+
+        assigned = []
+        for position in pending:
+            request = requests[position]
+            for room in capacity_index.fitting(request.party_size):
+                schedule = schedules.get(room["id"])
+                if schedule is None:
+                    schedule = schedules[room["id"]] = self._schedule(room["id"])
+                if schedule.is_free(request.start_date, request.end_date):
+                    schedule.reserve(request.start_date, request.end_date)
+                    assigned.append((position, room))
+                    break
+            else:
+                metrics.BOOKINGS_REJECTED.inc(reason="no_room")
+                results[position] = AllocationResponse(request, error=NO_ROOM_AVAILABLE)
+
+        if assigned:
+            write = self._booking_service.add_many([
+                (room["name"], room["id"], requests[p].start_date, requests[p].end_date)
+                for p, room in assigned
+            ])
+            for i, (position, room) in enumerate(assigned):
+                if write.error != SUCCESS:
+                    results[position] = AllocationResponse(requests[position], error=write.error)
+                else:
+                    results[position] = AllocationResponse(
+                        requests[position], room=room, booking=write.list[i]
+                    )
+
+        return results
@@ -1,17 +1,25 @@
 """ Booking model-controller"""
 import uuid
-from booking import DB_READ_ERROR, DB_WRITE_ERROR, SUCCESS, ERROR_ELEMENT_NOT_FOUND
-from typing import Any, Dict, NamedTuple
-from datetime import datetime
+from booking import DB_READ_ERROR, DB_WRITE_ERROR, JSON_ERROR, SUCCESS, ERROR_ELEMENT_NOT_FOUND, BOOKING_CONFLICT, INVALID_DATE, READ_ONLY_ERROR, HOLD_EXPIRED
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from booking.database import DatabaseHandler
-from dataclasses import dataclass
-from booking import database
+from booking.database import DatabaseHandler, transactional
+from dataclasses import dataclass, replace
+from booking import database, metrics
+from booking.indexes import BookingIndex, GapIndex, RoomCapacityIndex, merge_conflicts, nights_between, parse_date, shift_date
+from booking.recurrence import RecurrenceRule, expand_stays
+from booking.archive import Archive, archive_path
+from booking.holds import DEFAULT_HOLD_TTL, Hold, HoldStore
+from booking.idempotency import IdempotencyStore, idempotency_path
+from booking.validators import BookingValidator, normalize_date
 
 class BookServiceResponse(NamedTuple):
     booking: 'Booking' = None
-    list: list['Booking'] = None
+    list: List['Booking'] = None
     error: int = SUCCESS
+    series: 'BookingSeries' = None
+    hold: 'Hold' = None
 
 @dataclass
 class Booking():
@@ -30,16 +38,86 @@ class Booking():
             "end_date": self.end_date
         }
 
+@dataclass
+class BookingSeries():
+    """A repeating booking stored as its first stay, a rule and skipped dates"""
+    id: str
+    room_name: str
+    room_id: str
+    start_date: str
+    end_date: str
+    rule: RecurrenceRule
+    exceptions: List[str]
+    
+    def occurrences(self) -> Iterator[Booking]:
+        """Lazily expand the series into one booking per stay"""
+        stays = expand_stays(self.id, self.start_date, self.end_date, self.rule, self.exceptions)
+        for occurrence_id, start, end in stays:
+            yield Booking(
+                id=occurrence_id,
+                room_name=self.room_name,
+                room_id=self.room_id,
+                start_date=start,
+                end_date=end
+            )
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "room_name": self.room_name,
+            "room_id": self.room_id,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "rule": self.rule.to_dict(),
+            "exceptions": list(self.exceptions)
+        }
+    
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'BookingSeries':
+        return BookingSeries(
+            id=data.get("id", ""),
+            room_name=data.get("room_name", ""),
+            room_id=data.get("room_id", ""),
+            start_date=data.get("start_date", ""),
+            end_date=data.get("end_date", ""),
+            rule=RecurrenceRule(**data.get("rule", {})),
+            exceptions=data.get("exceptions", [])
+        )
+
+@dataclass
+class FreeWindow():
+    """A stretch of nights during which a room has no bookings"""
+    room_name: str
+    room_id: str
+    start_date: str
+    end_date: str
+
 class BookingService():
     
-    def __init__(self, db_path: Path):
-        self._db_handler = database.DatabaseHandler(db_path)
+    # Finished bookings are moved to the archive on the next write once at
+    # least this many of them have piled up in the database file
+    AUTO_ARCHIVE_THRESHOLD = 100
+    
+    # Idempotency keys are remembered for a day, and only the newest ones are kept
+    IDEMPOTENCY_TTL = 24 * 60 * 60
+    IDEMPOTENCY_MAX_KEYS = 10000
+    
+    def __init__(self, db_path: Path, read_only: bool = False, db_handler: Optional[DatabaseHandler] = None):
+        self._db_handler = db_handler or database.DatabaseHandler(db_path, read_only=read_only)
+        self._archive = Archive(archive_path(Path(db_path)))
+        self._holds = HoldStore()
+        self._idempotency = IdempotencyStore(idempotency_path(Path(db_path)))
+        self._index = None
+        self._index_version = None
+        self._gaps: Dict[str, GapIndex] = {}
+        self._gaps_version = None
     
     def get_bookings(self) -> BookServiceResponse:
-        """Get all bookings from database"""
+        """Get all bookings from database, with recurring series expanded"""
         read = self._db_handler.read("bookings")
+        series = self.get_series().list
         
-        if read.code != SUCCESS:
+        if read.code != SUCCESS and not series:
             return BookServiceResponse(list=[], error=read.code)
         
         bookings = [
@@ -50,11 +128,21 @@ class BookingService():
                 start_date=booking.get("start_date", ""),
                 end_date=booking.get("end_date", "")
             )
-            for booking in read.list
+            for booking in (read.list if read.code == SUCCESS else [])
         ]
+        bookings.extend(occurrence for s in series for occurrence in s.occurrences())
         
         return BookServiceResponse(list=bookings, error=SUCCESS)
     
+    def get_series(self) -> BookServiceResponse:
+        """Get all recurring booking series from database"""
+        read = self._db_handler.read("series")
+        
+        if read.code not in (SUCCESS, JSON_ERROR):
+            return BookServiceResponse(list=[], error=read.code)
+        
+        return BookServiceResponse(list=[BookingSeries.from_dict(s) for s in read.list], error=SUCCESS)
+    
     def get_bookings_by_room(self, room_id: str) -> BookServiceResponse:
         """Get all bookings for a specific room"""
         response = self.get_bookings()
@@ -65,29 +153,482 @@ class BookingService():
         room_bookings = [b for b in response.list if b.room_id == room_id]
         return BookServiceResponse(list=room_bookings, error=SUCCESS)
     
-    def add(self, room_name: str, room_id: str, start_date: str, end_date: str) -> BookServiceResponse:
-        """Add a new booking"""
-        booking = Booking(
+    def _get_index(self) -> BookingIndex:
+        """Date index over all bookings, rebuilt only when the database file changes"""
+        version = self._db_handler.version()
+        # Work on a local; a write in another thread may reset self._index meanwhile
+        index = self._index
+        if index is None or version != self._index_version:
+            index = BookingIndex(self.get_bookings().list)
+            self._index, self._index_version = index, version
+        return index
+    
+    def get_stays(
+        self,
+        room_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> BookServiceResponse:
+        """Get a room's bookings, optionally only those in [start_date, end_date), from the persisted index"""
+        try:
+            index = self._db_handler.indexes()
+        except OSError:
+            return BookServiceResponse(list=[], error=DB_READ_ERROR)
+        
+        if start_date and end_date:
+            stays = index.overlapping(room_id, start_date, end_date)
+        else:
+            stays = index.stays(room_id)
+        room = index.room_by_id(room_id) or {}
+        bookings = [
+            Booking(
+                id=stay_id,
+                room_name=room.get("name", ""),
+                room_id=room_id,
+                start_date=start,
+                end_date=end
+            )
+            for start, end, stay_id in stays
+        ]
+        return BookServiceResponse(list=bookings, error=SUCCESS)
+    
+    def query(
+        self,
+        room_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        active_on: Optional[str] = None,
+    ) -> BookServiceResponse:
+        """Get bookings for a room and/or overlapping [start_date, end_date)"""
+        index = self._get_index()
+        if active_on:
+            bookings = index.active_on(active_on, room_id)
+            if start_date or end_date:
+                bookings = [
+                    b for b in bookings
+                    if (not end_date or b.start_date < end_date)
+                    and (not start_date or b.end_date > start_date)
+                ]
+        else:
+            bookings = index.overlapping(start_date, end_date, room_id)
+        return BookServiceResponse(list=bookings, error=SUCCESS)
+    
+    def active_on(self, day: str, room_id: Optional[str] = None) -> BookServiceResponse:
+        """Get bookings that occupy the given night"""
+        return self.query(room_id=room_id, active_on=day)
+    
+    def starting_between(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        room_id: Optional[str] = None,
+    ) -> BookServiceResponse:
+        """Get bookings whose check-in falls in [start_date, end_date)"""
+        bookings = self._get_index().starting_between(start_date, end_date, room_id)
+        return BookServiceResponse(list=bookings, error=SUCCESS)
+    
+    def starting_this_week(self, today: Optional[date] = None, room_id: Optional[str] = None) -> BookServiceResponse:
+        """Get bookings with check-in between this Monday and next Monday"""
+        today = today or date.today()
+        monday = today - timedelta(days=today.weekday())
+        next_monday = monday + timedelta(days=7)
+        return self.starting_between(monday.isoformat(), next_monday.isoformat(), room_id)
+    
+    def _gap_index(self, index, room_id: str) -> GapIndex:
+        """Free gaps of a room, built from the persisted index on first use after a write.
+        
+        Unexpired holds count as taken. They come and go without a write, so
+        the gaps of a held room are built on every call instead of cached.
+        """
+        holds = self._holds.for_room(room_id)
+        if holds:
+            stays = index.stays(room_id) + [[hold.start_date, hold.end_date] for hold in holds]
+            return GapIndex(sorted(stays, key=lambda stay: parse_date(stay[0])))
+        version = self._db_handler.version()
+        if version != self._gaps_version:
+            self._gaps = {}
+            self._gaps_version = version
+        gaps = self._gaps.get(room_id)
+        if gaps is None:
+            gaps = self._gaps[room_id] = GapIndex(index.stays(room_id))
+        return gaps
+    
+    @staticmethod
+    def _search_start(after: Optional[str]) -> Optional[str]:
+        """First check-in date a free-window search may offer, None if after isn't a date"""
+        today = date.today().isoformat()
+        if not after:
+            return today
+        after = normalize_date(after)
+        return max(after, today) if after is not None else None
+    
+    def next_free(
+        self,
+        room_id: str,
+        nights: int,
+        after: Optional[str] = None,
+        limit: int = 1,
+    ) -> BookServiceResponse:
+        """Get the earliest windows of the given length when a room is free, checking in on or after `after`.
+        
+        Windows never start before today, whatever `after` says.
+        """
+        after = self._search_start(after)
+        if nights < 1 or after is None:
+            return BookServiceResponse(list=[], error=INVALID_DATE)
+        try:
+            index = self._db_handler.indexes()
+        except OSError:
+            return BookServiceResponse(list=[], error=DB_READ_ERROR)
+        
+        room = index.room_by_id(room_id)
+        if room is None:
+            return BookServiceResponse(list=[], error=ERROR_ELEMENT_NOT_FOUND)
+        windows = [
+            FreeWindow(room_name=room.get("name", ""), room_id=room_id, start_date=start, end_date=end)
+            for start, end in self._gap_index(index, room_id).earliest(nights, after, limit)
+        ]
+        return BookServiceResponse(list=windows, error=SUCCESS)
+    
+    def next_free_any(
+        self,
+        nights: int,
+        after: Optional[str] = None,
+        limit: int = 1,
+        party_size: Optional[int] = None,
+    ) -> BookServiceResponse:
+        """Get the earliest free windows across all rooms, optionally only rooms that fit party_size"""
+        after = self._search_start(after)
+        if nights < 1 or after is None:
+            return BookServiceResponse(list=[], error=INVALID_DATE)
+        try:
+            index = self._db_handler.indexes()
+        except OSError:
+            return BookServiceResponse(list=[], error=DB_READ_ERROR)
+        
+        rooms = RoomCapacityIndex(index.rooms()).fitting(party_size) if party_size else index.rooms()
+        windows = []
+        for room in rooms:
+            room_id = str(room.get("id"))
+            windows.extend(
+                FreeWindow(room_name=room.get("name", ""), room_id=room_id, start_date=start, end_date=end)
+                for start, end in self._gap_index(index, room_id).earliest(nights, after, limit)
+            )
+        windows.sort(key=lambda w: (w.start_date, w.room_name))
+        return BookServiceResponse(list=windows[:limit], error=SUCCESS)
+    
+    def get_idempotent_booking(self, idempotency_key: str) -> BookServiceResponse:
+        """Get the booking created earlier with this idempotency key, if it hasn't expired"""
+        booking = self._idempotency.get(idempotency_key)
+        if booking is None:
+            return BookServiceResponse(error=ERROR_ELEMENT_NOT_FOUND)
+        return BookServiceResponse(booking=Booking(**booking), error=SUCCESS)
+    
+    @transactional
+    def add(
+        self,
+        room_name: str,
+        room_id: str,
+        start_date: str,
+        end_date: str,
+        idempotency_key: Optional[str] = None,
+    ) -> BookServiceResponse:
+        """Add a new booking.
+        
+        If a booking was already added with the same idempotency key, it is
+        returned as is and nothing is written. If the room is booked or held
+        for any of the nights, nothing is written and the clashing booking or
+        hold is returned with BOOKING_CONFLICT.
+        """
+        if idempotency_key:
+            previous = self.get_idempotent_booking(idempotency_key)
+            if previous.error == SUCCESS:
+                return previous
+        
+        response = self.add_many([(room_name, room_id, start_date, end_date)], [idempotency_key])
+        
+        if response.error != SUCCESS:
+            return BookServiceResponse(list=response.list, error=response.error)
+        
+        return BookServiceResponse(booking=response.list[0], error=SUCCESS)
+    
+    @transactional
+    def add_many(
+        self,
+        new_bookings: List[Tuple[str, str, str, str]],
+        idempotency_keys: Optional[List[Optional[str]]] = None,
+    ) -> BookServiceResponse:
+        """Add several (room_name, room_id, start_date, end_date) bookings in one write.
+        
+        Dates are stored zero-padded; if any of them isn't a date, nothing is
+        written. The bookings are checked against the stored ones, unexpired
+        holds and each other inside the transaction, so no other writer can
+        take the dates between the check and the write. On a clash nothing
+        is written and the clashing booking or hold is returned with
+        BOOKING_CONFLICT.
+        """
+        created = [
+            Booking(
+                id=str(uuid.uuid4()),
+                room_name=room_name,
+                room_id=room_id,
+                start_date=normalize_date(start_date),
+                end_date=normalize_date(end_date)
+            )
+            for room_name, room_id, start_date, end_date in new_bookings
+        ]
+        if any(b.start_date is None or b.end_date is None for b in created):
+            return BookServiceResponse(list=[], error=INVALID_DATE)
+        
+        conflict = self._find_batch_conflict(created)
+        if conflict is not None:
+            metrics.BOOKINGS_REJECTED.inc(reason="hold" if isinstance(conflict, Hold) else "conflict")
+            return BookServiceResponse(list=[conflict], error=BOOKING_CONFLICT)
+        
+        # Get all stored single bookings; series occurrences are not materialized
+        bookings_data = self._db_handler.read("bookings").list
+        
+        # Piggyback on this write to move finished bookings out of the hot set
+        if not self._db_handler.is_read_only():
+            finished, hot = self._split_finished(bookings_data, date.today().isoformat())
+            if len(finished) >= self.AUTO_ARCHIVE_THRESHOLD:
+                self._archive.append(finished)
+                bookings_data = hot
+        
+        # Add new bookings
+        write_response = self._db_handler.write("bookings", bookings_data + [b.to_dict() for b in created])
+        self._index = None
+        
+        if write_response.code != SUCCESS:
+            return BookServiceResponse(list=[], error=write_response.code)
+        
+        # Still inside the transaction, so a retry can't slip in before the key is stored
+        keyed = [(key, booking.to_dict()) for booking, key in zip(created, idempotency_keys or []) if key]
+        if keyed:
+            try:
+                self._idempotency.remember(keyed, self.IDEMPOTENCY_TTL, self.IDEMPOTENCY_MAX_KEYS)
+            except OSError:
+                # The bookings are stored; only a retry's deduplication is lost
+                pass
+        
+        return BookServiceResponse(list=created, error=SUCCESS)
+    
+    @staticmethod
+    def _split_finished(bookings_data: List[Dict[str, Any]], before: str) -> Tuple[List, List]:
+        """Split stored bookings into those checked out by before and the rest"""
+        finished, hot = [], []
+        for booking in bookings_data:
+            (finished if booking.get("end_date", "") <= before else hot).append(booking)
+        return finished, hot
+    
+    @transactional
+    def archive(self, before: Optional[str] = None) -> BookServiceResponse:
+        """Move bookings checked out on or before the given date (today by default) to the archive.
+        
+        A date after today is refused: it would archive current and future
+        bookings, and conflict checks would no longer see them.
+        """
+        today = date.today().isoformat()
+        if before and before > today:
+            return BookServiceResponse(list=[], error=INVALID_DATE)
+        before = before or today
+        finished, hot = self._split_finished(self._db_handler.read("bookings").list, before)
+        
+        if not finished:
+            return BookServiceResponse(list=[], error=SUCCESS)
+        if self._db_handler.is_read_only():
+            return BookServiceResponse(list=[], error=READ_ONLY_ERROR)
+        
+        # Archive first: a failed write below leaves a duplicate, never a loss
+        self._archive.append(finished)
+        write_response = self._db_handler.write("bookings", hot)
+        self._index = None
+        
+        if write_response.code != SUCCESS:
+            return BookServiceResponse(list=[], error=write_response.code)
+        
+        return BookServiceResponse(list=[Booking(**b) for b in finished], error=SUCCESS)
+    
+    def get_history(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        room_id: Optional[str] = None,
+    ) -> BookServiceResponse:
+        """Get current and archived bookings occupying a night in [start_date, end_date)"""
+        bookings = self.query(room_id=room_id, start_date=start_date, end_date=end_date).list
+        seen = {b.id for b in bookings}
+        for archived in self._archive.read(start_date, end_date):
+            if archived["id"] in seen or (room_id and archived["room_id"] != room_id):
+                continue
+            bookings.append(Booking(**archived))
+        bookings.sort(key=lambda b: (b.start_date, b.end_date))
+        return BookServiceResponse(list=bookings, error=SUCCESS)
+    
+    @transactional
+    def add_series(
+        self,
+        room_name: str,
+        room_id: str,
+        start_date: str,
+        end_date: str,
+        rule: RecurrenceRule,
+        skip_conflicts: bool = False,
+    ) -> BookServiceResponse:
+        """Add a recurring booking whose first stay is [start_date, end_date).
+        
+        Every occurrence is checked against the room's bookings and unexpired
+        holds in a single merge pass. On conflict nothing is written and the
+        clashing bookings or holds are returned, unless skip_conflicts is set, in which case the clashing
+        dates are stored as exceptions of the series.
+        """
+        start_date, end_date = normalize_date(start_date), normalize_date(end_date)
+        if start_date is None or end_date is None:
+            return BookServiceResponse(list=[], error=INVALID_DATE)
+        if rule.until is not None:
+            rule = replace(rule, until=normalize_date(rule.until) or rule.until)
+        is_valid, _ = rule.validate(nights_between(start_date, end_date), start_date)
+        if not is_valid:
+            return BookServiceResponse(list=[], error=INVALID_DATE)
+        
+        series = BookingSeries(
             id=str(uuid.uuid4()),
             room_name=room_name,
             room_id=room_id,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            rule=rule,
+            exceptions=[]
         )
         
-        # Get all existing bookings
-        response = self.get_bookings()
-        if response.error != SUCCESS:
-            bookings = []
-        else:
-            bookings = response.list
+        existing = self.get_stays(room_id).list + self._holds.for_room(room_id)
+        with metrics.CONFLICT_CHECK_SECONDS.time():
+            conflicts = list(merge_conflicts(series.occurrences(), existing))
+        if conflicts and not skip_conflicts:
+            metrics.BOOKINGS_REJECTED.inc(reason="conflict")
+            clashing = list({booking.id: booking for _, booking in conflicts}.values())
+            return BookServiceResponse(list=clashing, error=BOOKING_CONFLICT)
+        series.exceptions = sorted({occurrence.start_date for occurrence, _ in conflicts})
+        if next(series.occurrences(), None) is None:
+            # Every stay was skipped; storing the series would book nothing
+            clashing = list({booking.id: booking for _, booking in conflicts}.values())
+            return BookServiceResponse(list=clashing, error=BOOKING_CONFLICT)
+        
+        series_data = self._db_handler.read("series").list + [series.to_dict()]
+        write_response = self._db_handler.write("series", series_data)
+        self._index = None
+        
+        if write_response.code != SUCCESS:
+            return BookServiceResponse(list=[], error=write_response.code)
+        
+        return BookServiceResponse(series=series, error=SUCCESS)
+    
+    @transactional
+    def cancel_occurrence(self, series_id: str, start_date: str) -> BookServiceResponse:
+        """Skip one stay of a series by recording its check-in date as an exception"""
+        series_data = self._db_handler.read("series").list
+        
+        index = next((i for i, s in enumerate(series_data) if s.get("id") == series_id), -1)
+        if index == -1:
+            return BookServiceResponse(error=ERROR_ELEMENT_NOT_FOUND)
+        
+        series = BookingSeries.from_dict(series_data[index])
+        if start_date not in series.rule.start_dates(series.start_date):
+            return BookServiceResponse(error=ERROR_ELEMENT_NOT_FOUND)
         
-        # Add new booking
-        bookings_data = [b.to_dict() for b in bookings] + [booking.to_dict()]
+        series.exceptions = sorted(set(series.exceptions) | {start_date})
+        series_data[index] = series.to_dict()
         
-        write_response = self._db_handler.write("bookings", bookings_data)
+        write_response = self._db_handler.write("series", series_data)
+        self._index = None
         
         if write_response.code != SUCCESS:
             return BookServiceResponse(error=write_response.code)
         
-        return BookServiceResponse(booking=booking, error=SUCCESS)
\ No newline at end of file
+        return BookServiceResponse(series=series, error=SUCCESS)
+    
+    def get_holds_by_room(self, room_id: str) -> List[Hold]:
+        """Unexpired holds on a room"""
+        return self._holds.for_room(room_id)
+    
+    def _find_conflict(self, room_id: str, start_date: str, end_date: str, include_holds: bool) -> Optional[Any]:
+        """First booking, or hold if asked, that overlaps the dates"""
+        with metrics.CONFLICT_CHECK_SECONDS.time():
+            overlapping = self.get_stays(room_id, start_date, end_date).list
+            if overlapping:
+                return overlapping[0]
+            if include_holds:
+                for hold in self._holds.for_room(room_id):
+                    if hold.start_date < end_date and hold.end_date > start_date:
+                        return hold
+        return None
+    
+    def _find_batch_conflict(self, bookings: List[Booking]) -> Optional[Any]:
+        """First booking or hold, stored or earlier in the list, that one of the bookings overlaps"""
+        accepted: Dict[str, List[Booking]] = {}
+        for booking in bookings:
+            for other in accepted.get(booking.room_id, []):
+                if other.start_date < booking.end_date and other.end_date > booking.start_date:
+                    return other
+            conflict = self._find_conflict(booking.room_id, booking.start_date, booking.end_date, include_holds=True)
+            if conflict is not None:
+                return conflict
+            accepted.setdefault(booking.room_id, []).append(booking)
+        return None
+    
+    def hold(
+        self,
+        room_name: str,
+        room_id: str,
+        start_date: str,
+        end_date: str,
+        ttl: float = DEFAULT_HOLD_TTL,
+    ) -> BookServiceResponse:
+        """Reserve a room for ttl seconds without writing to the database.
+        
+        The dates are checked like those of a booking; INVALID_DATE is
+        returned for anything that couldn't be booked.
+        """
+        start_date, end_date = normalize_date(start_date), normalize_date(end_date)
+        if start_date is None or end_date is None:
+            return BookServiceResponse(error=INVALID_DATE)
+        # Not validate_booking_dates: a refused hold isn't a rejected booking
+        is_valid, _ = BookingValidator._validate_booking_dates(start_date, end_date)
+        if not is_valid:
+            return BookServiceResponse(error=INVALID_DATE)
+        conflict = self._find_conflict(room_id, start_date, end_date, include_holds=True)
+        if conflict is not None:
+            return BookServiceResponse(list=[conflict], error=BOOKING_CONFLICT)
+        
+        hold = Hold(
+            id=str(uuid.uuid4()),
+            room_name=room_name,
+            room_id=room_id,
+            start_date=start_date,
+            end_date=end_date,
+            expires_at=self._holds.now() + ttl
+        )
+        self._holds.add(hold)
+        return BookServiceResponse(hold=hold, error=SUCCESS)
+    
+    @transactional
+    def confirm(self, hold_id: str) -> BookServiceResponse:
+        """Turn an unexpired hold into a persisted booking"""
+        # Taken out first so the booking doesn't clash with its own hold
+        hold = self._holds.pop(hold_id)
+        if hold is None:
+            return BookServiceResponse(error=HOLD_EXPIRED)
+        
+        # add() re-checks the dates: another process may have booked them while the hold was open
+        response = self.add(hold.room_name, hold.room_id, hold.start_date, hold.end_date)
+        if response.error not in (SUCCESS, BOOKING_CONFLICT):
+            # Nothing was written; keep the hold so confirming can be retried
+            self._holds.add(hold)
+        return response
+    
+    def release(self, hold_id: str) -> BookServiceResponse:
+        """Give up a hold before it expires"""
+        hold = self._holds.pop(hold_id)
+        if hold is None:
+            return BookServiceResponse(error=HOLD_EXPIRED)
+        return BookServiceResponse(hold=hold, error=SUCCESS)
@@ -1,8 +1,10 @@
 import uuid
 from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 from booking import database
+from booking.database import transactional
 from pathlib import Path
-from booking import ERRORS, SUCCESS, ERROR_ELEMENT_NOT_FOUND, DUPLICATED_ROOM_NAME
+from booking import ERRORS, SUCCESS, ERROR_ELEMENT_NOT_FOUND, DUPLICATED_ROOM_NAME, JSON_ERROR, DB_READ_ERROR, ROOM_HAS_BOOKINGS
 
 @dataclass
 class Room():
@@ -22,14 +24,22 @@ class RoomServiceResponse():
     list: list[Room]
     error: str
     
+def normalize_room_name(name: str) -> str:
+    """Room names are stored with a trailing period"""
+    return name if name.endswith('.') else name + '.'
+
 class RoomService():
         
-    def __init__(self, db_path: Path):
-        self._db_handler = database.DatabaseHandler(db_path)
+    def __init__(self, db_path: Path, read_only: bool = False, db_handler: Optional[database.DatabaseHandler] = None):
+        self._db_handler = db_handler or database.DatabaseHandler(db_path, read_only=read_only)
     
     def get_rooms(self) -> list[Room]:
         read = self._db_handler.read("rooms")
         
+        if read.code == JSON_ERROR:
+            # No rooms stored yet
+            return RoomServiceResponse([], SUCCESS)
+        
         if read.code:
             return RoomServiceResponse([], ERRORS[read.code])
         
@@ -40,8 +50,9 @@ class RoomService():
         
         return RoomServiceResponse(rooms_data, SUCCESS)
         
+    @transactional
     def add(self, name: str, capacity: int)->Room:
-        name += ('.' if not name.endswith('.') else '').capitalize()
+        name = normalize_room_name(name)
         capacity = capacity if capacity > -1 else 'not informed'
         
         room = Room(
@@ -59,49 +70,105 @@ class RoomService():
             
         room_list.append(room.to_dict())
         
-        self._db_handler.write("rooms", room_list)
+        write = self._db_handler.write("rooms", room_list)
+        if write.code != SUCCESS:
+            return RoomServiceResponse(room, write.code)
         
         return RoomServiceResponse(room, SUCCESS)
     
+    @transactional
     def edit(self, room_name: str, new_name: str, capacity: int)->Room:
-        room_list = self._db_handler.read("rooms").list
+        """Edit a room; a rename is carried over to the room's bookings and series in the same write"""
+        try:
+            index = self._db_handler.indexes()
+        except OSError:
+            return RoomServiceResponse([], DB_READ_ERROR)
         
-        index_item_to_edit = next((i for i, room in enumerate(room_list) if room["name"] == room_name), -1)
-        if index_item_to_edit == -1:
+        room = index.room_by_name(room_name)
+        if room is None:
             return RoomServiceResponse([], ERROR_ELEMENT_NOT_FOUND)
+        room_id = str(room.get("id"))
         
-        edited_element = {
-            "id": room_list[index_item_to_edit].id,
-            "name": new_name if new_name else room_list[index_item_to_edit].name,
-            "capacity": capacity if capacity else room_list[index_item_to_edit].capacity
-        } 
+        if new_name:
+            # Same form as add() stores, so "room b" and "room b." can't both exist
+            new_name = normalize_room_name(new_name)
+            same_name = index.room_by_name(new_name)
+            if same_name is not None and str(same_name.get("id")) != room_id:
+                return RoomServiceResponse([], DUPLICATED_ROOM_NAME)
         
-        room_list[index_item_to_edit] = edited_element
-
-        self._db_handler.write("rooms", room_list)
+        edited_element = {
+            "id": room_id,
+            "name": new_name if new_name else room["name"],
+            "capacity": capacity if capacity else room["capacity"]
+        }
         
-        return RoomServiceResponse(room_list[index_item_to_edit], SUCCESS)
-    
-    def remove(self, room_name:str)->RoomServiceResponse:
-        room_list = self._db_handler.read("rooms").list
+        room_list = [
+            edited_element if str(r.get("id")) == room_id else r
+            for r in self._db_handler.read("rooms").list
+        ]
+        values = {"rooms": room_list}
+        if edited_element["name"] != room["name"]:
+            values.update(self._rename_references(index, room_id, edited_element["name"]))
         
-        remove_index = next((i for i, room in enumerate(room_list) if room["name"] == room_name), -1)
-        removed_element = room_list[remove_index]
+        write = self._db_handler.write_many(values)
+        if write.code != SUCCESS:
+            return RoomServiceResponse([], write.code)
         
-        if remove_index < 0:
+        return RoomServiceResponse(edited_element, SUCCESS)
+    
+    @transactional
+    def remove(self, room_name: str, cascade: bool = False)->RoomServiceResponse:
+        """Remove a room, refusing while bookings reference it unless cascade also removes them"""
+        try:
+            index = self._db_handler.indexes()
+        except OSError:
+            return RoomServiceResponse([], DB_READ_ERROR)
+        
+        removed_element = index.room_by_name(room_name)
+        if removed_element is None:
             return RoomServiceResponse([], ERROR_ELEMENT_NOT_FOUND)
+        room_id = str(removed_element.get("id"))
         
-        room_list.pop(remove_index)
+        booking_ids, series_ids = index.booking_ids(room_id), index.series_ids(room_id)
+        if (booking_ids or series_ids) and not cascade:
+            return RoomServiceResponse([], ROOM_HAS_BOOKINGS)
+        
+        values = {
+            "rooms": [r for r in self._db_handler.read("rooms").list if str(r.get("id")) != room_id]
+        }
+        for key, ids in (("bookings", booking_ids), ("series", series_ids)):
+            if ids:
+                ids = set(ids)
+                values[key] = [r for r in self._db_handler.read(key).list if str(r.get("id")) not in ids]
         
-        self._db_handler.write("rooms", room_list)
+        write = self._db_handler.write_many(values)
+        if write.code != SUCCESS:
+            return RoomServiceResponse([], write.code)
         
         return RoomServiceResponse(removed_element, SUCCESS)
     
+    def _rename_references(self, index, room_id: str, new_name: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Booking and series lists with the room's new name on every record of the room.
+
+        The reverse index says up front which records refer to the room, so a
+        room without bookings costs nothing and the others are matched by id.
+        """
+        values = {}
+        for key, ids in (("bookings", index.booking_ids(room_id)), ("series", index.series_ids(room_id))):
+            if ids:
+                ids = set(ids)
+                values[key] = [
+                    dict(record, room_name=new_name) if str(record.get("id")) in ids else record
+                    for record in self._db_handler.read(key).list
+                ]
+        return values
+    
     def get_room_by_name(self, room_name: str) -> RoomServiceResponse:
         """Get a room by its name"""
-        room_list = self._db_handler.read("rooms").list
-        
-        room = next((r for r in room_list if r.get("name", "").lower() == room_name.lower()), None)
+        try:
+            room = self._db_handler.indexes().room_by_name(room_name)
+        except OSError:
+            room = None
         
         if room is None:
             return RoomServiceResponse([], ERROR_ELEMENT_NOT_FOUND)
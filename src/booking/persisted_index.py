@@ -0,0 +1,265 @@
+"""Room and booking indexes saved next to the database file"""
+import json
+import os
+from bisect import bisect_left, insort
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from booking.changes import DELETE
+from booking.indexes import nights_between, shift_date
+from booking.recurrence import RecurrenceRule, expand_stays
+
+FORMAT_VERSION = 3
+
+
+def index_path(db_path: Path) -> Path:
+    """Location of the persisted indexes of a database file"""
+    return db_path.with_name(db_path.name + ".index.json")
+
+
+def _stay_nights(start_date: str, end_date: str) -> int:
+    try:
+        return nights_between(start_date, end_date)
+    except ValueError:
+        return 0
+
+
+def _series_stays(record: Dict[str, Any]) -> Iterable[Tuple[str, str, str]]:
+    return expand_stays(
+        record.get("id", ""),
+        record.get("start_date", ""),
+        record.get("end_date", ""),
+        RecurrenceRule(**record.get("rule", {})),
+        record.get("exceptions", []),
+    )
+
+
+class PersistedIndex:
+    """Room lookup by id and name, per-room stays sorted by check-in, and the
+    ids of the bookings and series that reference each room.
+
+    The index is stamped with the fingerprint of the database file it was
+    built from. Writes through DatabaseHandler apply their change entries to
+    it and restamp it; if the stamp doesn't match the file on load (another
+    tool changed the database) it is rebuilt from a full scan. A read-only
+    index is kept in memory only and never saved.
+    """
+
+    def __init__(self, path: Path, read_only: bool = False) -> None:
+        self._path = path
+        self._read_only = read_only
+        self._stamp: Optional[List[int]] = None
+        self._rooms: Dict[str, Dict[str, Any]] = {}
+        self._room_ids_by_name: Dict[str, str] = {}
+        # room_id -> sorted [check-in, check-out, booking id] triples
+        self._stays: Dict[str, List[List[str]]] = {}
+        # room_id -> ids of the booking and series records pointing at it
+        self._booking_ids: Dict[str, List[str]] = {}
+        self._series_ids: Dict[str, List[str]] = {}
+        # room_id -> longest stay in nights; it only grows, which keeps it a safe bound
+        self._max_nights: Dict[str, int] = {}
+
+    def is_fresh(self, version: Optional[Tuple[int, int]]) -> bool:
+        return version is not None and self._stamp == list(version)
+
+    def load(self, version: Optional[Tuple[int, int]]) -> bool:
+        """Load the saved index, returning whether it matches the given file version"""
+        if self.is_fresh(version):
+            return True
+        try:
+            with self._path.open("r") as saved:
+                data = json.load(saved)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if data.get("format") != FORMAT_VERSION or version is None or data.get("stamp") != list(version):
+            return False
+        self._stamp = data["stamp"]
+        self._rooms = data["rooms"]
+        self._room_ids_by_name = {room.get("name", "").lower(): room_id for room_id, room in self._rooms.items()}
+        self._stays = data["stays"]
+        self._booking_ids = data["booking_ids"]
+        self._series_ids = data["series_ids"]
+        self._max_nights = data["max_nights"]
+        return True
+
+    def save(self) -> None:
+        if self._read_only:
+            return
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        try:
+            # dumps() runs on the C encoder; dump() to a file does not
+            contents = json.dumps({
+                "format": FORMAT_VERSION,
+                "stamp": self._stamp,
+                "rooms": self._rooms,
+                "stays": self._stays,
+                "booking_ids": self._booking_ids,
+                "series_ids": self._series_ids,
+                "max_nights": self._max_nights,
+            })
+            with tmp_path.open("w") as saved:
+                saved.write(contents)
+            os.replace(tmp_path, self._path)
+        except OSError:
+            # The index is only a cache; a read-only directory just means rebuilding next time
+            pass
+
+    def rebuild(self, data: Dict[str, Any], version: Optional[Tuple[int, int]]) -> None:
+        """Build the whole index from the parsed database"""
+        self._rooms, self._room_ids_by_name, self._stays = {}, {}, {}
+        self._booking_ids, self._series_ids, self._max_nights = {}, {}, {}
+        for room in data.get("rooms", []):
+            self._put_room(room)
+        for booking in data.get("bookings", []):
+            self._add_ref(self._booking_ids, booking.get("room_id", ""), str(booking.get("id")))
+            self._add_stay(booking.get("room_id", ""), booking.get("start_date", ""), booking.get("end_date", ""), str(booking.get("id")))
+        for series in data.get("series", []):
+            self._add_ref(self._series_ids, series.get("room_id", ""), str(series.get("id")))
+            for stay_id, start, end in _series_stays(series):
+                self._add_stay(series.get("room_id", ""), start, end, stay_id)
+        self._stamp = list(version) if version is not None else None
+        self.save()
+
+    def apply(
+        self,
+        changes: List[Dict[str, Any]],
+        old_records: Dict[Tuple[str, str], Dict[str, Any]],
+        version: Optional[Tuple[int, int]],
+    ) -> None:
+        """Apply the change entries of one write and restamp the index.
+
+        old_records maps (key, id) of updated or deleted records to their value
+        before the write, so stays of a changed room or series can be found.
+        """
+        self.replay(
+            ((change, old_records.get((change["key"], change["id"]))) for change in changes),
+            version,
+        )
+
+    def replay(
+        self,
+        applied: Iterable[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]],
+        version: Optional[Tuple[int, int]],
+        persist: bool = True,
+    ) -> None:
+        """Apply (change entry, record it replaced) pairs in order and restamp the index"""
+        for change, old in applied:
+            key, record_id, record = change["key"], change["id"], change["record"]
+            if key == "rooms":
+                if old is not None:
+                    self._drop_room(record_id, old)
+                if change["op"] != DELETE:
+                    self._put_room(record)
+            elif key == "bookings":
+                if old is not None:
+                    self._remove_ref(self._booking_ids, old.get("room_id", ""), record_id)
+                    self._remove_stay(old.get("room_id", ""), record_id)
+                if change["op"] != DELETE:
+                    self._add_ref(self._booking_ids, record.get("room_id", ""), record_id)
+                    self._add_stay(record.get("room_id", ""), record.get("start_date", ""), record.get("end_date", ""), record_id)
+            elif key == "series":
+                if old is not None:
+                    self._remove_ref(self._series_ids, old.get("room_id", ""), record_id)
+                    for stay_id, _, _ in _series_stays(old):
+                        self._remove_stay(old.get("room_id", ""), stay_id)
+                if change["op"] != DELETE:
+                    self._add_ref(self._series_ids, record.get("room_id", ""), record_id)
+                    for stay_id, start, end in _series_stays(record):
+                        self._add_stay(record.get("room_id", ""), start, end, stay_id)
+        self._stamp = list(version) if version is not None else None
+        if persist:
+            self.save()
+
+    def state(self) -> Dict[str, Any]:
+        """Contents of the index, for storing in a snapshot"""
+        return {
+            "rooms": self._rooms,
+            "stays": self._stays,
+            "booking_ids": self._booking_ids,
+            "series_ids": self._series_ids,
+            "max_nights": self._max_nights,
+        }
+
+    def restore(self, state: Dict[str, Any], version: Optional[Tuple[int, int]]) -> None:
+        """Take over the contents saved by state() as matching the given file version"""
+        self._rooms = state["rooms"]
+        self._room_ids_by_name = {room.get("name", "").lower(): room_id for room_id, room in self._rooms.items()}
+        self._stays = state["stays"]
+        self._booking_ids = state["booking_ids"]
+        self._series_ids = state["series_ids"]
+        self._max_nights = state.get("max_nights") or {
+            room_id: max(_stay_nights(start, end) for start, end, _ in stays)
+            for room_id, stays in self._stays.items() if stays
+        }
+        self._stamp = list(version) if version is not None else None
+
+    def _put_room(self, room: Dict[str, Any]) -> None:
+        room_id = str(room.get("id"))
+        self._rooms[room_id] = room
+        self._room_ids_by_name[room.get("name", "").lower()] = room_id
+
+    def _drop_room(self, room_id: str, room: Dict[str, Any]) -> None:
+        self._rooms.pop(room_id, None)
+        name = room.get("name", "").lower()
+        if self._room_ids_by_name.get(name) == room_id:
+            del self._room_ids_by_name[name]
+
+    @staticmethod
+    def _add_ref(refs: Dict[str, List[str]], room_id: str, record_id: str) -> None:
+        refs.setdefault(room_id, []).append(record_id)
+
+    @staticmethod
+    def _remove_ref(refs: Dict[str, List[str]], room_id: str, record_id: str) -> None:
+        room_refs = refs.get(room_id, [])
+        if record_id in room_refs:
+            room_refs.remove(record_id)
+            if not room_refs:
+                del refs[room_id]
+
+    def _add_stay(self, room_id: str, start_date: str, end_date: str, stay_id: str) -> None:
+        insort(self._stays.setdefault(room_id, []), [start_date, end_date, stay_id])
+        nights = _stay_nights(start_date, end_date)
+        if nights > self._max_nights.get(room_id, 0):
+            self._max_nights[room_id] = nights
+
+    def _remove_stay(self, room_id: str, stay_id: str) -> None:
+        stays = self._stays.get(room_id, [])
+        for i, stay in enumerate(stays):
+            if stay[2] == stay_id:
+                del stays[i]
+                return
+
+    def room_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        room_id = self._room_ids_by_name.get(name.lower())
+        return self._rooms.get(room_id) if room_id is not None else None
+
+    def room_by_id(self, room_id: str) -> Optional[Dict[str, Any]]:
+        return self._rooms.get(room_id)
+
+    def rooms(self) -> List[Dict[str, Any]]:
+        return list(self._rooms.values())
+
+    def booking_ids(self, room_id: str) -> List[str]:
+        """Ids of the stored bookings of a room"""
+        return list(self._booking_ids.get(room_id, []))
+
+    def series_ids(self, room_id: str) -> List[str]:
+        """Ids of the recurring series of a room"""
+        return list(self._series_ids.get(room_id, []))
+
+    def stays(self, room_id: str) -> List[List[str]]:
+        """Sorted [check-in, check-out, booking id] stays of a room"""
+        return list(self._stays.get(room_id, []))
+
+    def overlapping(self, room_id: str, start_date: str, end_date: str) -> List[List[str]]:
+        """Stays of a room that occupy a night in [start_date, end_date)"""
+        stays = self._stays.get(room_id, [])
+        hi = bisect_left(stays, [end_date])
+        # Stays may overlap each other (e.g. written by racing processes), so
+        # rather than stop at the first stay that ends before start_date, skip
+        # only those checking in too early for even the longest stay to reach it
+        try:
+            earliest = shift_date(start_date, -self._max_nights.get(room_id, 0))
+        except ValueError:
+            earliest = ""
+        lo = bisect_left(stays, [earliest], 0, hi)
+        return [stay for stay in stays[lo:hi] if stay[1] > start_date]
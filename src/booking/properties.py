@@ -0,0 +1,132 @@
+"""Several booking databases, one per property, queried side by side"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from booking import DB_READ_ERROR, SUCCESS
+from booking.context import get_context
+from booking.indexes import RoomCapacityIndex, nights_between
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class PropertyRoom(NamedTuple):
+    property: str
+    room: Dict[str, Any]
+
+
+class PropertySearchResult(NamedTuple):
+    property: str
+    rooms: List[Dict[str, Any]] = []
+    error: int = SUCCESS
+
+
+class PropertyReport(NamedTuple):
+    property: str
+    rooms: int = 0
+    bookings: int = 0
+    booked_nights: int = 0
+    available_nights: int = 0
+    error: int = SUCCESS
+
+    @property
+    def occupancy(self) -> float:
+        return self.booked_nights / self.available_nights if self.available_nights else 0.0
+
+
+def search_property(
+    name: str,
+    db_path: Path,
+    start_date: str,
+    end_date: str,
+    party_size: Optional[int] = None,
+) -> PropertySearchResult:
+    """Rooms of one property free for [start_date, end_date), smallest fitting first"""
+    try:
+        index = get_context(Path(db_path), read_only=True).db_handler.indexes()
+    except (OSError, ValueError):
+        return PropertySearchResult(name, error=DB_READ_ERROR)
+    rooms = RoomCapacityIndex(index.rooms()).fitting(party_size) if party_size else index.rooms()
+    free = [room for room in rooms if not index.overlapping(str(room.get("id")), start_date, end_date)]
+    return PropertySearchResult(name, free)
+
+
+def report_property(name: str, db_path: Path, start_date: str, end_date: str) -> PropertyReport:
+    """Bookings and occupied room-nights of one property within [start_date, end_date)"""
+    try:
+        index = get_context(Path(db_path), read_only=True).db_handler.indexes()
+    except (OSError, ValueError):
+        return PropertyReport(name, error=DB_READ_ERROR)
+    rooms = index.rooms()
+    bookings = booked_nights = 0
+    for room in rooms:
+        for start, end, _ in index.overlapping(str(room.get("id")), start_date, end_date):
+            bookings += 1
+            booked_nights += nights_between(max(start, start_date), min(end, end_date))
+    return PropertyReport(
+        name,
+        rooms=len(rooms),
+        bookings=bookings,
+        booked_nights=booked_nights,
+        available_nights=len(rooms) * nights_between(start_date, end_date),
+    )
+
+
+def _map_properties(
+    fn: Callable,
+    properties: Dict[str, Path],
+    *args,
+    processes: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[Any]:
+    """Run fn(name, path, *args) for every property concurrently, in config order.
+
+    Threads overlap the file reads; processes also spread the JSON parsing
+    over several cores, at the cost of starting them.
+    """
+    if not properties:
+        return []
+    workers = min(len(properties), max_workers or DEFAULT_MAX_WORKERS)
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        futures = [executor.submit(fn, name, path, *args) for name, path in properties.items()]
+        return [future.result() for future in futures]
+
+
+def search_properties(
+    properties: Dict[str, Path],
+    start_date: str,
+    end_date: str,
+    party_size: Optional[int] = None,
+    processes: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[PropertySearchResult]:
+    """Search every property for free rooms at once, one result per property"""
+    return _map_properties(
+        search_property, properties, start_date, end_date, party_size,
+        processes=processes, max_workers=max_workers,
+    )
+
+
+def merge_rooms(results: List[PropertySearchResult]) -> List[PropertyRoom]:
+    """Free rooms of every property in one list, smallest first"""
+    rooms = [PropertyRoom(result.property, room) for result in results for room in result.rooms]
+    rooms.sort(key=lambda r: (
+        r.room["capacity"] if isinstance(r.room.get("capacity"), int) else float("inf"),
+        r.property,
+        r.room.get("name", ""),
+    ))
+    return rooms
+
+
+def report_properties(
+    properties: Dict[str, Path],
+    start_date: str,
+    end_date: str,
+    processes: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[PropertyReport]:
+    """Occupancy report of every property, gathered at once"""
+    return _map_properties(
+        report_property, properties, start_date, end_date,
+        processes=processes, max_workers=max_workers,
+    )
@@ -0,0 +1,88 @@
+"""Recurrence rules for repeating bookings"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable, Iterator, Optional, Tuple
+from booking.indexes import nights_between, shift_date
+from booking.validators import is_iso_date
+
+FREQUENCIES = {"daily": 1, "weekly": 7}
+
+@dataclass
+class RecurrenceRule():
+    interval_days: int
+    count: Optional[int] = None
+    until: Optional[str] = None
+
+    @staticmethod
+    def from_frequency(
+        frequency: Optional[str] = None,
+        every: Optional[int] = None,
+        count: Optional[int] = None,
+        until: Optional[str] = None,
+    ) -> 'RecurrenceRule':
+        """Build a rule from 'daily'/'weekly' or an explicit every-N-days interval"""
+        if every is not None:
+            interval_days = every
+        elif frequency is not None:
+            try:
+                interval_days = FREQUENCIES[frequency.lower()]
+            except KeyError:
+                raise ValueError(f"Unknown frequency '{frequency}'. Use one of: {', '.join(FREQUENCIES)}")
+        else:
+            raise ValueError("A frequency or an interval in days is required")
+        return RecurrenceRule(interval_days, count, until)
+
+    def validate(self, nights: int, first_start: Optional[str] = None) -> Tuple[bool, str]:
+        """Check the rule is bounded and its occurrences cannot overlap each other.
+
+        With the first check-in date, also check that until doesn't end the
+        series before it starts.
+        """
+        if self.interval_days < 1:
+            return False, "Repeat interval must be at least one day"
+        if self.count is None and self.until is None:
+            return False, "A repeat count or an until date is required"
+        if self.count is not None and self.count < 1:
+            return False, "Repeat count must be at least 1"
+        if self.until is not None and not is_iso_date(self.until):
+            return False, "Invalid until date format. Use YYYY-MM-DD"
+        if self.until is not None and first_start is not None and self.until < first_start:
+            return False, "Until date must be on or after the first check-in"
+        if nights > self.interval_days:
+            return False, "Each stay must end before the next one starts"
+        return True, ""
+
+    def start_dates(self, first_start: str) -> Iterator[str]:
+        """Lazily yield the check-in date of every occurrence, in order"""
+        current = date.fromisoformat(first_start)
+        step = timedelta(days=self.interval_days)
+        generated = 0
+        while self.count is None or generated < self.count:
+            start = current.isoformat()
+            if self.until is not None and start > self.until:
+                return
+            yield start
+            generated += 1
+            current += step
+
+    def to_dict(self):
+        return {
+            "interval_days": self.interval_days,
+            "count": self.count,
+            "until": self.until
+        }
+
+
+def expand_stays(
+    series_id: str,
+    start_date: str,
+    end_date: str,
+    rule: RecurrenceRule,
+    exceptions: Iterable[str] = (),
+) -> Iterator[Tuple[str, str, str]]:
+    """Lazily yield (occurrence id, check-in, check-out) for every stay of a series"""
+    nights = nights_between(start_date, end_date)
+    skipped = set(exceptions)
+    for start in rule.start_dates(start_date):
+        if start not in skipped:
+            yield f"{series_id}@{start}", start, shift_date(start, nights)
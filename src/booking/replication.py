@@ -0,0 +1,110 @@
+"""Log-shipping replication from a primary database file to a read-only follower"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from booking.changes import apply_changes
+from booking.database import DatabaseHandler
+
+class ReplicationStatus(NamedTuple):
+    applied: int
+    applied_seq: int
+    primary_seq: int
+    lag_seconds: float
+
+    @property
+    def lag(self) -> int:
+        """Number of primary changes the follower has not applied yet"""
+        return max(self.primary_seq - self.applied_seq, 0)
+
+class Follower:
+    """Keeps a follower database in step with a primary by replaying its change log.
+
+    The follower starts from a full copy of the primary, then only applies
+    the log entries written after the copy's sequence number. It is written
+    atomically (temp file and rename) so readers never see a partial file.
+    """
+
+    def __init__(self, primary_path: Path, follower_path: Path) -> None:
+        self._primary = DatabaseHandler(Path(primary_path))
+        self._follower_path = Path(follower_path)
+        self._data: Optional[Dict[str, Any]] = None
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            try:
+                with self._follower_path.open("r") as db:
+                    self._data = json.load(db)
+            except (OSError, json.JSONDecodeError):
+                self._data = self._snapshot_primary()
+                self._save()
+        return self._data
+
+    def _snapshot_primary(self, attempts: int = 5) -> Dict[str, Any]:
+        """Copy the whole primary, retrying if it is caught mid-write"""
+        for _ in range(attempts):
+            try:
+                with self._primary.get_path().open("r") as db:
+                    data = json.load(db)
+                data.setdefault("change_seq", 0)
+                return data
+            except json.JSONDecodeError:
+                time.sleep(0.05)
+            except OSError:
+                break
+        return {"change_seq": 0}
+
+    def _save(self) -> None:
+        self._follower_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._follower_path.with_name(self._follower_path.name + ".tmp")
+        with tmp_path.open("w") as db:
+            json.dump(self._data, db)
+        os.replace(tmp_path, self._follower_path)
+
+    @staticmethod
+    def _apply(data: Dict[str, Any], changes: Iterable[Dict[str, Any]]) -> int:
+        return len(apply_changes(data, changes))
+
+    def sync_once(self) -> ReplicationStatus:
+        """Apply every primary change the follower has not seen yet.
+
+        If the primary's log is missing entries the follower needs (the
+        primary could not append them after writing), the follower starts
+        over from a fresh copy instead of skipping them.
+        """
+        data = self._load()
+        applied_seq = data.get("change_seq", 0)
+        changes = list(self._primary.changes(applied_seq))
+        if self._has_gap(changes, applied_seq):
+            self._data = self._snapshot_primary()
+            self._save()
+            return self.status(max(self._data.get("change_seq", 0) - applied_seq, 0))
+        applied = self._apply(data, changes)
+        if applied:
+            self._save()
+        return self.status(applied)
+
+    def _has_gap(self, changes: List[Dict[str, Any]], applied_seq: int) -> bool:
+        if not changes:
+            return self._primary.last_seq() > applied_seq
+        return any(change["seq"] != applied_seq + 1 + i for i, change in enumerate(changes))
+
+    def status(self, applied: int = 0) -> ReplicationStatus:
+        """Report how far the follower trails the primary"""
+        applied_seq = self._load().get("change_seq", 0)
+        primary_seq = self._primary.last_seq()
+        lag_seconds = 0.0
+        if primary_seq > applied_seq:
+            oldest_pending = next(self._primary.changes(applied_seq), None)
+            if oldest_pending is not None:
+                lag_seconds = max(time.time() - oldest_pending["ts"], 0.0)
+        return ReplicationStatus(applied, applied_seq, primary_seq, lag_seconds)
+
+    def run(self, interval: float = 1.0, on_sync=None) -> None:
+        """Tail the primary forever, syncing every interval seconds"""
+        while True:
+            status = self.sync_once()
+            if on_sync is not None:
+                on_sync(status)
+            time.sleep(interval)
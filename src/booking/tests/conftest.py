@@ -0,0 +1,17 @@
+import json
+import pytest
+from pathlib import Path
+
+
+# ========== FIXTURES ==========
+@pytest.fixture
+def json_db(tmp_path: Path):
+    """
+    Creates an empty book.json file and returns its path.
+    """
+    db_file = tmp_path / "book.json"
+
+    with open(db_file, "w") as f:
+        json.dump({"rooms": [], "bookings": []}, f, indent=4)
+
+    return db_file
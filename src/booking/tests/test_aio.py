@@ -0,0 +1,136 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+
+from booking import SUCCESS
+from booking.database import DatabaseHandler
+from booking.models.aio import AsyncBookingService, AsyncRoomService
+from booking.models.book import BookingService
+
+
+# ========== TEST: ASYNC SERVICES ==========
+def test_async_services_round_trip(json_db: Path):
+    """Test that async writes are visible to async reads."""
+    async def scenario():
+        async with AsyncRoomService(json_db) as rooms, AsyncBookingService(json_db) as bookings:
+            await rooms.add("room a", 10)
+            await bookings.add("Room a.", "room-1", "2026-01-10", "2026-01-15")
+            return await rooms.get_rooms(), await bookings.active_on("2026-01-12")
+    
+    rooms, active = asyncio.run(scenario())
+    
+    assert rooms.error == SUCCESS
+    assert len(rooms.list) == 1
+    assert len(active.list) == 1
+
+
+
+def test_room_and_booking_writes_do_not_overwrite_each_other(json_db: Path, monkeypatch):
+    """Test that concurrent writes from both services all end up in the database."""
+    original = DatabaseHandler.read
+    
+    def slow_read(self, key):
+        # Widen the gap between a service's read and its write
+        response = original(self, key)
+        time.sleep(0.002)
+        return response
+    
+    monkeypatch.setattr(DatabaseHandler, "read", slow_read)
+    
+    async def scenario():
+        # Two wrappers of each service, as two parts of one application would have
+        async with AsyncRoomService(json_db) as rooms_a, AsyncRoomService(json_db) as rooms_b, \
+                AsyncBookingService(json_db) as bookings_a, AsyncBookingService(json_db) as bookings_b:
+            await asyncio.gather(
+                *((rooms_a, rooms_b)[i % 2].add(f"room {i}", 2) for i in range(40)),
+                *((bookings_a, bookings_b)[i % 2].add(f"Room {i}.", f"room-{i}", "2030-01-01", "2030-01-02") for i in range(40)),
+            )
+    
+    asyncio.run(scenario())
+    
+    stored = json.loads(json_db.read_text())
+    assert len(stored["rooms"]) == 40
+    assert len(stored["bookings"]) == 40
+
+def test_concurrent_identical_reads_share_one_load(json_db: Path, monkeypatch):
+    """Test that overlapping identical reads only hit storage once."""
+    calls = []
+    original = BookingService.get_bookings
+    
+    def slow_get_bookings(self):
+        calls.append(1)
+        time.sleep(0.05)
+        return original(self)
+    
+    monkeypatch.setattr(BookingService, "get_bookings", slow_get_bookings)
+    
+    async def scenario():
+        async with AsyncBookingService(json_db) as bookings:
+            return await asyncio.gather(*(bookings.get_bookings() for _ in range(20)))
+    
+    results = asyncio.run(scenario())
+    
+    assert len(results) == 20
+    assert len(calls) == 1
+
+
+def test_concurrent_writes_are_serialized(json_db: Path, monkeypatch):
+    """Test that concurrent adds run one at a time and none is lost."""
+    active = []
+    overlaps = []
+    original = BookingService.add_many
+    
+    def tracked_add_many(self, new_bookings, idempotency_keys=None):
+        active.append(threading.get_ident())
+        if len(active) > 1:
+            overlaps.append(1)
+        try:
+            time.sleep(0.01)
+            return original(self, new_bookings, idempotency_keys)
+        finally:
+            active.pop()
+    
+    monkeypatch.setattr(BookingService, "add_many", tracked_add_many)
+    
+    async def scenario():
+        async with AsyncBookingService(json_db, max_workers=8) as bookings:
+            await asyncio.gather(*(
+                bookings.add("Room A", "room-1", f"2026-01-{day:02d}", f"2026-01-{day + 1:02d}")
+                for day in range(1, 21)
+            ))
+            return await bookings.get_bookings()
+    
+    response = asyncio.run(scenario())
+    
+    assert overlaps == []
+    assert len(response.list) == 20
+
+
+def test_event_loop_is_not_blocked(json_db: Path, monkeypatch):
+    """Test that a slow read leaves the loop free to run other tasks."""
+    original = BookingService.get_bookings
+    
+    def slow_get_bookings(self):
+        time.sleep(0.1)
+        return original(self)
+    
+    monkeypatch.setattr(BookingService, "get_bookings", slow_get_bookings)
+    
+    async def scenario():
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+        
+        async with AsyncBookingService(json_db) as bookings:
+            task = asyncio.create_task(ticker())
+            await bookings.get_bookings()
+            task.cancel()
+        return ticks
+    
+    assert asyncio.run(scenario()) >= 5
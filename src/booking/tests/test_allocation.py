@@ -0,0 +1,178 @@
+import json
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from booking.database import DatabaseHandler
+from booking.models.allocation import AllocationRequest, AllocationService
+from booking.models.book import BookingService
+from booking import SUCCESS, NO_ROOM_AVAILABLE, INVALID_DATE
+
+
+def _day(offset: int) -> str:
+    return (datetime.now() + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+def _allocate_pairs(db_path: Path, count: int) -> list:
+    results = AllocationService(db_path).allocate_batch([AllocationRequest(2, _day(5), _day(6))] * count)
+    return [result.error for result in results]
+
+
+# ========== TEST: SINGLE ALLOCATION ==========
+def test_find_room_picks_smallest_that_fits(json_db: Path):
+    """Test that the smallest room holding the party is chosen."""
+    # Arrange
+    service = AllocationService(json_db)
+    
+    # Act
+    response = service.find_room(8, _day(5), _day(7))
+    
+    # Assert
+    assert response.error == SUCCESS
+    assert response.room["name"] == "medium"
+
+
+def test_allocate_skips_booked_rooms(json_db: Path):
+    """Test that a booked room is skipped for the next smallest free one."""
+    # Arrange
+    service = AllocationService(json_db)
+    first = service.allocate(8, _day(5), _day(7))
+    
+    # Act
+    second = service.allocate(8, _day(6), _day(8))
+    
+    # Assert
+    assert first.room["name"] == "medium"
+    assert second.error == SUCCESS
+    assert second.room["name"] == "large"
+
+
+def test_allocate_fails_when_party_too_big(json_db: Path):
+    """Test that no room is returned when none is large enough."""
+    # Arrange
+    service = AllocationService(json_db)
+    
+    # Act
+    response = service.allocate(500, _day(5), _day(7))
+    
+    # Assert
+    assert response.error == NO_ROOM_AVAILABLE
+
+
+# ========== TEST: BATCH ALLOCATION ==========
+def test_allocate_batch_gives_big_rooms_to_big_groups(json_db: Path):
+    """Test that large parties are placed before small ones take their rooms."""
+    # Arrange
+    service = AllocationService(json_db)
+    requests = [
+        AllocationRequest(2, _day(5), _day(6)),
+        AllocationRequest(2, _day(5), _day(6)),
+        AllocationRequest(2, _day(5), _day(6)),
+        AllocationRequest(40, _day(5), _day(6)),
+    ]
+    
+    # Act
+    results = service.allocate_batch(requests)
+    
+    # Assert
+    assert [r.error for r in results] == [SUCCESS, SUCCESS, SUCCESS, SUCCESS]
+    assert results[3].room["name"] == "large"
+    assert sorted(r.room["name"] for r in results[:3]) == ["medium", "small", "small b"]
+
+
+def test_allocate_batch_reports_rejections(json_db: Path):
+    """Test that unplaceable and invalid requests are reported per row."""
+    # Arrange
+    service = AllocationService(json_db)
+    requests = [
+        AllocationRequest(40, _day(5), _day(6)),
+        AllocationRequest(40, _day(5), _day(6)),
+        AllocationRequest(2, _day(6), _day(5)),
+    ]
+    
+    # Act
+    results = service.allocate_batch(requests)
+    
+    # Assert
+    assert [r.error for r in results] == [SUCCESS, NO_ROOM_AVAILABLE, INVALID_DATE]
+    bookings = json.loads(json_db.read_text())["bookings"]
+    assert len(bookings) == 1
+
+
+
+def test_allocate_batch_stores_padded_dates(json_db: Path):
+    """Test that unpadded request dates are booked, and checked, in their padded form."""
+    # Arrange
+    service = AllocationService(json_db)
+    
+    # Act
+    results = service.allocate_batch([
+        AllocationRequest(40, "2030-1-5", "2030-1-9"),
+        AllocationRequest(40, "2030-01-08", "2030-01-10"),
+    ])
+    
+    # Assert
+    assert [r.error for r in results] == [SUCCESS, NO_ROOM_AVAILABLE]
+    bookings = json.loads(json_db.read_text())["bookings"]
+    assert [(b["start_date"], b["end_date"]) for b in bookings] == [("2030-01-05", "2030-01-09")]
+
+
+def test_allocate_batch_skips_held_rooms(json_db: Path):
+    """Test that a room on hold is not allocated."""
+    # Arrange
+    bookings = BookingService(json_db)
+    service = AllocationService(json_db, booking_service=bookings)
+    bookings.hold("medium", "r-medium", _day(5), _day(7))
+    
+    # Act
+    response = service.allocate(8, _day(6), _day(8))
+    
+    # Assert
+    assert response.room["name"] == "large"
+
+
+def test_allocate_batch_sees_stays_behind_an_overlapping_one(json_db: Path):
+    """Test that a long stay is seen even when a shorter stay inside it ends before the request."""
+    # Arrange
+    DatabaseHandler(json_db).write("bookings", [
+        {"id": "long", "room_name": "medium", "room_id": "r-medium", "start_date": _day(1), "end_date": _day(20)},
+        {"id": "short", "room_name": "medium", "room_id": "r-medium", "start_date": _day(2), "end_date": _day(3)},
+    ])
+    
+    # Act
+    response = AllocationService(json_db).allocate(8, _day(10), _day(11))
+    
+    # Assert
+    assert response.room["name"] == "large"
+
+
+def test_concurrent_batches_fill_every_room(json_db: Path):
+    """Test that batches from several processes each see the rooms the others took."""
+    # Act
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        codes = [code for result in executor.map(_allocate_pairs, [json_db] * 4, [3] * 4) for code in result]
+    
+    # Assert
+    bookings = json.loads(json_db.read_text())["bookings"]
+    assert codes.count(SUCCESS) == 4
+    assert sorted(b["room_id"] for b in bookings) == ["r-large", "r-medium", "r-small", "r-small-b"]
+
+# ========== FIXTURES ==========
+@pytest.fixture
+def json_db(json_db: Path):
+    """
+    Fills the shared book.json with rooms of different capacities.
+    """
+    rooms = [
+        {"id": "r-large", "name": "large", "capacity": 50},
+        {"id": "r-small", "name": "small", "capacity": 4},
+        {"id": "r-medium", "name": "medium", "capacity": 10},
+        {"id": "r-small-b", "name": "small b", "capacity": 4},
+        {"id": "r-unknown", "name": "unknown", "capacity": "not informed"},
+    ]
+
+    with open(json_db, "w") as f:
+        json.dump({"rooms": rooms, "bookings": []}, f, indent=4)
+
+    return json_db
@@ -2,15 +2,19 @@
 import pytest
 import tempfile
 import json
+import time
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typer.testing import CliRunner
 
-from booking import __app_name__, __version__, SUCCESS
+from booking import __app_name__, __version__, SUCCESS, BOOKING_CONFLICT, INVALID_DATE, HOLD_EXPIRED
+from booking import cli, config, context
 from booking.cli import app
 from booking.models.book import Booking, BookingService, BookServiceResponse
-from booking.validators import DateValidator, BookingValidator
+from booking.validators import DateValidator, BookingValidator, DATES_OK, INVALID_START_FORMAT, INVALID_END_FORMAT, START_IN_PAST, END_IN_PAST, START_NOT_BEFORE_END
 from booking.database import DatabaseHandler
+from booking.recurrence import RecurrenceRule
+from booking.holds import HoldStore
 
 runner = CliRunner()
 
@@ -87,6 +91,30 @@ class TestBookingIntegration:
         assert not is_available
         assert "already booked" in msg
     
+    def test_add_refuses_overlapping_booking(self, temp_db):
+        """Test that add() itself rejects dates that are already booked"""
+        service = BookingService(temp_db)
+        first = service.add("Room A", "room-1", "2030-01-10", "2030-01-15")
+        
+        response = service.add("Room A", "room-1", "2030-01-12", "2030-01-18")
+        
+        assert response.error == BOOKING_CONFLICT
+        assert [b.id for b in response.list] == [first.booking.id]
+        assert len(service.get_bookings().list) == 1
+    
+    def test_add_many_refuses_overlap_within_the_batch(self, temp_db):
+        """Test that bookings of one batch are checked against each other too"""
+        service = BookingService(temp_db)
+        
+        response = service.add_many([
+            ("Room A", "room-1", "2030-01-10", "2030-01-15"),
+            ("Room B", "room-2", "2030-01-10", "2030-01-15"),
+            ("Room A", "room-1", "2030-01-14", "2030-01-16"),
+        ])
+        
+        assert response.error == BOOKING_CONFLICT
+        assert service.get_bookings().list == []
+    
     def test_multiple_bookings_same_room(self, temp_db):
         """Test multiple non-overlapping bookings for the same room"""
         service = BookingService(temp_db)
@@ -139,4 +167,756 @@ class TestBookingIntegration:
         # Fourth instance: verify all bookings
         service4 = BookingService(temp_db)
         all_bookings = service4.get_bookings()
-        assert len(all_bookings.list) == 3
\ No newline at end of file
+        assert len(all_bookings.list) == 3
+
+# ============================================================================
+# Batch Date Validation Tests
+# ============================================================================
+
+class TestBatchDateValidation:
+    """Tests for validating many booking date pairs at once"""
+    
+    TODAY = date(2026, 1, 10)
+    
+    def test_result_code_per_row(self):
+        """Test that each row gets the code of its first failing check"""
+        codes = BookingValidator.validate_booking_dates_batch(
+            ["2026-01-10", "2026/01/10", "2026-01-12", "2026-01-09", "2026-01-15", "2026-01-15"],
+            ["2026-01-12", "2026-01-12", "2026-02-30", "2026-01-12", "2026-01-09", "2026-01-15"],
+            today=self.TODAY,
+        )
+        
+        assert codes == [
+            DATES_OK, INVALID_START_FORMAT, INVALID_END_FORMAT,
+            START_IN_PAST, END_IN_PAST, START_NOT_BEFORE_END,
+        ]
+    
+    def test_matches_single_validation(self):
+        """Test that the batch accepts exactly what the single-row validator accepts"""
+        start = (date.today() + timedelta(days=3)).isoformat()
+        end = (date.today() + timedelta(days=5)).isoformat()
+        rows = [(start, end), (end, start), ("2030-01-05T00", end), ("", end)]
+        
+        codes = BookingValidator.validate_booking_dates_batch([r[0] for r in rows], [r[1] for r in rows])
+        
+        assert [code == DATES_OK for code in codes] == [
+            BookingValidator.validate_booking_dates(*row)[0] for row in rows
+        ]
+    
+    def test_unpadded_dates_are_invalid(self):
+        """Test that rows must be zero-padded, since bulk rows are stored as given"""
+        codes = BookingValidator.validate_booking_dates_batch(
+            ["2030-1-5", "2030-01-05", "20300105"],
+            ["2030-01-09", "2030-1-9", "2030-01-09"],
+        )
+        
+        assert codes == [INVALID_START_FORMAT, INVALID_END_FORMAT, INVALID_START_FORMAT]
+    
+    def test_mismatched_columns(self):
+        """Test that columns of different lengths are rejected"""
+        with pytest.raises(ValueError):
+            BookingValidator.validate_booking_dates_batch(["2026-01-10"], [])
+
+# ============================================================================
+# Query Tests
+# ============================================================================
+
+class TestBookingQueries:
+    """Tests for date-range booking queries"""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        """Booking service with a few bookings across two rooms"""
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [], "bookings": []}))
+        service = BookingService(db_path)
+        service.add("Room A", "room-1", "2026-01-10", "2026-01-15")
+        service.add("Room A", "room-1", "2026-01-15", "2026-01-20")
+        service.add("Room B", "room-2", "2026-01-01", "2026-02-01")
+        service.add("Room B", "room-2", "2026-03-01", "2026-03-02")
+        return service
+    
+    def test_query_overlapping_range(self, service):
+        """Test that a range returns every booking occupying a night in it"""
+        result = service.query(start_date="2026-01-14", end_date="2026-01-16")
+        
+        assert result.error == SUCCESS
+        assert sorted(b.start_date for b in result.list) == [
+            "2026-01-01", "2026-01-10", "2026-01-15"
+        ]
+    
+    def test_query_range_is_half_open(self, service):
+        """Test that check-out day does not count as occupied"""
+        result = service.query(room_id="room-1", start_date="2026-01-20", end_date="2026-01-25")
+        
+        assert result.list == []
+    
+    def test_query_by_room(self, service):
+        """Test that a room filter only returns that room's bookings"""
+        result = service.query(room_id="room-2", start_date="2026-01-05")
+        
+        assert [b.start_date for b in result.list] == ["2026-01-01", "2026-03-01"]
+    
+    def test_active_on(self, service):
+        """Test bookings active on a single night"""
+        result = service.active_on("2026-01-15")
+        
+        assert sorted((b.room_id, b.start_date) for b in result.list) == [
+            ("room-1", "2026-01-15"), ("room-2", "2026-01-01")
+        ]
+    
+    def test_starting_this_week(self, service):
+        """Test bookings starting in the week of a given day"""
+        result = service.starting_this_week(today=date(2026, 1, 14))
+        
+        assert sorted(b.start_date for b in result.list) == ["2026-01-15"]
+    
+    def test_index_sees_new_bookings(self, service):
+        """Test that the query index is refreshed after adding a booking"""
+        service.active_on("2026-04-01")
+        service.add("Room A", "room-1", "2026-04-01", "2026-04-03")
+        
+        assert len(service.active_on("2026-04-02").list) == 1
+    
+    def test_unpadded_stored_booking(self, tmp_path):
+        """Test that a booking stored before dates were normalized is still found, and doesn't break queries"""
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [], "bookings": [
+            {"id": "b-1", "room_name": "Room A", "room_id": "room-1", "start_date": "2026-1-5", "end_date": "2026-1-9"},
+            {"id": "b-2", "room_name": "Room A", "room_id": "room-1", "start_date": "2026-02-01", "end_date": "2026-02-03"},
+        ]}))
+        service = BookingService(db_path)
+        
+        in_range = service.query(start_date="2026-01-08", end_date="2026-01-20")
+        active = service.active_on("2026-01-06", room_id="room-1")
+        
+        assert [b.id for b in in_range.list] == ["b-1"]
+        assert [b.id for b in active.list] == ["b-1"]
+
+
+# ============================================================================
+# Date Normalization Tests
+# ============================================================================
+
+class TestDateNormalization:
+    """Tests that dates are stored zero-padded whatever form they came in"""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [], "bookings": []}))
+        return BookingService(db_path)
+    
+    def test_add_stores_padded_dates(self, service):
+        """Test that an unpadded booking is stored padded and found by later overlap checks"""
+        response = service.add("Room A", "room-1", "2030-1-5", "2030-1-9")
+        
+        assert response.error == SUCCESS
+        assert (response.booking.start_date, response.booking.end_date) == ("2030-01-05", "2030-01-09")
+        assert [b.id for b in service.get_stays("room-1", "2030-01-08", "2030-01-10").list] == [response.booking.id]
+    
+    def test_add_rejects_what_is_not_a_date(self, service):
+        """Test that nothing is written when a date doesn't exist"""
+        response = service.add("Room A", "room-1", "2030-01-05", "2030-02-30")
+        
+        assert response.error == INVALID_DATE
+        assert service.get_bookings().list == []
+    
+    def test_hold_and_series_store_padded_dates(self, service):
+        """Test that holds and series normalize their dates too"""
+        hold = service.hold("Room A", "room-1", "2030-2-1", "2030-2-3").hold
+        series = service.add_series("Room A", "room-2", "2030-3-1", "2030-3-2", RecurrenceRule(7, until="2030-3-15")).series
+        
+        assert (hold.start_date, hold.end_date) == ("2030-02-01", "2030-02-03")
+        assert [b.start_date for b in series.occurrences()] == ["2030-03-01", "2030-03-08", "2030-03-15"]
+    
+    def test_book_command_refuses_overlap_with_unpadded_booking(self, tmp_path, monkeypatch):
+        """Test that a booking made with unpadded dates still blocks the room"""
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [{"id": "room-1", "name": "Garden", "capacity": 2}], "bookings": []}))
+        monkeypatch.setattr(config, "_get_database_path", lambda: db_path)
+        monkeypatch.setattr(context, "_contexts", {})
+        
+        first = runner.invoke(app, ["book", "-r", "Garden", "-s", "2030-1-5", "-e", "2030-1-9"])
+        second = runner.invoke(app, ["book", "-r", "Garden", "-s", "2030-01-08", "-e", "2030-01-10"])
+        
+        assert "successfully booked from 2030-01-05 to 2030-01-09" in first.output
+        assert "Booking failed" in second.output
+        assert len(json.loads(db_path.read_text())["bookings"]) == 1
+
+
+# ============================================================================
+# Recurring Booking Tests
+# ============================================================================
+
+class TestRecurringBookings:
+    """Tests for recurring booking series"""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [], "bookings": []}))
+        return BookingService(db_path)
+    
+    def test_rule_expands_lazily_with_count_and_until(self):
+        """Test that occurrences stop at the count or until date"""
+        weekly = RecurrenceRule.from_frequency("weekly", count=3)
+        every_ten = RecurrenceRule.from_frequency(every=10, until="2026-01-21")
+        
+        assert list(weekly.start_dates("2026-01-01")) == ["2026-01-01", "2026-01-08", "2026-01-15"]
+        assert list(every_ten.start_dates("2026-01-01")) == ["2026-01-01", "2026-01-11", "2026-01-21"]
+    
+    def test_series_is_stored_as_one_rule(self, service):
+        """Test that a year of weekly stays is stored once and expanded on read"""
+        response = service.add_series(
+            "Room A", "room-1", "2026-01-05", "2026-01-06", RecurrenceRule.from_frequency("weekly", count=52)
+        )
+        
+        assert response.error == SUCCESS
+        assert len(service.get_series().list) == 1
+        assert service._db_handler.read("bookings").list == []
+        assert len(service.get_bookings_by_room("room-1").list) == 52
+    
+    def test_series_conflict_is_rejected(self, service):
+        """Test that a clash with an existing booking rejects the whole series"""
+        service.add("Room A", "room-1", "2026-01-14", "2026-01-16")
+        
+        response = service.add_series(
+            "Room A", "room-1", "2026-01-01", "2026-01-02", RecurrenceRule.from_frequency("daily", count=30)
+        )
+        
+        assert response.error == BOOKING_CONFLICT
+        assert [b.start_date for b in response.list] == ["2026-01-14"]
+        assert service.get_series().list == []
+    
+    def test_series_conflict_behind_a_shorter_overlapping_stay(self, service):
+        """Test that only stays sharing a night clash when existing stays overlap each other"""
+        DatabaseHandler(service._db_handler.get_path()).write("bookings", [
+            {"id": "long", "room_name": "Room A", "room_id": "room-1", "start_date": "2030-01-01", "end_date": "2030-01-20"},
+            {"id": "short", "room_name": "Room A", "room_id": "room-1", "start_date": "2030-01-02", "end_date": "2030-01-03"},
+        ])
+        
+        response = service.add_series(
+            "Room A", "room-1", "2030-01-10", "2030-01-11", RecurrenceRule.from_frequency("weekly", count=3)
+        )
+        
+        assert response.error == BOOKING_CONFLICT
+        assert [b.id for b in response.list] == ["long"]
+    
+    def test_series_skip_conflicts_records_exceptions(self, service):
+        """Test that clashing stays become exceptions when asked to skip them"""
+        service.add("Room A", "room-1", "2026-01-14", "2026-01-16")
+        
+        response = service.add_series(
+            "Room A", "room-1", "2026-01-01", "2026-01-02",
+            RecurrenceRule.from_frequency("daily", until="2026-01-31"), skip_conflicts=True
+        )
+        
+        assert response.error == SUCCESS
+        assert response.series.exceptions == ["2026-01-14", "2026-01-15"]
+        assert len(service.get_bookings_by_room("room-1").list) == 30
+    
+    def test_cancel_occurrence(self, service):
+        """Test that cancelling one stay frees its dates"""
+        series = service.add_series(
+            "Room A", "room-1", "2026-01-05", "2026-01-07", RecurrenceRule.from_frequency("weekly", count=4)
+        ).series
+        
+        response = service.cancel_occurrence(series.id, "2026-01-12")
+        
+        assert response.error == SUCCESS
+        assert service.active_on("2026-01-12").list == []
+        assert len(service.active_on("2026-01-19").list) == 1
+    
+    def test_series_rejects_overlapping_occurrences(self, service):
+        """Test that stays longer than the repeat interval are refused"""
+        response = service.add_series(
+            "Room A", "room-1", "2026-01-01", "2026-01-03", RecurrenceRule.from_frequency("daily", count=3)
+        )
+        
+        assert response.error == INVALID_DATE
+    
+    def test_series_rejects_until_before_start(self, service):
+        """Test that an until date before the first check-in is refused and nothing is stored"""
+        rule = RecurrenceRule.from_frequency("weekly", until="2025-12-31")
+        
+        response = service.add_series("Room A", "room-1", "2026-01-05", "2026-01-06", rule)
+        
+        assert rule.validate(1, "2026-01-05")[0] is False
+        assert response.error == INVALID_DATE
+        assert service.get_series().list == []
+    
+    def test_series_rejects_malformed_until(self, service):
+        """Test that until must be a YYYY-MM-DD date"""
+        for until in ["20260131", "31/01/2026", "2026-02-30"]:
+            rule = RecurrenceRule.from_frequency("weekly", until=until)
+            
+            response = service.add_series("Room A", "room-1", "2026-01-05", "2026-01-06", rule)
+            
+            assert response.error == INVALID_DATE
+        assert service.get_series().list == []
+    
+    def test_series_with_every_stay_skipped_is_not_stored(self, service):
+        """Test that skipping conflicts down to zero stays is reported as a conflict"""
+        service.add("Room A", "room-1", "2026-01-05", "2026-01-20")
+        
+        response = service.add_series(
+            "Room A", "room-1", "2026-01-05", "2026-01-06",
+            RecurrenceRule.from_frequency("weekly", count=2), skip_conflicts=True
+        )
+        
+        assert response.error == BOOKING_CONFLICT
+        assert service.get_series().list == []
+
+
+# ============================================================================
+# Shell Tests
+# ============================================================================
+
+class TestShell:
+    """Tests for the interactive shell"""
+    
+    @pytest.fixture
+    def db_path(self, tmp_path, monkeypatch):
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [], "bookings": []}))
+        monkeypatch.setattr(config, "_get_database_path", lambda: db_path)
+        monkeypatch.setattr(context, "_contexts", {})
+        return db_path
+    
+    def test_shell_runs_commands_with_shared_services(self, db_path):
+        """Test that commands typed in the shell reuse one set of services"""
+        start = (datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d")
+        end = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+        commands = [
+            "add --name salon --capacity 10",
+            f"book --room-name salon. --start-date {start} --end-date {end}",
+            "list-bookings",
+            "exit",
+        ]
+        
+        result = runner.invoke(app, ["shell"], input="\n".join(commands) + "\n")
+        
+        assert result.exit_code == 0
+        assert "successfully booked" in result.stdout
+        assert f"Check-in:  {start}" in result.stdout
+        assert [Path(path) for path, _ in context._contexts] == [db_path.absolute()]
+    
+    def test_shell_survives_bad_commands(self, db_path):
+        """Test that usage errors don't end the shell"""
+        result = runner.invoke(app, ["shell"], input="book --room-name\nnot-a-command\nget\n")
+        
+        assert result.exit_code == 0
+        assert result.stdout.count("booking> ") == 4
+    
+    def test_services_reload_after_external_write(self, db_path):
+        """Test that warm services notice changes made by another process"""
+        service = BookingService(db_path)
+        assert service.get_bookings().list == []
+        
+        other = BookingService(db_path)
+        other.add("Room A", "room-1", "2026-01-10", "2026-01-15")
+        
+        assert len(service.get_bookings().list) == 1
+
+
+# ============================================================================
+# Room Filter Tests
+# ============================================================================
+
+class TestRoomFilter:
+    """Tests for filtering bookings by room name"""
+    
+    @pytest.fixture
+    def db_path(self, tmp_path, monkeypatch):
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({
+            "rooms": [{"id": "room-1", "name": "Garden", "capacity": 2}],
+            "bookings": [
+                {"id": "b-1", "room_name": "Old name", "room_id": "room-1", "start_date": "2030-01-10", "end_date": "2030-01-12"},
+                {"id": "b-2", "room_name": "Garden", "room_id": "room-2", "start_date": "2030-01-10", "end_date": "2030-01-12"},
+            ]
+        }))
+        monkeypatch.setattr(config, "_get_database_path", lambda: db_path)
+        monkeypatch.setattr(context, "_contexts", {})
+        return db_path
+    
+    def test_room_name_resolves_to_room_id(self, db_path):
+        """Test that the filter matches the room's id, not the name copied onto bookings"""
+        result = runner.invoke(app, ["list-bookings", "--room-name", "garden"])
+        
+        assert result.exit_code == 0
+        assert "b-1" in result.output
+        assert "b-2" not in result.output
+    
+    def test_room_name_with_date_filter(self, db_path):
+        """Test that the id filter also applies to date-range queries"""
+        result = runner.invoke(app, ["list-bookings", "--room-name", "garden", "--active-on", "2030-01-11"])
+        
+        assert "b-1" in result.output
+        assert "b-2" not in result.output
+    
+    def test_unknown_room(self, db_path):
+        """Test that an unknown room name is reported"""
+        result = runner.invoke(app, ["list-bookings", "--room-name", "cellar"])
+        
+        assert "not found" in result.output
+
+
+# ============================================================================
+# Archive Tests
+# ============================================================================
+
+class TestArchive:
+    """Tests for moving finished bookings to the archive"""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [], "bookings": []}))
+        service = BookingService(db_path)
+        service.add("Room A", "room-1", "2020-01-10", "2020-01-15")
+        service.add("Room A", "room-1", "2020-02-10", "2020-02-15")
+        service.add("Room B", "room-2", "2099-01-10", "2099-01-15")
+        return service
+    
+    def test_archive_moves_finished_bookings(self, service):
+        """Test that archived bookings leave the hot set but stay in history"""
+        response = service.archive("2021-01-01")
+        
+        assert response.error == SUCCESS
+        assert len(response.list) == 2
+        assert [b.room_id for b in service.get_bookings().list] == ["room-2"]
+        assert len(service.get_history().list) == 3
+    
+    def test_history_range_only_returns_matching_archived(self, service):
+        """Test that history filters archived bookings by date and room"""
+        service.archive("2021-01-01")
+        
+        in_range = service.get_history("2020-02-01", "2020-03-01")
+        by_room = service.get_history(room_id="room-2")
+        
+        assert [b.start_date for b in in_range.list] == ["2020-02-10"]
+        assert [b.start_date for b in by_room.list] == ["2099-01-10"]
+    
+    def test_archive_segments_are_append_only(self, service):
+        """Test that each archive run writes its own compressed segment"""
+        service.archive("2020-01-31")
+        service.archive("2021-01-01")
+        
+        segments = sorted(p.name for p in service._archive._path.glob("*.gz"))
+        
+        assert segments == ["segment-000001.jsonl.gz", "segment-000002.jsonl.gz"]
+        assert service._archive.count() == 2
+    
+    def test_archive_refuses_a_future_date(self, service):
+        """Test that current and future bookings can't be archived out of conflict checks"""
+        response = service.archive("2099-12-31")
+        
+        assert response.error == INVALID_DATE
+        assert len(service.get_bookings().list) == 3
+        assert service._archive.count() == 0
+    
+    def test_archive_command_refuses_a_future_date(self, service, monkeypatch):
+        """Test that the CLI rejects --before after today"""
+        monkeypatch.setattr(config, "_get_database_path", lambda: service._db_handler.get_path())
+        monkeypatch.setattr(context, "_contexts", {})
+        
+        result = runner.invoke(app, ["archive", "--before", "2099-12-31"])
+        
+        assert "Cannot archive" in result.output
+        assert len(service.get_bookings().list) == 3
+    
+    def test_writes_archive_automatically_past_threshold(self, service, monkeypatch):
+        """Test that enough finished bookings are archived on the next write"""
+        monkeypatch.setattr(BookingService, "AUTO_ARCHIVE_THRESHOLD", 2)
+        
+        service.add("Room B", "room-2", "2099-02-10", "2099-02-15")
+        
+        assert len(service._db_handler.read("bookings").list) == 2
+        assert service._archive.count() == 2
+
+
+# ============================================================================
+# Hold Tests
+# ============================================================================
+
+def day(n: int) -> str:
+    """Day n of a test calendar that starts ten days from today, so every date is in the future"""
+    return (date.today() + timedelta(days=10 + n)).isoformat()
+
+
+class TestHolds:
+    """Tests for temporary booking holds"""
+    
+    @pytest.fixture
+    def clock(self):
+        class Clock:
+            now = 1000.0
+            def __call__(self):
+                return self.now
+        return Clock()
+    
+    @pytest.fixture
+    def service(self, tmp_path, clock):
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [], "bookings": []}))
+        service = BookingService(db_path)
+        service._holds = HoldStore(clock=clock)
+        return service
+    
+    def test_hold_blocks_availability_without_writing(self, service):
+        """Test that a hold counts as taken but is not persisted"""
+        service.hold("Room A", "room-1", day(0), day(5))
+        
+        is_available, msg = BookingValidator.check_room_availability(
+            "room-1", day(2), day(3),
+            service.get_bookings_by_room("room-1").list, service.get_holds_by_room("room-1")
+        )
+        
+        assert not is_available
+        assert "on hold" in msg
+        assert service._db_handler.read("bookings").list == []
+    
+    def test_overlapping_hold_is_rejected(self, service):
+        """Test that two holds cannot cover the same night"""
+        service.hold("Room A", "room-1", day(0), day(5))
+        
+        response = service.hold("Room A", "room-1", day(4), day(6))
+        
+        assert response.error == BOOKING_CONFLICT
+    
+    def test_confirm_persists_booking(self, service):
+        """Test that confirming a hold writes a booking and frees the hold"""
+        hold = service.hold("Room A", "room-1", day(0), day(5)).hold
+        
+        response = service.confirm(hold.id)
+        
+        assert response.error == SUCCESS
+        assert len(service.get_bookings().list) == 1
+        assert service.get_holds_by_room("room-1") == []
+    
+    def test_expired_hold_cannot_be_confirmed(self, service, clock):
+        """Test that holds disappear once their TTL passes"""
+        hold = service.hold("Room A", "room-1", day(0), day(5), ttl=60).hold
+        clock.now += 61
+        
+        assert service.get_holds_by_room("room-1") == []
+        assert service.confirm(hold.id).error == HOLD_EXPIRED
+        assert service.hold("Room A", "room-1", day(0), day(5)).error == SUCCESS
+    
+    def test_release_frees_the_room(self, service):
+        """Test that a released hold no longer blocks the dates"""
+        hold = service.hold("Room A", "room-1", day(0), day(5)).hold
+        
+        assert service.release(hold.id).error == SUCCESS
+        assert service.hold("Room A", "room-1", day(0), day(5)).error == SUCCESS
+    
+    def test_confirm_detects_booking_made_meanwhile(self, service):
+        """Test that a hold is not confirmed over a booking made elsewhere"""
+        hold = service.hold("Room A", "room-1", day(0), day(5)).hold
+        BookingService(service._db_handler.get_path()).add("Room A", "room-1", day(2), day(3))
+        
+        assert service.confirm(hold.id).error == BOOKING_CONFLICT
+
+    @pytest.mark.parametrize("start, end", [
+        ("not-a-date", day(5)),
+        ("2020-01-10", day(5)),
+        (day(5), day(5)),
+        (day(5), day(2)),
+    ])
+    def test_hold_with_invalid_dates_is_refused(self, service, start, end):
+        """Test that a hold's dates are checked like a booking's"""
+        response = service.hold("Room A", "room-1", start, end)
+
+        assert response.error == INVALID_DATE
+        assert service.get_holds_by_room("room-1") == []
+
+    def test_hold_blocks_series(self, service):
+        """Test that a recurring booking doesn't run over a held stay"""
+        hold = service.hold("Room A", "room-1", day(7), day(8)).hold
+
+        response = service.add_series("Room A", "room-1", day(0), day(1), RecurrenceRule(7, count=3))
+        skipped = service.add_series("Room A", "room-1", day(0), day(1), RecurrenceRule(7, count=3), skip_conflicts=True)
+
+        assert response.error == BOOKING_CONFLICT
+        assert response.list == [hold]
+        assert skipped.series.exceptions == [day(7)]
+
+    def test_hold_blocks_next_free(self, service):
+        """Test that held nights are not offered as free, and are once released"""
+        service._db_handler.write("rooms", [{"id": "room-1", "name": "Room A", "capacity": 2}])
+        hold = service.hold("Room A", "room-1", day(0), day(3)).hold
+
+        held = service.next_free("room-1", 2, after=day(0))
+        service.release(hold.id)
+        released = service.next_free("room-1", 2, after=day(0))
+
+        assert held.list[0].start_date == day(3)
+        assert released.list[0].start_date == day(0)
+
+
+# ============================================================================
+# Idempotency Tests
+# ============================================================================
+
+class TestIdempotency:
+    """Tests for idempotency keys on booking requests"""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [], "bookings": []}))
+        return BookingService(db_path)
+    
+    def test_retry_returns_original_booking(self, service):
+        """Test that a retried add returns the first booking without writing"""
+        first = service.add("Room A", "room-1", "2026-01-10", "2026-01-15", idempotency_key="req-1")
+        seq = service._db_handler.last_seq()
+        
+        retry = BookingService(service._db_handler.get_path()).add(
+            "Room A", "room-1", "2026-01-10", "2026-01-15", idempotency_key="req-1"
+        )
+        
+        assert retry.error == SUCCESS
+        assert retry.booking.id == first.booking.id
+        assert len(service.get_bookings().list) == 1
+        assert service._db_handler.last_seq() == seq
+    
+    def test_different_keys_create_different_bookings(self, service):
+        """Test that distinct keys are separate requests"""
+        service.add("Room A", "room-1", "2026-01-10", "2026-01-15", idempotency_key="req-1")
+        service.add("Room B", "room-2", "2026-01-10", "2026-01-15", idempotency_key="req-2")
+        
+        assert len(service.get_bookings().list) == 2
+    
+    def test_expired_key_is_forgotten(self, service, monkeypatch):
+        """Test that keys older than the TTL no longer match"""
+        first = service.add("Room A", "room-1", "2026-01-10", "2026-01-15", idempotency_key="req-1")
+        
+        later = time.time() + BookingService.IDEMPOTENCY_TTL + 1
+        monkeypatch.setattr(time, "time", lambda: later)
+        
+        assert service.get_idempotent_booking("req-1").error != SUCCESS
+        retry = service.add("Room A", "room-1", "2026-02-10", "2026-02-15", idempotency_key="req-1")
+        assert retry.booking.id != first.booking.id
+    
+    def test_key_store_is_bounded(self, service, monkeypatch):
+        """Test that only the newest keys are kept"""
+        monkeypatch.setattr(BookingService, "IDEMPOTENCY_MAX_KEYS", 2)
+        
+        for i in range(4):
+            service.add("Room A", "room-1", f"2026-01-{10 + i}", f"2026-01-{11 + i}", idempotency_key=f"req-{i}")
+        
+        stored = list(service._idempotency.entries())
+        assert stored == ["req-2", "req-3"]
+    
+    def test_keys_stay_out_of_the_database_and_change_feed(self, service):
+        """Test that idempotency keys are neither database records nor logged changes"""
+        service.add("Room A", "room-1", "2026-01-10", "2026-01-15", idempotency_key="req-1")
+        
+        logged = list(service._db_handler.changes(0))
+        
+        assert [change["key"] for change in logged] == ["bookings"]
+        assert "idempotency" not in json.loads(service._db_handler.get_path().read_text())
+        assert service._db_handler.last_seq() == 1
+    
+    def test_key_with_repeating_booking_is_refused(self, tmp_path, monkeypatch):
+        """Test that the book command refuses a key it could not honour for a series"""
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({"rooms": [{"id": "room-1", "name": "Garden", "capacity": 2}], "bookings": []}))
+        monkeypatch.setattr(config, "_get_database_path", lambda: db_path)
+        monkeypatch.setattr(context, "_contexts", {})
+        
+        result = runner.invoke(app, [
+            "book", "-r", "Garden", "-s", "2030-01-05", "-e", "2030-01-06", "--repeat", "weekly", "--count", "3", "-k", "req-1"
+        ])
+        
+        assert "can't be used with a repeating booking" in result.output
+        assert "series" not in json.loads(db_path.read_text())
+
+
+# ============================================================================
+# Next Free Window Tests
+# ============================================================================
+
+class TestNextFree:
+    """Tests for finding the next free window of a room"""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({
+            "rooms": [
+                {"id": "room-1", "name": "Room A", "capacity": 2},
+                {"id": "room-2", "name": "Room B", "capacity": 4},
+            ],
+            "bookings": []
+        }))
+        service = BookingService(db_path)
+        service.add("Room A", "room-1", day(5), day(10))
+        service.add("Room A", "room-1", day(12), day(20))
+        service.add("Room B", "room-2", day(1), day(8))
+        return service
+    
+    def test_skips_gaps_that_are_too_short(self, service):
+        """Test that a two-night gap is passed over for a three-night stay"""
+        result = service.next_free("room-1", 3, after=day(6))
+        
+        assert result.error == SUCCESS
+        assert [(w.start_date, w.end_date) for w in result.list] == [(day(20), day(23))]
+    
+    def test_earliest_windows(self, service):
+        """Test that the k earliest windows come one per gap, in order"""
+        result = service.next_free("room-1", 2, after=day(1), limit=3)
+        
+        assert [w.start_date for w in result.list] == [day(1), day(10), day(20)]
+    
+    def test_sees_new_bookings(self, service):
+        """Test that the gap index is refreshed after a write"""
+        service.next_free("room-1", 2, after=day(10))
+        service.add("Room A", "room-1", day(10), day(12))
+        
+        result = service.next_free("room-1", 2, after=day(10))
+        
+        assert result.list[0].start_date == day(20)
+    
+    def test_any_room(self, service):
+        """Test that the cross-room search returns the earliest window of any room"""
+        result = service.next_free_any(5, after=day(3), limit=2)
+        
+        assert [(w.room_name, w.start_date) for w in result.list] == [
+            ("Room B", day(8)), ("Room A", day(20))
+        ]
+    
+    def test_any_room_filters_by_party_size(self, service):
+        """Test that rooms too small for the party are skipped"""
+        result = service.next_free_any(1, after=day(3), party_size=3)
+        
+        assert [w.room_id for w in result.list] == ["room-2"]
+    
+    def test_rejects_invalid_input(self, service):
+        """Test that a bad date or length is reported"""
+        assert service.next_free("room-1", 0, after=day(1)).error == INVALID_DATE
+        assert service.next_free("room-1", 2, after="soon").error == INVALID_DATE
+    
+    def test_past_after_is_clamped_to_today(self, service):
+        """Test that no window starts before today, whatever after says"""
+        result = service.next_free("room-2", 2, after="2000-01-01")
+        
+        assert [w.start_date for w in result.list] == [date.today().isoformat()]
+    
+    def test_unpadded_stored_booking(self, tmp_path):
+        """Test that a stay stored before dates were normalized still blocks its nights"""
+        db_path = tmp_path / "booking.json"
+        db_path.write_text(json.dumps({
+            "rooms": [{"id": "room-1", "name": "Room A", "capacity": 2}],
+            "bookings": [
+                {"id": "b-1", "room_name": "Room A", "room_id": "room-1", "start_date": "2030-1-5", "end_date": "2030-1-9"}
+            ]
+        }))
+        
+        result = BookingService(db_path).next_free("room-1", 2, after="2030-01-05")
+        
+        assert result.error == SUCCESS
+        assert [w.start_date for w in result.list] == ["2030-01-09"]
@@ -0,0 +1,68 @@
+import pytest
+from pathlib import Path
+
+from booking.changes import ChangeLog
+from booking.database import DatabaseHandler
+from booking.models.book import BookingService
+from booking.models.room import RoomService
+
+
+# ========== TEST: CHANGE FEED ==========
+def test_writes_are_logged_with_sequence_numbers(json_db: Path):
+    """Test that each inserted record gets its own sequence number."""
+    # Arrange
+    rooms = RoomService(json_db)
+    bookings = BookingService(json_db)
+    
+    # Act
+    rooms.add("room a", 10)
+    bookings.add("Room a.", "room-1", "2026-01-10", "2026-01-15")
+    
+    # Assert
+    changes = list(DatabaseHandler(json_db).changes())
+    assert [c["seq"] for c in changes] == [1, 2]
+    assert [(c["key"], c["op"]) for c in changes] == [("rooms", "insert"), ("bookings", "insert")]
+    assert DatabaseHandler(json_db).last_seq() == 2
+
+
+def test_changes_since_only_returns_deltas(json_db: Path):
+    """Test that a consumer only receives changes after its last sequence."""
+    # Arrange
+    service = BookingService(json_db)
+    for day in range(10, 20):
+        service.add("Room A", "room-1", f"2026-01-{day}", f"2026-01-{day + 1}")
+    
+    # Act
+    changes = list(DatabaseHandler(json_db).changes(since=7))
+    
+    # Assert
+    assert [c["seq"] for c in changes] == [8, 9, 10]
+    assert changes[0]["record"]["start_date"] == "2026-01-17"
+
+
+def test_updates_and_deletes_are_logged(json_db: Path):
+    """Test that edits and removals show up as update and delete entries."""
+    # Arrange
+    handler = DatabaseHandler(json_db)
+    handler.write("rooms", [{"id": "1", "name": "a", "capacity": 1}, {"id": "2", "name": "b", "capacity": 2}])
+    
+    # Act
+    handler.write("rooms", [{"id": "1", "name": "a", "capacity": 5}])
+    
+    # Assert
+    changes = list(handler.changes(since=2))
+    assert [(c["op"], c["id"]) for c in changes] == [("update", "1"), ("delete", "2")]
+
+
+@pytest.mark.parametrize("since", [0, 1, 5, 49, 50, 99, 100, 120])
+def test_change_log_seek(tmp_path: Path, since: int):
+    """Test that bisecting the log finds the first newer entry."""
+    # Arrange
+    log = ChangeLog(tmp_path / "log.jsonl")
+    log.append([{"key": "bookings", "op": "insert", "id": str(i), "record": {"pad": "x" * i}} for i in range(100)], 1)
+    
+    # Act
+    seqs = [c["seq"] for c in log.since(since)]
+    
+    # Assert
+    assert seqs == list(range(since + 1, 101))
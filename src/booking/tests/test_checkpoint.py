@@ -0,0 +1,144 @@
+import json
+import marshal
+import zlib
+from pathlib import Path
+from typer.testing import CliRunner
+
+from booking import SUCCESS, cli, config, database
+from booking.checkpoint import _HEADER, FORMAT_VERSION, MAGIC, SnapshotStore, snapshots_path
+from booking.cli import app
+from booking.database import DatabaseHandler
+from booking.models.book import BookingService
+
+runner = CliRunner()
+
+
+def _add_bookings(json_db: Path, count: int, first: int = 0) -> None:
+    service = BookingService(json_db)
+    for i in range(first, first + count):
+        service.add("Room A.", "room-a", f"2030-01-{i + 1:02d}", f"2030-01-{i + 2:02d}")
+
+
+def _no_json_parsing(monkeypatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("database file was parsed")
+    monkeypatch.setattr(database.json, "load", fail)
+
+
+# ========== TEST: RECOVERY ==========
+def test_startup_replays_log_tail_after_snapshot(json_db: Path, monkeypatch):
+    """Test that a new handler rebuilds the contents from the snapshot and the log."""
+    # Arrange
+    _add_bookings(json_db, 3)
+    assert DatabaseHandler(json_db).checkpoint().code == SUCCESS
+    _add_bookings(json_db, 2, first=3)
+    expected = json.loads(json_db.read_text())
+    _no_json_parsing(monkeypatch)
+    
+    # Act
+    handler = DatabaseHandler(json_db)
+    bookings = handler.read("bookings").list
+    stays = handler.indexes().stays("room-a")
+    
+    # Assert
+    assert sorted(b["id"] for b in bookings) == sorted(b["id"] for b in expected["bookings"])
+    assert handler.last_seq() == expected["change_seq"]
+    assert len(stays) == 5
+
+
+def test_corrupt_snapshot_falls_back_to_older_one(json_db: Path, monkeypatch):
+    """Test that a damaged newest snapshot is skipped for the previous one."""
+    # Arrange
+    _add_bookings(json_db, 2)
+    DatabaseHandler(json_db).checkpoint()
+    _add_bookings(json_db, 2, first=2)
+    newest = DatabaseHandler(json_db).checkpoint().list[0]
+    _add_bookings(json_db, 1, first=4)
+    snapshot_file = snapshots_path(json_db) / f"snapshot-{newest['seq']:012d}.bin"
+    raw = bytearray(snapshot_file.read_bytes())
+    raw[-1] ^= 0xFF
+    snapshot_file.write_bytes(bytes(raw))
+    _no_json_parsing(monkeypatch)
+    
+    # Act
+    bookings = DatabaseHandler(json_db).read("bookings").list
+    
+    # Assert
+    assert len(bookings) == 5
+
+
+def test_outside_edit_falls_back_to_parsing(json_db: Path):
+    """Test that a file changed without going through the log is parsed instead."""
+    # Arrange
+    _add_bookings(json_db, 2)
+    DatabaseHandler(json_db).checkpoint()
+    data = json.loads(json_db.read_text())
+    data["bookings"] = data["bookings"][:1]
+    json_db.write_text(json.dumps(data))
+    
+    # Act
+    bookings = DatabaseHandler(json_db).read("bookings").list
+    
+    # Assert
+    assert len(bookings) == 1
+
+
+def test_snapshot_with_code_is_refused(json_db: Path):
+    """Test that a well-formed snapshot carrying a code object is skipped, not loaded."""
+    # Arrange
+    _add_bookings(json_db, 2)
+    DatabaseHandler(json_db).checkpoint()
+    snapshot_file = next(snapshots_path(json_db).glob("snapshot-*.bin"))
+    payload = marshal.dumps({"stamp": None, "data": compile("print('owned')", "<snapshot>", "exec"), "index": {}})
+    snapshot_file.write_bytes(_HEADER.pack(MAGIC, FORMAT_VERSION, 2, len(payload), zlib.crc32(payload)) + payload)
+    
+    # Act
+    snapshot = SnapshotStore(snapshots_path(json_db)).load_latest()
+    
+    # Assert
+    assert snapshot is None
+
+
+# ========== TEST: CHECKPOINTS ==========
+def test_checkpoint_taken_automatically(json_db: Path, monkeypatch):
+    """Test that writes snapshot the database once enough mutations piled up."""
+    # Arrange
+    monkeypatch.setattr(DatabaseHandler, "CHECKPOINT_INTERVAL", 3)
+    
+    # Act
+    _add_bookings(json_db, 4)
+    
+    # Assert
+    snapshot = SnapshotStore(snapshots_path(json_db)).load_latest()
+    assert snapshot is not None
+    assert snapshot.seq == 3
+    assert len(snapshot.data["bookings"]) == 3
+
+
+def test_only_newest_snapshots_are_kept(json_db: Path):
+    """Test that old snapshot files are pruned."""
+    # Arrange
+    handler = DatabaseHandler(json_db)
+    
+    # Act
+    for i in range(4):
+        _add_bookings(json_db, 1, first=i)
+        handler.checkpoint()
+    
+    # Assert
+    files = sorted(p.name for p in snapshots_path(json_db).iterdir())
+    assert files == ["snapshot-000000000003.bin", "snapshot-000000000004.bin"]
+
+
+def test_checkpoint_command(json_db: Path, monkeypatch):
+    """Test the checkpoint command reports the sequence number it covers."""
+    # Arrange
+    monkeypatch.setattr(config, "_get_database_path", lambda: json_db)
+    _add_bookings(json_db, 2)
+    
+    # Act
+    result = runner.invoke(app, ["checkpoint"])
+    
+    # Assert
+    assert result.exit_code == 0
+    assert "Checkpoint at change 2" in result.output
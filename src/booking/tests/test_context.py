@@ -0,0 +1,186 @@
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typer.testing import CliRunner
+
+from booking import SUCCESS, cli, config, context
+from booking.cli import app
+from booking.context import clear_contexts, get_context
+
+runner = CliRunner()
+
+
+# ========== TEST: SHARED CONTEXT ==========
+def test_context_is_built_once_per_database(json_db: Path):
+    """Test that every caller of one database gets the same services."""
+    # Act
+    first = get_context(json_db)
+    second = get_context(json_db.parent / "." / json_db.name)
+
+    # Assert
+    assert first is second
+    assert first.rooms._db_handler is first.db_handler
+    assert first.bookings._db_handler is first.db_handler
+    assert first.allocation._room_service is first.rooms
+    assert first.allocation._booking_service is first.bookings
+
+
+def test_read_only_context_is_separate(json_db: Path):
+    """Test that a read-only context doesn't hand out the writable handler."""
+    # Act
+    writable = get_context(json_db)
+    read_only = get_context(json_db, read_only=True)
+
+    # Assert
+    assert read_only is not writable
+    assert read_only.db_handler.is_read_only()
+    assert not writable.db_handler.is_read_only()
+
+
+def test_services_see_each_others_writes(json_db: Path):
+    """Test that a room added through one service is bookable through the other."""
+    # Arrange
+    shared = get_context(json_db)
+    shared.rooms.add("Salon", 4)
+    room = shared.rooms.get_room_by_name("Salon.").list[0]
+
+    # Act
+    response = shared.bookings.add(room["name"], room["id"], "2030-01-01", "2030-01-03")
+
+    # Assert
+    assert response.error == SUCCESS
+    assert shared.bookings.get_bookings_by_room(room["id"]).list[0].id == response.booking.id
+
+
+def test_threads_share_the_context_safely(json_db: Path):
+    """Test that threads writing and reading through one context lose nothing."""
+    # Arrange
+    shared = get_context(json_db)
+
+    def work(worker: int) -> None:
+        for i in range(10):
+            shared.rooms.add(f"room {worker}-{i}", 2)
+            shared.bookings.add("Room 0.", f"room-{worker}", f"2030-01-{i + 1:02d}", f"2030-01-{i + 2:02d}")
+            shared.db_handler.indexes().stays(f"room-{worker}")
+            shared.bookings.get_stays(f"room-{worker}", "2030-01-01", "2030-02-01")
+
+    # Act
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(8)))
+
+    # Assert
+    stored = json.loads(json_db.read_text())
+    assert len(stored["rooms"]) == 80
+    assert len(stored["bookings"]) == 80
+    index = get_context(json_db, read_only=True).db_handler.indexes()
+    assert all(len(index.stays(f"room-{worker}")) == 10 for worker in range(8))
+    assert len(shared.db_handler.indexes().rooms()) == 80
+
+
+def test_clear_contexts_builds_new_services(json_db: Path):
+    """Test that clearing the registry drops the shared services."""
+    # Arrange
+    before = get_context(json_db)
+
+    # Act
+    clear_contexts()
+
+    # Assert
+    assert get_context(json_db) is not before
+
+
+def test_context_defaults_to_configured_database(json_db: Path, config_file: Path):
+    """Test that no path means the database named in config.ini."""
+    # Arrange
+    config_file.write_text(f"[General]\ndatabase = {json_db}\n")
+
+    # Act
+    shared = get_context()
+
+    # Assert
+    assert shared.db_path == json_db
+
+
+# ========== TEST: CONFIG ==========
+def test_config_is_parsed_once_until_it_changes(json_db: Path, config_file: Path, monkeypatch):
+    """Test that repeated lookups reuse the parsed config.ini and notice edits."""
+    # Arrange
+    config_file.write_text(f"[General]\ndatabase = {json_db}\n")
+    reads = []
+    original = config.ConfigParser.read
+    monkeypatch.setattr(config.ConfigParser, "read", lambda self, *args, **kwargs: reads.append(1) or original(self, *args, **kwargs))
+
+    # Act
+    paths = [config._get_database_path() for _ in range(5)]
+    config_file.write_text("[General]\ndatabase = /elsewhere/booking.json\n")
+    changed = config._get_database_path()
+
+    # Assert
+    assert paths == [json_db] * 5
+    assert changed == Path("/elsewhere/booking.json")
+    assert len(reads) == 2
+
+
+# ========== TEST: CLI ==========
+def test_edit_uses_configured_database(json_db: Path, config_file: Path):
+    """Test that edit works on the configured database, like the other commands."""
+    # Arrange
+    config_file.write_text(f"[General]\ndatabase = {json_db}\n")
+    runner.invoke(app, ["add", "--name", "Salon", "--capacity", "4"])
+
+    # Act
+    result = runner.invoke(app, ["edit", "--room-name", "salon.", "--new-capacity", "6"])
+
+    # Assert
+    assert result.exit_code == 0
+    assert "Room edited" in result.output
+    assert json.loads(json_db.read_text())["rooms"][0]["capacity"] == 6
+
+
+def test_edit_reports_missing_room(json_db: Path, config_file: Path):
+    """Test that editing an unknown room fails instead of printing the response."""
+    # Arrange
+    config_file.write_text(f"[General]\ndatabase = {json_db}\n")
+
+    # Act
+    result = runner.invoke(app, ["edit", "--room-name", "nowhere", "--new-capacity", "6"])
+
+    # Assert
+    assert result.exit_code == 1
+    assert "Editing room failed" in result.output
+
+
+def test_commands_share_one_handler(json_db: Path, config_file: Path):
+    """Test that the CLI routes every command through the shared context."""
+    # Arrange
+    config_file.write_text(f"[General]\ndatabase = {json_db}\n")
+
+    # Act
+    runner.invoke(app, ["add", "--name", "Salon", "--capacity", "4"])
+    runner.invoke(app, ["get"])
+    runner.invoke(app, ["changes"])
+
+    # Assert
+    assert list(context._contexts) == [(str(json_db), False)]
+
+
+# ========== FIXTURES ==========
+@pytest.fixture(autouse=True)
+def fresh_contexts(monkeypatch):
+    """
+    Gives each test an empty context registry.
+    """
+    monkeypatch.setattr(context, "_contexts", {})
+
+
+@pytest.fixture
+def config_file(tmp_path: Path, monkeypatch) -> Path:
+    """
+    Points the app at an empty config.ini in the test directory.
+    """
+    config_path = tmp_path / "config.ini"
+    config_path.touch()
+    monkeypatch.setattr(config, "CONFIG_DIR_PATH", tmp_path)
+    monkeypatch.setattr(config, "CONFIG_FILE_PATH", config_path)
+    return config_path
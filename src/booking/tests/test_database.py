@@ -0,0 +1,73 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from booking import DB_READ_ERROR, JSON_ERROR, SUCCESS, metrics
+from booking.changes import ChangeLog
+from booking.database import DatabaseHandler
+
+
+def _write_rooms(db_path: Path, worker: int, count: int) -> None:
+    handler = DatabaseHandler(db_path)
+    for i in range(count):
+        with handler.transaction():
+            rooms = handler.read("rooms").list
+            rooms.append({"id": f"{worker}-{i}", "name": f"room {worker}-{i}", "capacity": 2})
+            handler.write("rooms", rooms)
+
+
+# ========== TEST: WRITES ==========
+def test_concurrent_processes_keep_every_write(json_db: Path):
+    """Test that writers in several processes neither tear the file nor lose records."""
+    # Act
+    with ProcessPoolExecutor(max_workers=6) as executor:
+        list(executor.map(_write_rooms, [json_db] * 6, range(6), [20] * 6))
+
+    # Assert
+    rooms = json.loads(json_db.read_text())["rooms"]
+    assert len(rooms) == 6 * 20
+    assert not list(json_db.parent.glob("*.tmp"))
+
+
+def test_corrupt_database_is_not_overwritten(json_db: Path):
+    """Test that a write refuses to start from a file it cannot decode."""
+    # Arrange
+    json_db.write_text('{"rooms": [], "bookings": []}\n}')
+    handler = DatabaseHandler(json_db)
+
+    # Act
+    read = handler.read("rooms")
+    write = handler.write("bookings", [{"id": "b-1"}])
+
+    # Assert
+    assert read.code == DB_READ_ERROR
+    assert write.code == JSON_ERROR
+    assert json_db.read_text() == '{"rooms": [], "bookings": []}\n}'
+
+
+def test_write_leaves_no_temporary_file(json_db: Path):
+    """Test that the temporary file of a write is renamed over the database."""
+    # Act
+    response = DatabaseHandler(json_db).write("rooms", [{"id": "r-1", "name": "a", "capacity": 1}])
+
+    # Assert
+    assert response.code == SUCCESS
+    assert not list(json_db.parent.glob("*.tmp"))
+    assert json.loads(json_db.read_text())["rooms"][0]["id"] == "r-1"
+
+
+def test_write_stands_when_the_change_log_cannot_be_appended(json_db: Path, monkeypatch):
+    """Test that a write already on disk is reported as done, not as a failure to retry."""
+    # Arrange
+    def fail(self, *args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(ChangeLog, "append", fail)
+    errors = metrics.CHANGE_LOG_ERRORS.value()
+    
+    # Act
+    response = DatabaseHandler(json_db).write("rooms", [{"id": "r-1", "name": "a", "capacity": 1}])
+    
+    # Assert
+    assert response.code == SUCCESS
+    assert json.loads(json_db.read_text())["rooms"][0]["id"] == "r-1"
+    assert metrics.CHANGE_LOG_ERRORS.value() == errors + 1
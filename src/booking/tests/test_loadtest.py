@@ -0,0 +1,69 @@
+from booking.loadtest import LoadTestConfig, find_overlaps, percentile, run_load_test
+from booking.models.book import Booking
+
+
+def _booking(booking_id: str, room_id: str, start_date: str, end_date: str) -> Booking:
+    return Booking(booking_id, "", room_id, start_date, end_date)
+
+
+# ========== TEST: INTEGRITY CHECK ==========
+def test_find_overlaps_reports_shared_nights_per_room():
+    """Test that only bookings of the same room sharing a night are reported."""
+    # Arrange
+    bookings = [
+        _booking("a", "room-1", "2030-01-01", "2030-01-10"),
+        _booking("b", "room-1", "2030-01-03", "2030-01-04"),
+        _booking("c", "room-1", "2030-01-05", "2030-01-06"),
+        _booking("d", "room-1", "2030-01-10", "2030-01-12"),
+        _booking("e", "room-2", "2030-01-03", "2030-01-04"),
+    ]
+    
+    # Act
+    overlaps = find_overlaps(bookings)
+    
+    # Assert
+    assert [(first.id, second.id) for first, second in overlaps] == [("a", "b"), ("a", "c")]
+
+
+def test_percentile_uses_nearest_rank():
+    """Test p50 and p99 of a known distribution."""
+    # Arrange
+    values = [float(i) for i in range(1, 101)]
+    
+    # Act / Assert
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.99) == 0.0
+
+
+# ========== TEST: LOAD RUN ==========
+def test_single_client_run_keeps_database_consistent():
+    """Test that one client's bookings are all stored without overlaps."""
+    # Arrange
+    config = LoadTestConfig(workers=1, operations=40, rooms=3, seed=7)
+    
+    # Act
+    report = run_load_test(config)
+    
+    # Assert
+    assert report.operations == 40
+    assert report.latencies["all"].count == 40
+    assert report.bookings > 0
+    assert report.errors == 0
+    assert report.lost_updates == 0
+    assert report.overlaps == []
+
+
+def test_concurrent_clients_never_double_book():
+    """Test that clients racing for a few hot rooms leave no lost or overlapping bookings."""
+    # Arrange
+    config = LoadTestConfig(workers=4, operations=60, rooms=2, hot_skew=2.0, seed=3)
+    
+    # Act
+    report = run_load_test(config)
+    
+    # Assert
+    assert report.errors == 0
+    assert report.conflicts > 0
+    assert report.lost_updates == 0
+    assert report.overlaps == []
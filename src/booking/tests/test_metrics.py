@@ -0,0 +1,151 @@
+import urllib.request
+from pathlib import Path
+from typer.testing import CliRunner
+
+from booking import BOOKING_CONFLICT, metrics
+from booking.cli import app
+from booking.metrics import Counter, Histogram, Registry
+from booking.models.book import BookingService
+from booking.validators import BookingValidator
+
+runner = CliRunner()
+
+
+# ========== TEST: METRIC TYPES ==========
+def test_counter_by_label():
+    """Test that counters keep one value per label set."""
+    # Arrange
+    counter = Counter("rejected_total", "Rejected")
+    
+    # Act
+    counter.inc(reason="conflict")
+    counter.inc(2, reason="hold")
+    counter.inc(reason="conflict")
+    
+    # Assert
+    assert counter.value(reason="conflict") == 2
+    assert 'rejected_total{reason="hold"} 2' in counter.render()
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that histogram buckets are cumulative and end in +Inf."""
+    # Arrange
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    
+    # Act
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+    
+    # Assert
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_count 4" in lines
+
+
+# ========== TEST: INSTRUMENTATION ==========
+def test_database_reads_count_cache_hits(json_db: Path):
+    """Test that repeated reads of an unchanged file are cache hits."""
+    # Arrange
+    service = BookingService(json_db)
+    hits = metrics.DB_CACHE_HITS.value()
+    misses = metrics.DB_CACHE_MISSES.value()
+    
+    # Act
+    service.get_bookings()
+    service.get_bookings()
+    
+    # Assert
+    assert metrics.DB_CACHE_MISSES.value() == misses + 1
+    assert metrics.DB_CACHE_HITS.value() >= hits + 2
+
+
+def test_rejected_bookings_are_counted(json_db: Path):
+    """Test that a conflicting booking is counted once as rejected."""
+    # Arrange
+    service = BookingService(json_db)
+    service.add("Room A", "room-1", "2030-01-10", "2030-01-15")
+    rejected = metrics.BOOKINGS_REJECTED.value(reason="conflict")
+    checks = metrics.CONFLICT_CHECK_SECONDS.count()
+    
+    # Act
+    response = service.add("Room A", "room-1", "2030-01-12", "2030-01-13")
+    
+    # Assert
+    assert response.error == BOOKING_CONFLICT
+    assert metrics.BOOKINGS_REJECTED.value(reason="conflict") == rejected + 1
+    assert metrics.CONFLICT_CHECK_SECONDS.count() == checks + 1
+
+
+def test_only_booking_requests_are_counted_as_rejected(json_db: Path):
+    """Test that refused holds and availability checks are not rejected bookings."""
+    # Arrange
+    service = BookingService(json_db)
+    service.hold("Room A", "room-1", "2030-01-10", "2030-01-15")
+    before = {reason: metrics.BOOKINGS_REJECTED.value(reason=reason) for reason in ("conflict", "hold", "invalid_dates")}
+    
+    # Act
+    service.hold("Room A", "room-1", "2030-01-12", "2030-01-13")
+    service.hold("Room A", "room-1", "2020-01-12", "2020-01-13")
+    BookingValidator.check_room_availability("room-1", "2030-01-12", "2030-01-13", [], service.get_holds_by_room("room-1"))
+    service.add("Room A", "room-1", "2030-01-12", "2030-01-13")
+    
+    # Assert
+    after = {reason: metrics.BOOKINGS_REJECTED.value(reason=reason) for reason in before}
+    assert after == {**before, "hold": before["hold"] + 1}
+
+
+def test_http_listener_serves_metrics():
+    """Test that /metrics returns the registry in text format."""
+    # Arrange
+    registry = Registry()
+    registry.counter("served_total", "Served").inc()
+    server = metrics.serve(0, registry=registry)
+    
+    try:
+        # Act
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+    
+    # Assert
+    assert "# TYPE served_total counter" in body
+    assert "served_total 1" in body
+
+
+# ========== TEST: CLI ==========
+def test_metrics_command_reads_a_running_listener():
+    """Test that --port prints the registry of the process serving it."""
+    # Arrange
+    registry = Registry()
+    registry.counter("served_total", "Served").inc(3)
+    server = metrics.serve(0, registry=registry)
+    
+    try:
+        # Act
+        result = runner.invoke(app, ["metrics", "--port", str(server.server_address[1])])
+    finally:
+        server.shutdown()
+    
+    # Assert
+    assert result.exit_code == 0
+    assert "served_total 3" in result.output
+
+
+def test_metrics_command_reports_missing_listener():
+    """Test that --port fails when nothing is listening."""
+    # Arrange
+    server = metrics.serve(0, registry=Registry())
+    port = server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    
+    # Act
+    result = runner.invoke(app, ["metrics", "--port", str(port)])
+    
+    # Assert
+    assert result.exit_code == 1
+    assert "Reading metrics failed" in result.output
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+from booking.database import DatabaseHandler
+from booking.models.book import BookingService
+from booking.models.room import RoomService
+from booking.persisted_index import PersistedIndex, index_path
+from booking.recurrence import RecurrenceRule
+
+
+# ========== TEST: PERSISTED INDEX ==========
+def test_index_is_saved_next_to_database(json_db: Path):
+    """Test that looking up a room writes a stamped index file."""
+    # Arrange
+    rooms = RoomService(json_db)
+    rooms.add("room a", 10)
+    
+    # Act
+    response = rooms.get_room_by_name("ROOM A.")
+    
+    # Assert
+    assert response.list[0]["capacity"] == 10
+    saved = json.loads(index_path(json_db).read_text())
+    assert saved["stamp"] == list(DatabaseHandler(json_db).version())
+
+
+def test_writes_update_index_without_rebuild(json_db: Path, monkeypatch):
+    """Test that writes through the services keep the index fresh incrementally."""
+    # Arrange
+    rooms = RoomService(json_db)
+    bookings = BookingService(json_db)
+    rooms.add("room a", 10)
+    room_id = rooms.get_room_by_name("room a.").list[0]["id"]
+    rebuilds = []
+    original = PersistedIndex.rebuild
+    
+    def counting_rebuild(self, data, version):
+        rebuilds.append(1)
+        original(self, data, version)
+    
+    monkeypatch.setattr(PersistedIndex, "rebuild", counting_rebuild)
+    
+    # Act
+    bookings.add("Room a.", room_id, "2026-01-10", "2026-01-15")
+    bookings.add_series("Room a.", room_id, "2026-02-02", "2026-02-03", RecurrenceRule.from_frequency("weekly", count=3))
+    rooms.add("room b", 4)
+    stays = BookingService(json_db).get_stays(room_id).list
+    
+    # Assert
+    assert rebuilds == []
+    assert [b.start_date for b in stays] == ["2026-01-10", "2026-02-02", "2026-02-09", "2026-02-16"]
+    assert RoomService(json_db).get_room_by_name("room b.").list[0]["capacity"] == 4
+
+
+def test_external_change_triggers_rebuild(json_db: Path):
+    """Test that a stamp mismatch rebuilds the index from the database."""
+    # Arrange
+    bookings = BookingService(json_db)
+    bookings.add("Room A", "room-1", "2026-01-10", "2026-01-15")
+    bookings.get_stays("room-1")
+    data = json.loads(json_db.read_text())
+    data["bookings"].append({
+        "id": "manual", "room_name": "Room A", "room_id": "room-1",
+        "start_date": "2026-03-01", "end_date": "2026-03-02"
+    })
+    json_db.write_text(json.dumps(data, indent=2))
+    
+    # Act
+    stays = BookingService(json_db).get_stays("room-1").list
+    
+    # Assert
+    assert [b.id for b in stays][-1] == "manual"
+
+
+def test_overlapping_stays_by_bisect(json_db: Path):
+    """Test that only stays occupying a night in the range are returned."""
+    # Arrange
+    bookings = BookingService(json_db)
+    for start, end in [("2026-01-01", "2026-01-05"), ("2026-01-05", "2026-01-10"), ("2026-01-12", "2026-01-14")]:
+        bookings.add("Room A", "room-1", start, end)
+    
+    # Act
+    stays = bookings.get_stays("room-1", "2026-01-04", "2026-01-11").list
+    
+    # Assert
+    assert [b.start_date for b in stays] == ["2026-01-01", "2026-01-05"]
+
+
+def test_overlapping_finds_stays_behind_a_shorter_overlapping_one(json_db: Path):
+    """Test that a long stay is found even when a shorter one inside it ends before the range."""
+    # Arrange
+    bookings = BookingService(json_db)
+    # add() refuses overlapping stays, so write them as an older version could have
+    DatabaseHandler(json_db).write("bookings", [
+        {"id": "long", "room_name": "Room A", "room_id": "room-1", "start_date": "2026-01-01", "end_date": "2026-01-20"},
+        {"id": "short", "room_name": "Room A", "room_id": "room-1", "start_date": "2026-01-02", "end_date": "2026-01-03"},
+    ])
+    
+    # Act
+    stays = bookings.get_stays("room-1", "2026-01-10", "2026-01-11").list
+    
+    # Assert
+    assert [(b.start_date, b.end_date) for b in stays] == [("2026-01-01", "2026-01-20")]
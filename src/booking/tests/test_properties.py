@@ -0,0 +1,140 @@
+import json
+import pytest
+from pathlib import Path
+from typer.testing import CliRunner
+
+from booking import cli, config, context, SUCCESS, DB_READ_ERROR
+from booking.cli import app
+from booking.properties import merge_rooms, report_properties, search_properties
+
+runner = CliRunner()
+
+
+# ========== TEST: CONFIG ==========
+def test_init_registers_property_without_touching_others(config_file: Path, tmp_path: Path):
+    """Test that each property gets its own entry next to the default database."""
+    # Arrange
+    config.init_app(str(tmp_path / "default.json"))
+    
+    # Act
+    config.init_app(str(tmp_path / "north.json"), "North")
+    config.init_app(str(tmp_path / "south.json"), "south")
+    
+    # Assert
+    assert config._get_database_path() == tmp_path / "default.json"
+    assert config._get_property_paths() == {"north": tmp_path / "north.json", "south": tmp_path / "south.json"}
+    assert config._get_property_path("NORTH") == tmp_path / "north.json"
+
+
+def test_property_option_selects_database(properties: dict):
+    """Test that --property runs a command against that property's database."""
+    # Act
+    result = runner.invoke(app, ["--property", "south", "get"])
+    
+    # Assert
+    assert result.exit_code == 0
+    assert "Suite" in result.output
+    assert "Twin" not in result.output
+
+
+def test_unknown_property_is_an_error(properties: dict):
+    """Test that a property missing from config.ini is reported."""
+    # Act
+    result = runner.invoke(app, ["--property", "east", "get"])
+    
+    # Assert
+    assert result.exit_code == 1
+    assert "no database is configured" in result.output
+
+
+# ========== TEST: CROSS-PROPERTY SEARCH ==========
+def test_search_merges_free_rooms_of_every_property(properties: dict):
+    """Test that free rooms from all properties come back smallest first."""
+    # Act
+    results = search_properties(properties, "2030-01-02", "2030-01-04")
+    
+    # Assert
+    assert all(result.error == SUCCESS for result in results)
+    assert [(r.property, r.room["name"]) for r in merge_rooms(results)] == [
+        ("north", "Single"), ("south", "Suite")
+    ]
+
+
+def test_search_filters_by_party_size_in_processes(properties: dict):
+    """Test that the process pool gives the same answer as threads."""
+    # Act
+    results = search_properties(properties, "2030-01-10", "2030-01-12", party_size=3, processes=True)
+    
+    # Assert
+    assert [(r.property, r.room["name"]) for r in merge_rooms(results)] == [("south", "Suite")]
+
+
+def test_search_reports_unreadable_property(properties: dict, tmp_path: Path):
+    """Test that a missing database only fails its own property."""
+    # Arrange
+    properties["west"] = tmp_path / "missing.json"
+    
+    # Act
+    results = search_properties(properties, "2030-01-02", "2030-01-04")
+    
+    # Assert
+    assert [result.error for result in results] == [SUCCESS, SUCCESS, DB_READ_ERROR]
+
+
+# ========== TEST: CROSS-PROPERTY REPORT ==========
+def test_report_counts_nights_inside_range(properties: dict):
+    """Test that stays are clipped to the report range."""
+    # Act
+    north, south = report_properties(properties, "2030-01-03", "2030-01-05")
+    
+    # Assert
+    assert (north.rooms, north.bookings, north.booked_nights, north.available_nights) == (2, 1, 2, 4)
+    assert north.occupancy == 0.5
+    assert south.bookings == 0
+
+
+def test_report_command(properties: dict):
+    """Test the report command prints every property and a total."""
+    # Act
+    result = runner.invoke(app, ["report", "--from", "2030-01-03", "--to", "2030-01-05"])
+    
+    # Assert
+    assert result.exit_code == 0
+    assert "north: 2 room(s), 1 booking(s), 2/4 nights (50%)" in result.output
+    assert "Total: 2/6 nights (33%)" in result.output
+
+
+@pytest.fixture
+def config_file(tmp_path: Path, monkeypatch) -> Path:
+    config_path = tmp_path / "config.ini"
+    monkeypatch.setattr(config, "CONFIG_DIR_PATH", tmp_path)
+    monkeypatch.setattr(config, "CONFIG_FILE_PATH", config_path)
+    monkeypatch.setattr(context, "_contexts", {})
+    return config_path
+
+
+@pytest.fixture
+def properties(config_file: Path, tmp_path: Path) -> dict:
+    """
+    Two properties: north has two rooms with one booking, south has one big room.
+    """
+    databases = {
+        "north": {
+            "rooms": [
+                {"id": "n-1", "name": "Single", "capacity": 1},
+                {"id": "n-2", "name": "Twin", "capacity": 2},
+            ],
+            "bookings": [
+                {"id": "b-1", "room_name": "Twin", "room_id": "n-2", "start_date": "2030-01-01", "end_date": "2030-01-10"},
+            ],
+        },
+        "south": {
+            "rooms": [{"id": "s-1", "name": "Suite", "capacity": 4}],
+            "bookings": [],
+        },
+    }
+    for name, data in databases.items():
+        db_file = tmp_path / f"{name}.json"
+        db_file.write_text(json.dumps(data))
+        config.init_app(str(db_file), name)
+    return config._get_property_paths()
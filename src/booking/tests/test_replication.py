@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+
+from booking import SUCCESS, READ_ONLY_ERROR
+from booking.models.book import BookingService
+from booking.models.room import RoomService
+from booking.changes import ChangeLog
+from booking.replication import Follower
+
+
+def _failing_append(self, *args, **kwargs):
+    raise OSError("disk full")
+
+
+# ========== TEST: REPLICATION ==========
+def test_follower_starts_from_primary_copy(json_db: Path, tmp_path: Path):
+    """Test that a new follower gets everything already in the primary."""
+    # Arrange
+    RoomService(json_db).add("room a", 10)
+    follower_db = tmp_path / "follower" / "book.json"
+    
+    # Act
+    status = Follower(json_db, follower_db).sync_once()
+    
+    # Assert
+    assert status.lag == 0
+    assert len(RoomService(follower_db, read_only=True).get_rooms().list) == 1
+
+
+def test_follower_applies_only_new_changes(json_db: Path, tmp_path: Path):
+    """Test that later primary changes are replayed incrementally."""
+    # Arrange
+    follower_db = tmp_path / "follower.json"
+    replica = Follower(json_db, follower_db)
+    replica.sync_once()
+    primary = BookingService(json_db)
+    primary.add("Room A", "room-1", "2026-01-10", "2026-01-15")
+    primary.add("Room A", "room-1", "2026-01-15", "2026-01-20")
+    
+    # Act
+    before = replica.status()
+    status = replica.sync_once()
+    
+    # Assert
+    assert before.lag == 2
+    assert status.applied == 2
+    assert status.lag == 0
+    follower = BookingService(follower_db, read_only=True)
+    assert len(follower.get_bookings().list) == 2
+
+
+def test_follower_replays_updates_and_deletes(json_db: Path, tmp_path: Path):
+    """Test that edits and removals on the primary reach the follower."""
+    # Arrange
+    follower_db = tmp_path / "follower.json"
+    replica = Follower(json_db, follower_db)
+    rooms = RoomService(json_db)
+    rooms.add("room a", 10)
+    rooms.add("room b", 20)
+    replica.sync_once()
+    
+    # Act
+    rooms.remove("room a.")
+    replica.sync_once()
+    
+    # Assert
+    follower_rooms = RoomService(follower_db, read_only=True).get_rooms().list
+    assert [r["name"] for r in follower_rooms] == ["room b."]
+
+
+def test_follower_recopies_after_a_gap_in_the_log(json_db: Path, tmp_path: Path, monkeypatch):
+    """Test that entries the primary failed to log are not silently skipped."""
+    # Arrange
+    follower_db = tmp_path / "follower.json"
+    replica = Follower(json_db, follower_db)
+    replica.sync_once()
+    rooms = RoomService(json_db)
+    monkeypatch.setattr(ChangeLog, "append", _failing_append)
+    rooms.add("room a", 10)
+    monkeypatch.undo()
+    rooms.add("room b", 20)
+    
+    # Act
+    status = replica.sync_once()
+    
+    # Assert
+    assert status.lag == 0
+    follower_rooms = RoomService(follower_db, read_only=True).get_rooms().list
+    assert sorted(r["name"] for r in follower_rooms) == ["room a.", "room b."]
+
+
+def test_read_only_services_refuse_writes(json_db: Path):
+    """Test that services opened read-only never write."""
+    # Arrange
+    rooms = RoomService(json_db, read_only=True)
+    bookings = BookingService(json_db, read_only=True)
+    
+    # Act
+    room_response = rooms.add("room a", 10)
+    booking_response = bookings.add("Room A", "room-1", "2026-01-10", "2026-01-15")
+    
+    # Assert
+    assert room_response.error == READ_ONLY_ERROR
+    assert booking_response.error == READ_ONLY_ERROR
+    assert json.loads(json_db.read_text()) == {"rooms": [], "bookings": []}
+
+
+def test_read_only_services_leave_no_index_behind(json_db: Path, tmp_path: Path):
+    """Test that queries on a follower build its index in memory without writing it."""
+    # Arrange
+    RoomService(json_db).add("room a", 10)
+    follower_db = tmp_path / "follower.json"
+    Follower(json_db, follower_db).sync_once()
+    for leftover in tmp_path.glob("follower.json.index.json*"):
+        leftover.unlink()
+    
+    # Act
+    rooms = RoomService(follower_db, read_only=True).get_room_by_name("room a.")
+    free = BookingService(follower_db, read_only=True).next_free(rooms.list[0]["id"], 2)
+    
+    # Assert
+    assert rooms.error == SUCCESS
+    assert free.error == SUCCESS
+    assert not list(tmp_path.glob("follower.json.index.json*"))
@@ -4,7 +4,9 @@ from pathlib import Path
 from typing import Any
 
 from booking.models.room import Room, RoomService, RoomServiceResponse
-from booking import SUCCESS, ERROR_ELEMENT_NOT_FOUND, DUPLICATED_ROOM_NAME
+from booking import SUCCESS, ERROR_ELEMENT_NOT_FOUND, DUPLICATED_ROOM_NAME, ROOM_HAS_BOOKINGS
+from booking.models.book import BookingService
+from booking.recurrence import RecurrenceRule
 
 
 # ========== TEST DATA ==========
@@ -191,7 +193,7 @@ def test_edit_room_updates_name_and_capacity(json_db: Path):
     
     # Assert
     assert response.error == SUCCESS
-    assert response.list["name"] == "new room"
+    assert response.list["name"] == "new room."
     assert response.list["capacity"] == 100
 
 
@@ -283,6 +285,100 @@ def test_remove_specific_room_from_multiple(json_db: Path):
     assert "Room b." not in names
 
 
+# ========== TEST: CASCADING EDITS ==========
+def _room_with_bookings(json_db: Path) -> str:
+    rooms = RoomService(json_db)
+    bookings = BookingService(json_db)
+    rooms.add("room a", 10)
+    rooms.add("room b", 10)
+    room_id = rooms.get_room_by_name("room a.").list[0]["id"]
+    other_id = rooms.get_room_by_name("room b.").list[0]["id"]
+    bookings.add("room a.", room_id, "2030-01-10", "2030-01-15")
+    bookings.add("room b.", other_id, "2030-01-10", "2030-01-15")
+    bookings.add_series("room a.", room_id, "2030-02-01", "2030-02-02", RecurrenceRule.from_frequency("weekly", count=2))
+    return room_id
+
+
+def test_rename_cascades_to_bookings_and_series(json_db: Path):
+    """Test that renaming a room renames it on every booking of that room only."""
+    # Arrange
+    room_id = _room_with_bookings(json_db)
+    service = RoomService(json_db)
+    
+    # Act
+    response = service.edit("Room A.", "garden", 0)
+    
+    # Assert
+    assert response.error == SUCCESS
+    handler = service._db_handler
+    assert sorted(b["room_name"] for b in handler.read("bookings").list) == ["garden.", "room b."]
+    assert [s["room_name"] for s in handler.read("series").list] == ["garden."]
+    assert {b.room_name for b in BookingService(json_db).get_stays(room_id).list} == {"garden."}
+
+
+def test_rename_to_existing_name_is_refused(json_db: Path):
+    """Test that a room cannot be renamed to another room's name."""
+    # Arrange
+    _room_with_bookings(json_db)
+    service = RoomService(json_db)
+    
+    # Act
+    response = service.edit("room a.", "ROOM B.", 0)
+    
+    # Assert
+    assert response.error == DUPLICATED_ROOM_NAME
+
+
+def test_rename_is_normalized_like_add(json_db: Path):
+    """Test that a rename gets the trailing period add() gives every room name."""
+    # Arrange
+    _room_with_bookings(json_db)
+    service = RoomService(json_db)
+    
+    # Act
+    without_period = service.edit("room a.", "room b", 0)
+    renamed = service.edit("room a.", "garden", 0)
+    added = service.add("garden", 5)
+    
+    # Assert
+    assert without_period.error == DUPLICATED_ROOM_NAME
+    assert renamed.list["name"] == "garden."
+    assert added.error == DUPLICATED_ROOM_NAME
+    assert sorted(r["name"] for r in service._db_handler.read("rooms").list) == ["garden.", "room b."]
+
+
+def test_remove_room_with_bookings_is_refused(json_db: Path):
+    """Test that a referenced room is kept unless the removal cascades."""
+    # Arrange
+    _room_with_bookings(json_db)
+    service = RoomService(json_db)
+    
+    # Act
+    response = service.remove("room a.")
+    
+    # Assert
+    assert response.error == ROOM_HAS_BOOKINGS
+    assert len(service._db_handler.read("rooms").list) == 2
+
+
+def test_remove_room_cascade_deletes_its_bookings(json_db: Path):
+    """Test that a cascading removal takes the room's bookings and series with it."""
+    # Arrange
+    room_id = _room_with_bookings(json_db)
+    service = RoomService(json_db)
+    
+    # Act
+    response = service.remove("room a.", cascade=True)
+    
+    # Assert
+    assert response.error == SUCCESS
+    handler = service._db_handler
+    assert [b["room_name"] for b in handler.read("bookings").list] == ["room b."]
+    assert handler.read("series").list == []
+    assert handler.indexes().booking_ids(room_id) == []
+    assert BookingService(json_db).get_stays(room_id).list == []
+
+
 # ========== TEST: ROOM OBJECT ==========
 def test_room_to_dict(json_db: Path):
     """Test Room.to_dict() conversion."""
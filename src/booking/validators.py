@@ -1,7 +1,73 @@
 """Validators for booking operations"""
-from datetime import datetime
-from typing import Tuple
-from booking.models.book import Booking
+import re
+from array import array
+from itertools import chain
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+from booking import metrics
+
+if TYPE_CHECKING:
+    # booking.models.book imports the date helpers below, so it can't be imported here
+    from booking.models.book import Booking
+
+# Per-row results of BookingValidator.validate_booking_dates_batch, in the
+# order the checks are made
+(
+    DATES_OK,
+    INVALID_START_FORMAT,
+    INVALID_END_FORMAT,
+    START_IN_PAST,
+    END_IN_PAST,
+    START_NOT_BEFORE_END,
+) = range(6)
+
+DATE_ERRORS = {
+    INVALID_START_FORMAT: "Invalid start date format. Use YYYY-MM-DD",
+    INVALID_END_FORMAT: "Invalid end date format. Use YYYY-MM-DD",
+    START_IN_PAST: "Start date cannot be in the past",
+    END_IN_PAST: "End date cannot be in the past",
+    START_NOT_BEFORE_END: "Start date must be before end date",
+}
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_BAD_DATE = -1
+
+
+def is_iso_date(date_str: str) -> bool:
+    """Check that a string is a valid, zero-padded YYYY-MM-DD date.
+
+    Stored dates are compared and bisected as strings, which only orders
+    them by date when every month and day has two digits.
+    """
+    if not isinstance(date_str, str) or not _ISO_DATE.fullmatch(date_str):
+        return False
+    try:
+        date.fromisoformat(date_str)
+    except ValueError:
+        return False
+    return True
+
+
+def normalize_date(date_str: str) -> Optional[str]:
+    """Zero-padded YYYY-MM-DD form of a date string, or None if it isn't a date.
+
+    Takes whatever DateValidator.is_valid_date_format accepts, so an
+    unpadded "2030-1-5" becomes "2030-01-05" before it is stored.
+    """
+    if is_iso_date(date_str):
+        return date_str
+    try:
+        return datetime.strptime(date_str, DateValidator.DATE_FORMAT).date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_ordinal(date_str: str) -> int:
+    """Day ordinal of a zero-padded YYYY-MM-DD string, or _BAD_DATE"""
+    if not is_iso_date(date_str):
+        return _BAD_DATE
+    return date.fromisoformat(date_str).toordinal()
+
 
 class DateValidator:
     """Validates dates for bookings"""
@@ -41,7 +107,7 @@ class BookingValidator:
     """Validates booking conflicts"""
     
     @staticmethod
-    def has_overlap(booking1: Booking, booking2: Booking) -> bool:
+    def has_overlap(booking1: 'Booking', booking2: 'Booking') -> bool:
         """Check if two bookings have overlapping dates"""
         start1 = datetime.strptime(booking1.start_date, DateValidator.DATE_FORMAT)
         end1 = datetime.strptime(booking1.end_date, DateValidator.DATE_FORMAT)
@@ -56,9 +122,26 @@ class BookingValidator:
         room_id: str, 
         start_date: str, 
         end_date: str, 
-        existing_bookings: list[Booking]
+        existing_bookings: list['Booking'],
+        holds: Iterable = ()
     ) -> Tuple[bool, str]:
-        """Check if room is available for the given dates"""
+        """Check if room is available for the given dates, counting unexpired holds"""
+        with metrics.CONFLICT_CHECK_SECONDS.time():
+            is_available, _, message = BookingValidator._find_unavailability(
+                room_id, start_date, end_date, existing_bookings, holds
+            )
+        return is_available, message
+    
+    @staticmethod
+    def _find_unavailability(
+        room_id: str,
+        start_date: str,
+        end_date: str,
+        existing_bookings: list['Booking'],
+        holds: Iterable
+    ) -> Tuple[bool, str, str]:
+        from booking.models.book import Booking
+        
         new_booking = Booking(
             id="temp",
             room_name="",
@@ -69,29 +152,79 @@ class BookingValidator:
         
         for booking in existing_bookings:
             if booking.room_id == room_id and BookingValidator.has_overlap(new_booking, booking):
-                return False, f"Room is already booked from {booking.start_date} to {booking.end_date}"
+                return False, "conflict", f"Room is already booked from {booking.start_date} to {booking.end_date}"
         
-        return True, ""
+        for hold in holds:
+            if hold.room_id == room_id and BookingValidator.has_overlap(new_booking, hold):
+                return False, "hold", f"Room is on hold from {hold.start_date} to {hold.end_date}"
+        
+        return True, "", ""
     
     @staticmethod
     def validate_booking_dates(start_date: str, end_date: str) -> Tuple[bool, str]:
         """Validate booking dates comprehensively"""
+        is_valid, message = BookingValidator._validate_booking_dates(start_date, end_date)
+        if not is_valid:
+            metrics.BOOKINGS_REJECTED.inc(reason="invalid_dates")
+        return is_valid, message
+    
+    @staticmethod
+    def validate_booking_dates_batch(
+        start_dates: Sequence[str],
+        end_dates: Sequence[str],
+        today: Optional[date] = None,
+    ) -> List[int]:
+        """Validate columns of check-in and check-out dates, returning a result code per row.
+
+        Each distinct date string is parsed once, then the rows are compared
+        as day ordinals against a single "today". Codes are DATES_OK or one
+        of the DATE_ERRORS keys, applying the same checks in the same order
+        as validate_booking_dates. Unlike that one, only zero-padded dates
+        pass, since bulk rows are stored as given; run them through
+        normalize_date first to accept what strptime accepts.
+        """
+        if len(start_dates) != len(end_dates):
+            raise ValueError("start_dates and end_dates must have the same length")
+        today_ordinal = (today or date.today()).toordinal()
+        ordinals: Dict[str, int] = {}
+        for date_str in chain(start_dates, end_dates):
+            if date_str not in ordinals:
+                ordinals[date_str] = _date_ordinal(date_str)
+        starts = array("l", map(ordinals.__getitem__, start_dates))
+        ends = array("l", map(ordinals.__getitem__, end_dates))
+        
+        codes = [
+            INVALID_START_FORMAT if start == _BAD_DATE
+            else INVALID_END_FORMAT if end == _BAD_DATE
+            else START_IN_PAST if start < today_ordinal
+            else END_IN_PAST if end < today_ordinal
+            else START_NOT_BEFORE_END if start >= end
+            else DATES_OK
+            for start, end in zip(starts, ends)
+        ]
+        rejected = len(codes) - codes.count(DATES_OK)
+        if rejected:
+            metrics.BOOKINGS_REJECTED.inc(rejected, reason="invalid_dates")
+        return codes
+    
+    @staticmethod
+    def _validate_booking_dates(start_date: str, end_date: str) -> Tuple[bool, str]:
         # Check format
         if not DateValidator.is_valid_date_format(start_date):
-            return False, "Invalid start date format. Use YYYY-MM-DD"
+            return False, DATE_ERRORS[INVALID_START_FORMAT]
         
         if not DateValidator.is_valid_date_format(end_date):
-            return False, "Invalid end date format. Use YYYY-MM-DD"
+            return False, DATE_ERRORS[INVALID_END_FORMAT]
         
         # Check dates are not in past
         if not DateValidator.is_not_in_past(start_date):
-            return False, "Start date cannot be in the past"
+            return False, DATE_ERRORS[START_IN_PAST]
         
         if not DateValidator.is_not_in_past(end_date):
-            return False, "End date cannot be in the past"
+            return False, DATE_ERRORS[END_IN_PAST]
         
         # Check start is before end
         if not DateValidator.is_start_before_end(start_date, end_date):
-            return False, "Start date must be before end date"
+            return False, DATE_ERRORS[START_NOT_BEFORE_END]
         
         return True, ""